@@ -1,24 +1,37 @@
+# 다른 모듈보다 먼저 패치해야 concurrent.futures 등이 만드는 락도 green 락이 됨 (검색 스레드 교착 방지)
+import eventlet
+eventlet.monkey_patch()
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 import time
-import random
 import urllib.parse
-import pandas as pd
+import io
+import threading
+from concurrent.futures import CancelledError
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, send_file, make_response, Response
 from jinja2 import Environment, PackageLoader, select_autoescape
 from jinja2 import StrictUndefined
 from apscheduler.schedulers.background import BackgroundScheduler
 from flask_socketio import SocketIO, emit
-import eventlet
+from log_writer import LogWriter
+from log_reader import LogReader
+from log_search import LogSearchIndex
+from event_bus import EventBus
+from execution import blocking, LatencyProbe
+from metrics import MetricsRegistry, PhaseTimings
+from search_engine import SearchEngine, SearchCancelled, ScrollMetrics, PageLoadMetrics
+from search_workers import SearchSupervisor, InlineSearchRunner
+from search_queue import SearchQueue
+from item_scheduler import ItemScheduler
+from serp_cache import SerpCache
+from serp_capture import SerpCaptureStore
+from rank_store import RankStore, RankTable
+from sweep_state import SweepStateStore, UNFINISHED
+from job_store import SQLiteJobStore
 import sys
 sys.setrecursionlimit(10000)  # 재귀 제한 증가
-eventlet.monkey_patch()
 import os
 
 # Flask 앱과 SocketIO 초기화
@@ -27,11 +40,10 @@ app.config['SECRET_KEY'] = 'secret!'
 app.jinja_env.undefined = StrictUndefined
 socketio = SocketIO(app, async_mode='eventlet', cors_allowed_origins="*")
 
-# 스케줄러 초기화
+# 스케줄러 초기화 (monkey_patch 후라서 작업 스레드도 green 스레드, 실행 모델은 execution.py 참고)
+# 작업은 SQLite 파일(SCHEDULER_DB)에 저장해서 서버를 다시 시작해도 남음
 scheduler = BackgroundScheduler({
-    'apscheduler.jobstores.default': {
-        'type': 'memory'
-    },
+    'apscheduler.jobstores.default': SQLiteJobStore(),
     'apscheduler.executors.default': {
         'class': 'apscheduler.executors.pool:ThreadPoolExecutor',
         'max_workers': '20'
@@ -45,130 +57,345 @@ LOG_DIR = 'logs'
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
+# 동시 검색 워커 수 / 브라우저 풀 설정 (풀 크기는 워커 수 이상이어야 함)
+SEARCH_WORKERS = int(os.environ.get('SEARCH_WORKERS', 3))
+BROWSER_POOL_SIZE = int(os.environ.get('BROWSER_POOL_SIZE', SEARCH_WORKERS))
+BROWSER_MAX_USES = int(os.environ.get('BROWSER_MAX_USES', 50))
+
+# 검색 페이지 수집 방식: 'http' (HTTP 우선, 상품 목록이 없으면 브라우저) / 'browser' (항상 브라우저)
+SEARCH_FETCH_MODE = os.environ.get('SEARCH_FETCH_MODE', 'http')
+
+# 순위 DB / 가져오기·내보내기용 엑셀 파일 경로
+RANK_DB_PATH = os.environ.get('RANK_DB', 'coupang_rank.db')
+EXCEL_PATH = 'coupang_rank.xlsx'
+
+# 스크롤 설정: 페이지당 랜덤 대기 총 예산(초), 상품 수 변화가 없으면 멈추는 시간(초)
+SCROLL_HUMANIZE_BUDGET = float(os.environ.get('SCROLL_HUMANIZE_BUDGET', 1.5))
+SCROLL_SETTLE_TIME = float(os.environ.get('SCROLL_SETTLE_TIME', 0.5))
+
+# 미리 가져올 다음 페이지 수 (0 이면 미리 가져오기 안 함)
+# browser 모드에서는 미리 가져오기 전용 브라우저가 검색용 풀과 따로 뜸 (워커 수 x 이 값)
+SEARCH_PREFETCH_DEPTH = int(os.environ.get('SEARCH_PREFETCH_DEPTH', 1))
+
+# 검색 결과 캐시: 같은 키워드/페이지를 다시 열지 않는 시간(초, 0 이면 사용 안 함) / 최대 저장 페이지 수
+SERP_CACHE_TTL = int(os.environ.get('SERP_CACHE_TTL', 600))
+SERP_CACHE_MAX_ENTRIES = int(os.environ.get('SERP_CACHE_MAX_ENTRIES', 5000))
+
+# 검색한 페이지의 상품 목록 전체 저장 (나중에 추가한 상품 순위를 다시 검색하지 않고 계산)
+SERP_CAPTURE = os.environ.get('SERP_CAPTURE', '1') == '1'
+
+# 마지막으로 발견된 페이지부터 찾기: 사용 여부 / 힌트 페이지 앞뒤로 먼저 볼 페이지 수
+SEARCH_USE_HINTS = os.environ.get('SEARCH_USE_HINTS', '1') == '1'
+SEARCH_HINT_RADIUS = int(os.environ.get('SEARCH_HINT_RADIUS', 2))
+
+# 검색 실행 방식: 'process' (워커 프로세스에서 실행, 멈추거나 죽으면 강제 종료 후 재시작) / 'thread' (서버 안 스레드)
+SEARCH_ISOLATION = os.environ.get('SEARCH_ISOLATION', 'process')
+
+# 워커 감시: 한 페이지에서 응답 없이 기다리는 최대 시간(초) / 키워드 1개 최대 시간(초) / 워커 교체 주기(검색 수)
+SEARCH_PAGE_TIMEOUT = float(os.environ.get('SEARCH_PAGE_TIMEOUT', 120))
+SEARCH_KEYWORD_TIMEOUT = float(os.environ.get('SEARCH_KEYWORD_TIMEOUT', 1200))
+SEARCH_WORKER_MAX_TASKS = int(os.environ.get('SEARCH_WORKER_MAX_TASKS', 200))
+
+# 허브 지연 허용 기준(ms): 전체 검색 중 허브 지연/Socket.IO ping 왕복 시간이 이 값을 넘으면 경고
+LATENCY_THRESHOLD_MS = float(os.environ.get('LATENCY_THRESHOLD_MS', 250))
+
+# 항목별 검색 주기 (분): 항목에 주기를 정하지 않으면(0) 기본 주기에서 시작해서 순위 변화에 따라 자동 조정
+SCHEDULE_DEFAULT_INTERVAL = int(os.environ.get('SCHEDULE_DEFAULT_INTERVAL', 60))
+SCHEDULE_MIN_INTERVAL = int(os.environ.get('SCHEDULE_MIN_INTERVAL', 15))
+SCHEDULE_MAX_INTERVAL = int(os.environ.get('SCHEDULE_MAX_INTERVAL', 1440))
+SCHEDULE_AUTO_TUNE = os.environ.get('SCHEDULE_AUTO_TUNE', '1') == '1'
+# 다음 검색 시각을 주기의 ± 몇 % 로 흩뜨릴지 / 검색할 차례가 된 항목을 확인하는 간격(초)
+SCHEDULE_JITTER = float(os.environ.get('SCHEDULE_JITTER', 0.1))
+SCHEDULE_TICK = int(os.environ.get('SCHEDULE_TICK', 60))
+
+# 중단된 전체 검색을 이어서 할 수 있는 시간 (이보다 오래되면 버리고 처음부터) / 서버 시작 시 자동으로 이어서 검색
+SWEEP_RESUME_MAX_AGE = float(os.environ.get('SWEEP_RESUME_MAX_AGE', 24))
+SWEEP_AUTO_RESUME = os.environ.get('SWEEP_AUTO_RESUME', '1') == '1'
+
 # 전역 변수 설정
-log_messages = []
 search_active = False
+server_stopping = False
+current_sweep = None   # 진행 중인 전체 검색의 SweepProgress (검색 중지 때 그 검색만 취소)
+
+# Socket.IO 이벤트 묶음 전송 (로그는 0.25초마다 한 번에, 상태는 마지막 것만)
+event_bus = EventBus(socketio, interval=float(os.environ.get('EVENT_FLUSH_INTERVAL', 0.25)))
+
+# 허브 지연 측정 (0.5초마다 + 브라우저가 보고한 ping 왕복 시간)
+latency_probe = LatencyProbe(sleep=socketio.sleep, threshold_ms=LATENCY_THRESHOLD_MS)
+
+# 로그 기록기 (백그라운드 스레드가 모아서 파일에 씀, 최근 1000개는 메모리에 보관)
+log_writer = LogWriter(LOG_DIR, recent_size=1000)
+
+# 로그 뷰어용 범위 읽기 (파일마다 줄 위치 색인 유지)
+log_reader = LogReader(LOG_DIR)
+
+# 전체 로그 검색 색인 (검색할 때마다 새로 추가된 로그만 반영)
+log_search = LogSearchIndex(LOG_DIR)
 
 def get_log_filename():
     """오늘 날짜의 로그 파일명 반환"""
-    return os.path.join(LOG_DIR, f"search_log_{datetime.now().strftime('%Y%m%d')}.txt")
+    return log_writer.current_path()
 
-def emit_log(message):
-    """로그 메시지를 클라이언트에 전송하고 파일에 저장"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    formatted_message = f"[{timestamp}] {message}"
-    
-    # 메모리에 저장 (최대 1000개까지만 저장)
-    log_messages.append(formatted_message)
-    if len(log_messages) > 1000:
-        log_messages.pop(0)
+def emit_log(message, level='INFO', **fields):
+    """로그 메시지를 클라이언트에 전송하고 파일에 저장
+
+    fields 에 keyword, page 등을 넘기면 레코드에 함께 저장되어 클라이언트에도 전달됨
+    """
+    record = log_writer.write(message, level=level, **fields)
     
-    # 파일에 저장
+    # 클라이언트에 전송 (다음 log_batch 프레임에 묶어서 전송)
+    event_bus.log(record)
+
+# 검색 엔진 설정 (워커 프로세스에도 그대로 전달)
+SEARCH_ENGINE_CONFIG = {
+    'fetch_mode': SEARCH_FETCH_MODE,
+    'browser_max_uses': BROWSER_MAX_USES,
+    'prefetch_depth': SEARCH_PREFETCH_DEPTH,
+    'hint_radius': SEARCH_HINT_RADIUS,
+    'cache_ttl': SERP_CACHE_TTL,
+    'cache_max_entries': SERP_CACHE_MAX_ENTRIES,
+    'capture': SERP_CAPTURE,
+    'scroll_humanize_budget': SCROLL_HUMANIZE_BUDGET,
+    'scroll_settle_time': SCROLL_SETTLE_TIME,
+    'page_load_timeout': min(30, SEARCH_PAGE_TIMEOUT)
+}
+
+if SEARCH_ISOLATION == 'thread':
+    # 서버 프로세스 안에서 브라우저 풀 / HTTP 세션을 모든 검색 스레드가 공유
+    search_runner = InlineSearchRunner(SearchEngine(dict(SEARCH_ENGINE_CONFIG,
+                                                         browser_pool_size=BROWSER_POOL_SIZE,
+                                                         fetch_pool_size=SEARCH_WORKERS * 2,
+                                                         prefetch_workers=SEARCH_WORKERS * SEARCH_PREFETCH_DEPTH),
+                                                    log=emit_log),
+                                       SEARCH_WORKERS)
+else:
+    # 워커 프로세스마다 키워드 1개씩 검색하므로 브라우저 풀은 나눠서 가짐
+    search_runner = SearchSupervisor(SEARCH_WORKERS,
+                                     dict(SEARCH_ENGINE_CONFIG,
+                                          browser_pool_size=max(1, BROWSER_POOL_SIZE // SEARCH_WORKERS),
+                                          fetch_pool_size=2,
+                                          prefetch_workers=SEARCH_PREFETCH_DEPTH),
+                                     log=emit_log,
+                                     page_timeout=SEARCH_PAGE_TIMEOUT,
+                                     keyword_timeout=SEARCH_KEYWORD_TIMEOUT,
+                                     max_tasks=SEARCH_WORKER_MAX_TASKS)
+
+# 검색 작업 대기열 (즉시 검색 > 정기 검색 > 보충 검색, 실행 슬롯은 검색 워커 수만큼)
+search_queue = SearchQueue(SEARCH_WORKERS, socketio.start_background_task, log=emit_log,
+                           on_change=lambda: event_bus.latest('queue_status', search_queue.stats))
+
+# 검색 결과 캐시 비우기 / 통계용 (캐시를 읽고 쓰는 것은 검색 엔진 쪽, 사용 횟수는 검색마다 돌려받은 통계로 합산)
+serp_cache = SerpCache(ttl=SERP_CACHE_TTL, max_entries=SERP_CACHE_MAX_ENTRIES)
+serp_capture = SerpCaptureStore() if SERP_CAPTURE else None
+
+# 순위 데이터 저장소 (엑셀은 가져오기/내보내기용) / 메모리 순위표
+rank_store = RankStore(RANK_DB_PATH)
+rank_table = RankTable(rank_store)
+
+# 전체 검색 진행 상태 (중지/서버 재시작 후 남은 항목만 이어서 검색, 순위 DB 와 다른 파일 SWEEP_DB)
+sweep_state = SweepStateStore()
+
+# 항목별 검색 주기 스케줄러 (검색할 차례가 된 항목만 조금씩 대기열에 넣음)
+item_scheduler = ItemScheduler(rank_table,
+                               submit=lambda keyword, rows: submit_scheduled(keyword, rows),
+                               pending=lambda item_id: search_queue.job_of(item_id) is not None,
+                               default_interval=SCHEDULE_DEFAULT_INTERVAL,
+                               min_interval=SCHEDULE_MIN_INTERVAL,
+                               max_interval=SCHEDULE_MAX_INTERVAL,
+                               jitter=SCHEDULE_JITTER,
+                               tick=SCHEDULE_TICK,
+                               auto_tune=SCHEDULE_AUTO_TUNE,
+                               log=emit_log)
+
+# 검색 통계 (워커가 검색마다 돌려준 통계를 합산)
+scroll_metrics = ScrollMetrics()
+page_load_metrics = PageLoadMetrics()
+
+# /metrics 지표 (Prometheus 텍스트 형식) / 전체 검색 1회의 단계별 시간 요약
+metrics = MetricsRegistry()
+phase_timings = PhaseTimings()
+last_sweep_summary = None
+search_phase_seconds = metrics.histogram('coupang_search_phase_seconds', '검색 단계별 소요 시간 (초)', ['phase'])
+keyword_search_seconds = metrics.histogram('coupang_keyword_search_seconds', '키워드 1개 검색 시간 (초)', ['mode'],
+                                           buckets=(1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1200))
+keywords_searched_total = metrics.counter('coupang_keywords_searched_total', '검색한 키워드 수', ['outcome'])
+products_searched_total = metrics.counter('coupang_products_searched_total', '순위를 찾은 상품 수', ['result'])
+pages_loaded_total = metrics.counter('coupang_pages_loaded_total', '실제로 가져온 검색 결과 페이지 수')
+browser_launches_total = metrics.counter('coupang_browser_launches_total', '크롬 브라우저 실행(재시작 포함) 횟수')
+sweeps_total = metrics.counter('coupang_sweeps_total', '전체 검색 횟수', ['outcome'])
+sweep_seconds = metrics.histogram('coupang_sweep_seconds', '전체 검색 1회 소요 시간 (초)',
+                                  buckets=(60, 300, 600, 1800, 3600, 7200, 14400, 43200, 86400))
+last_sweep_gauge = metrics.gauge('coupang_last_sweep', '마지막 전체 검색 요약', ['stat'])
+xlsx_seconds = metrics.histogram('coupang_xlsx_seconds', '엑셀 가져오기/내보내기 시간 (초)', ['operation'])
+rank_write_seconds = metrics.histogram('coupang_rank_write_seconds', '검색 결과 1건 저장 시간 (초)')
+search_active_gauge = metrics.gauge('coupang_search_active', '전체 검색 진행 중 여부')
+search_worker_events = metrics.counter('coupang_search_worker_events_total', '검색 워커 이벤트 (강제 종료, 재시작 등)', ['event'])
+hub_lag_gauge = metrics.gauge('coupang_hub_lag_max_ms', '최근 60초 허브 지연 최대값 (ms)')
+schedule_due_gauge = metrics.gauge('coupang_schedule_due_items', '검색할 차례가 지난 항목 수')
+schedule_rate_gauge = metrics.gauge('coupang_schedule_checks_per_hour', '항목별 주기로 계산한 시간당 검색 수')
+queue_depth_gauge = metrics.gauge('coupang_search_queue_depth', '검색 대기열 레인별 대기 작업 수', ['lane'])
+queue_age_gauge = metrics.gauge('coupang_search_queue_oldest_seconds', '검색 대기열 레인별 가장 오래 기다린 시간 (초)', ['lane'])
+
+def import_excel_if_empty():
+    """순위 DB 가 비어 있고 엑셀 파일이 있으면 엑셀에서 가져오기 (최초 1회)"""
+    try:
+        if rank_store.is_empty() and os.path.exists(EXCEL_PATH):
+            with xlsx_seconds.time(operation='import'):
+                count = rank_table.import_excel(EXCEL_PATH)
+            emit_log(f"엑셀 파일에서 {count}개 항목을 가져왔습니다.")
+    except Exception as e:
+        emit_log(f"엑셀 가져오기 오류: {str(e)}")
+
+def dispatch_due_items():
+    """다음 검색 시각이 된 항목들을 검색 대기열(scheduled 레인)에 넣음 (SCHEDULE_TICK 초마다)"""
     try:
-        with open(get_log_filename(), 'a', encoding='utf-8') as f:
-            f.write(formatted_message + '\n')
+        result = item_scheduler.tick()
+        if result['dispatched'] or result['deferred']:
+            emit_log(f"예약 검색: 항목 {result['dispatched']}개 (키워드 {result['jobs']}개) 대기열에 추가" +
+                     (f", {result['deferred']}개는 다음 확인 때로 미룸" if result['deferred'] else ''))
     except Exception as e:
-        print(f"로그 파일 저장 중 오류: {e}")
+        emit_log(f"예약 검색 중 오류 발생: {str(e)}")
+
+def submit_scheduled(keyword, rows):
+    """예약 검색 1건을 검색 대기열에 넣음"""
+    return search_queue.submit('scheduled', keyword, rows, lambda job: search_rows(job.keyword, job.rows, mode='scheduled'))
+
+def is_search_cancelled():
+    """키워드 검색을 시작하기 전에 확인하는 중지 신호"""
+    return not search_active
+
+class SweepProgress:
+    """여러 워커에 걸친 전체 진행 상황 (완료 개수 기준)"""
+    
+    def __init__(self, total):
+        self.total = total
+        self.completed = 0
+        self.cancelled = False
+        self.searches = []   # 이 전체 검색이 검색 실행기에 넣은 검색의 Future
+        self._lock = threading.Lock()
     
-    # 클라이언트에 전송
-    socketio.emit('log_message', {'message': formatted_message})
+    def finish(self, count=1):
+        """항목 완료 처리 후 현재 완료 개수 반환"""
+        with self._lock:
+            self.completed += count
+            return self.completed
 
-def load_excel():
-    """엑셀 파일 읽기"""
+    def add_search(self, future):
+        with self._lock:
+            self.searches.append(future)
+        return future
+
+def plan_sweep(valid_rows):
+    """같은 키워드의 행들을 묶어서 키워드별 검색 계획 생성
+
+    [(키워드, [(항목 id, 상품 ID), ...]), ...] 를 키워드가 처음 나온 순서대로 반환
+    """
+    groups = {}
+    for row in valid_rows:
+        keyword = str(row['keyword']).strip()
+        groups.setdefault(keyword, []).append((row['id'], str(row['product_id']).strip()))
+    return list(groups.items())
+
+def search_keyword(keyword, rows, progress, sweep_id):
+    """워커 스레드에서 한 키워드를 검색 ('done' | 'cancelled' | 'error', {상품 ID: 결과}) 반환
+
+    페이지를 볼 때마다 전체 검색 진행 상태에 중간 저장하고, 중간 저장이 있으면 그 다음부터 검색한다.
+    """
+    if is_search_cancelled():
+        progress.cancelled = True
+        return 'cancelled', {}
+    
+    product_ids = {product_id for _, product_id in rows}
+    current_status = f"검색 중: {keyword} - 상품 {len(product_ids)}개 ({progress.completed}/{progress.total} 완료)"
+    emit_log(f"\n=== {current_status} ===", keyword=keyword)
+    event_bus.status({
+        'status': 'searching',
+        'current': progress.completed,
+        'total': progress.total,
+        'keyword': keyword,
+        'message': current_status
+    })
+    
+    started = time.time()
     try:
-        emit_log("엑셀 파일 로딩 시작...")
-        
-        if not os.path.exists('coupang_rank.xlsx'):
-            emit_log("엑셀 파일이 존재하지 않습니다. 새로운 파일을 생성합니다.")
-            # 기본 구조로 새로운 엑셀 파일 생성
-            df = pd.DataFrame(columns=[
-                'number', 'keyword', 'product_id', 'page', 
-                'rank', 'ad', 'page_rank', 'date', 'time'
-            ])
-            # 초기값 설정
-            df['page'] = 0
-            df['rank'] = 0
-            df['ad'] = '0'
-            df['page_rank'] = 0
-            
-            df.to_excel('coupang_rank.xlsx', index=False)
-            emit_log("새로운 엑셀 파일이 생성되었습니다.")
-            return df
-            
-        df = pd.read_excel('coupang_rank.xlsx')
-        
-        # NaN 값을 0으로 변경
-        df['page'] = df['page'].fillna(0).astype(int)
-        df['rank'] = df['rank'].fillna(0).astype(int)
-        df['ad'] = df['ad'].fillna('0')
-        df['page_rank'] = df['page_rank'].fillna(0).astype(int)
-        
-        # 데이터 유효성 검사
-        required_columns = ['number', 'keyword', 'product_id']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            emit_log(f"엑셀 파일에 필수 컬럼이 없습니다: {', '.join(missing_columns)}")
-            return None
-            
-        if df.empty:
-            emit_log("엑셀 파일에 데이터가 없습니다.")
-            return df
-            
-        # 데이터 전처리
-        df['keyword'] = df['keyword'].astype(str).str.strip()
-        df['product_id'] = df['product_id'].astype(str).str.strip()
-        
-        valid_rows = df[df['keyword'].notna() & (df['keyword'] != '') & 
-                       df['product_id'].notna() & (df['product_id'] != '')]
-                       
-        if len(valid_rows) == 0:
-            emit_log("유효한 검색어와 상품 ID가 없습니다.")
-            socketio.emit('search_status', {
-                'status': 'waiting',
-                'current': 0,
-                'total': 0,
-                'keyword': '',
-                'message': '검색 대기 중'
-            })
-        else:
-            emit_log(f"총 {len(valid_rows)}개의 유효한 데이터를 읽었습니다.")
-            socketio.emit('search_status', {
-                'status': 'waiting',
-                'current': 0,
-                'total': len(valid_rows),
-                'keyword': '',
-                'message': '검색 대기 중'
-            })
-            
-        return df
-        
+        checkpoint = sweep_state.keyword_checkpoint(sweep_id, keyword)
+        found, stats = progress.add_search(search_runner.submit(
+            keyword, product_ids, hints=load_hints(keyword, product_ids), resume=checkpoint,
+            on_page=lambda page, page_found: sweep_state.save_page(sweep_id, keyword, page, page_found)
+        )).result()
+        record_search_stats(stats, sweep=True)
+        keyword_search_seconds.observe(time.time() - started, mode='sweep')
+        keywords_searched_total.inc(outcome='done')
+    except SearchCancelled:
+        progress.cancelled = True
+        keywords_searched_total.inc(outcome='cancelled')
+        emit_log(f"검색 중지됨: {keyword}", keyword=keyword)
+        return 'cancelled', {}
     except Exception as e:
-        emit_log(f"엑셀 파일 읽기 오류: {str(e)}")
-        socketio.emit('search_status', {
+        keywords_searched_total.inc(outcome='error')
+        current = progress.finish(len(rows))
+        emit_log(f"검색 중 오류 발생: {str(e)}", level='ERROR', keyword=keyword)
+        event_bus.status({
             'status': 'error',
-            'current': 0,
-            'total': 0,
-            'keyword': '',
-            'message': f'엑셀 파일 읽기 오류: {str(e)}'
+            'current': current,
+            'total': progress.total,
+            'keyword': keyword,
+            'message': f'오류 발생: {str(e)}'
         })
-        return None
+        return 'error', {}
+    
+    current = progress.finish(len(rows))
+    for product_id in sorted(product_ids):
+        result = found.get(product_id)
+        products_searched_total.inc(result='found' if result else 'not_found')
+        if result:
+            status_msg = f"상품 발견: {keyword} / {product_id} 페이지 {result['page']}, " + \
+                       (f"광고 순위 {result['rank']}" if result['rank_type'] == 'ad' else f"일반 순위 {result['rank']}") + \
+                       f", 전체 순위 {result['page_rank']}"
+        else:
+            status_msg = f"상품을 찾을 수 없습니다: {keyword} / {product_id}"
+        emit_log(status_msg, keyword=keyword, product_id=product_id)
+    event_bus.status({
+        'status': 'searching',
+        'current': current,
+        'total': progress.total,
+        'keyword': keyword,
+        'message': f"검색 완료: {keyword} (발견 {len(found)}/{len(product_ids)})"
+    })
+    return 'done', found
 
-def scheduled_search():
-    """1시간마다 실행될 검색 함수"""
-    try:
-        emit_log("\n=== 정기 검색 시작 ===")
-        perform_search()  # main() 대신 새로운 함수 호출
-    except Exception as e:
-        emit_log(f"정기 검색 중 오류 발생: {str(e)}")
+def start_sweep(lane, resume=True):
+    """전체 검색 진행 상태 준비 후 (sweep id, 검색 계획, 이어서 검색하는 검색 또는 None) 반환
 
-def perform_search():
-    """실제 검색을 수행하는 함수"""
-    global search_active
+    resume 이면 끝나지 않은 전체 검색(SWEEP_RESUME_MAX_AGE 시간 안)의 남은 항목만 검색하고,
+    아니면 끝나지 않은 검색은 버리고 순위표 전체로 새로 시작한다.
+    """
+    sweep_state.abandon_older_than(SWEEP_RESUME_MAX_AGE)
+    unfinished = sweep_state.unfinished()
+    if unfinished and resume:
+        # 중단된 뒤 삭제되었거나 키워드/상품 ID 가 비게 된 항목은 빼고, 나머지는 지금 순위표의 값으로 검색
+        current = {row['id']: row for row in rank_table.valid_rows()}
+        remaining = [current[item_id] for item_id, _, _ in sweep_state.remaining(unfinished['id']) if item_id in current]
+        if remaining:
+            sweep_state.resume(unfinished['id'])
+            return unfinished['id'], plan_sweep(remaining), unfinished
+        sweep_state.set_status(unfinished['id'], 'completed')
+    elif unfinished:
+        sweep_state.set_status(unfinished['id'], 'abandoned')
+    plan = plan_sweep(rank_table.valid_rows())
+    return sweep_state.start(lane, plan), plan, None
+
+def perform_search(lane='scheduled', resume=True):
+    """실제 검색을 수행하는 함수 (키워드마다 검색 대기열의 lane 에 작업으로 넣음)
+
+    resume 이면 중지/서버 재시작으로 끝나지 못한 전체 검색의 남은 항목만 이어서 검색한다.
+    """
+    global search_active, current_sweep
+    sweep_id = None
     try:
         if not search_active:
             emit_log("검색이 이미 중지되었습니다.")
-            socketio.emit('search_status', {
+            event_bus.status({
                 'status': 'waiting',
                 'current': 0,
                 'total': 0,
@@ -178,7 +405,7 @@ def perform_search():
             return
         
         # 검색 시작 상태로 즉시 업데이트
-        socketio.emit('search_status', {
+        event_bus.status({
             'status': 'searching',
             'current': 0,
             'total': 0,
@@ -186,26 +413,16 @@ def perform_search():
             'message': '검색 초기화 중...'
         })
         
-        # 1. 엑셀 파일 로드 및 데이터 검증
-        rank_df = load_excel()
-        if rank_df is None:
-            emit_log("엑셀 파일을 읽을 수 없습니다.")
-            search_active = False
-            socketio.emit('search_status', {'status': 'error'})
-            return
+        # 1. 끝나지 않은 전체 검색이 있으면 그 남은 항목, 없으면 메모리 순위표의 유효한 데이터 전체
+        sweep_id, plan, resumed = start_sweep(lane, resume)
         
-        # 2. 유효한 데이터 필터링
-        valid_df = rank_df[
-            rank_df['keyword'].notna() & (rank_df['keyword'].str.strip() != '') &
-            rank_df['product_id'].notna() & (rank_df['product_id'].str.strip() != '')
-        ].copy()
-        
-        total_items = len(valid_df)
+        total_items = sum(len(rows) for _, rows in plan)
         
         if total_items == 0:
             emit_log("검색할 유효한 데이터가 없습니다.")
+            sweep_state.set_status(sweep_id, 'completed')
             search_active = False
-            socketio.emit('search_status', {
+            event_bus.status({
                 'status': 'error',
                 'current': 0,
                 'total': 0,
@@ -215,8 +432,11 @@ def perform_search():
             return
         
         # 3. 검색 시작
-        emit_log(f"\n=== 검색 시작 (총 {total_items}개 항목) ===")
-        socketio.emit('search_status', {
+        if resumed:
+            emit_log(f"\n=== 중단된 검색 이어서 시작 (#{sweep_id}, 전체 {resumed['total']}개 중 남은 {total_items}개 항목) ===")
+        else:
+            emit_log(f"\n=== 검색 시작 (#{sweep_id}, 총 {total_items}개 항목) ===")
+        event_bus.status({
             'status': 'searching',
             'current': 0,
             'total': total_items,
@@ -224,86 +444,106 @@ def perform_search():
             'message': f'검색 시작 중... (총 {total_items}개 항목)'
         })
         
-        # 4. 각 키워드별 검색 실행
-        for index, row in valid_df.iterrows():
-            if not search_active:
-                emit_log("\n=== 검색이 중지되었습니다 ===")
-                socketio.emit('search_status', {
-                    'status': 'waiting',
-                    'current': 0,
-                    'total': total_items,
-                    'keyword': '',
-                    'message': '검색이 중지되었습니다'
-                })
-                break
-            
+        # 4. 키워드별로 묶어서 워커들에 분배해서 병렬 실행 (같은 키워드는 한 번만 검색)
+        progress = current_sweep = SweepProgress(total_items)
+        page_load_metrics.reset()
+        phase_timings.reset()
+        launches_before = browser_launches_total.value()
+        searched = {'keywords': 0, 'items': 0, 'not_found': 0}
+        emit_log(f"검색 계획: 키워드 {len(plan)}개 / 상품 {total_items}개")
+        
+        # 키워드마다 대기열에 작업으로 넣음 (실행 슬롯의 green 스레드는 워커의 결과를 기다리기만 함)
+        # 검색 중에 들어온 즉시 검색은 남은 키워드보다 먼저 다음 빈 슬롯을 차지함
+        latency_probe.begin('sweep')
+        jobs = []
+        deduplicated = {}   # 이미 대기/실행 중인 다른 검색(즉시/예약) → 그 검색에 맡긴 항목 id
+        for keyword, rows in plan:
+            job, duplicates = search_queue.submit(lane, keyword, rows,
+                                                  lambda job: search_keyword(job.keyword, job.rows, progress, sweep_id),
+                                                  tag='sweep')
+            if duplicates:
+                # 즉시/예약 검색으로 이미 대기/실행 중인 항목은 그 검색의 결과로 반영됨
+                progress.finish(len(duplicates))
+                for item_id, existing in duplicates.items():
+                    deduplicated.setdefault(existing, []).append(item_id)
+            if job is not None:
+                jobs.append(job)
+        
+        # 결과는 계획 순서대로 순위표에 반영
+        for job in jobs:
+            keyword = job.keyword
             try:
-                keyword = str(row['keyword'])
-                product_id = str(row['product_id'])
-                current_number = index + 1
-                
-                # 현재 검색 상태 업데이트
-                current_status = f"검색 중: {keyword} ({current_number}/{total_items})"
-                emit_log(f"\n=== {current_status} ===")
-                socketio.emit('search_status', {
-                    'status': 'searching',
-                    'current': current_number,
-                    'total': total_items,
-                    'keyword': keyword,
-                    'message': current_status
-                })
-                
-                # 실제 검색 수행
-                result = search_product(keyword, product_id)
+                outcome, found = job.future.result()
+                if outcome == 'cancelled':
+                    # 남은 항목과 키워드 중간 저장은 다음에 이어서 검색할 때 사용
+                    continue
+                if outcome == 'error':
+                    sweep_state.finish_items(sweep_id, [item_id for item_id, _ in job.rows], status='error')
+                    sweep_state.clear_keyword(sweep_id, keyword)
+                    continue
                 
-                # 검색 결과 처리 및 상태 업데이트
-                if result:
-                    status_msg = f"상품 발견: 페이지 {result['page']}, " + \
-                               (f"광고 순위 {result['rank']}" if result['rank_type'] == 'ad' else f"일반 순위 {result['rank']}") + \
-                               f", 전체 순위 {result['page_rank']}"
-                    emit_log(status_msg)
-                    socketio.emit('search_status', {
-                        'status': 'searching',
-                        'current': current_number,
-                        'total': total_items,
-                        'keyword': keyword,
-                        'message': status_msg
-                    })
-                    
-                    rank_df.loc[index, 'page'] = result['page']
-                    rank_df.loc[index, 'rank'] = result['rank'] if result['rank_type'] != 'ad' else 0
-                    rank_df.loc[index, 'ad'] = 'O' if result['rank_type'] == 'ad' else '0'
-                    rank_df.loc[index, 'page_rank'] = result['page_rank']
-                else:
-                    emit_log("상품을 찾을 수 없습니다.")
-                    rank_df.loc[index, 'page'] = 0
-                    rank_df.loc[index, 'rank'] = 0
-                    rank_df.loc[index, 'ad'] = '0'
-                    rank_df.loc[index, 'page_rank'] = 0
-                
-                # 날짜와 시간 업데이트
-                rank_df.loc[index, 'date'] = datetime.now().strftime('%Y-%m-%d')
-                rank_df.loc[index, 'time'] = datetime.now().strftime('%H:%M:%S')
-                
-                # 결과 저장
-                rank_df.to_excel('coupang_rank.xlsx', index=False)
-                socketio.emit('refresh_page', {})
+                searched['keywords'] += 1
+                for item_id, product_id in job.rows:
+                    searched['items'] += 1
+                    searched['not_found'] += 0 if product_id in found else 1
+                    save_result(item_id, keyword, product_id, found.get(product_id))
+                sweep_state.finish_items(sweep_id, [item_id for item_id, _ in job.rows])
+                sweep_state.clear_keyword(sweep_id, keyword)
                 
+            except CancelledError:
+                # 검색 중지로 대기열에서 빠진 키워드
+                progress.cancelled = True
+                continue
             except Exception as e:
-                emit_log(f"검색 중 오류 발생: {str(e)}")
-                socketio.emit('search_status', {
+                emit_log(f"검색 결과 저장 중 오류 발생: {str(e)}")
+                event_bus.status({
                     'status': 'error',
-                    'current': current_number,
+                    'current': progress.completed,
                     'total': total_items,
                     'keyword': keyword,
                     'message': f'오류 발생: {str(e)}'
                 })
                 continue
         
+        # 다른 검색에 맡긴 항목은 그 검색이 결과를 저장했을 때만 완료 처리 (실패/취소되면 다음에 이어서 검색)
+        for existing, item_ids in deduplicated.items():
+            if progress.cancelled and not existing.future.done():
+                continue
+            try:
+                if existing.future.result():
+                    sweep_state.finish_items(sweep_id, item_ids)
+            except Exception:
+                # 취소되었거나 실패한 검색
+                continue
+        log_latency(latency_probe.end('sweep'))
+        record_sweep(progress, searched, browser_launches_total.value() - launches_before)
+        
+        if progress.cancelled:
+            # 서버 종료로 멈춘 검색은 다음 서버 시작 때 자동으로, 중지 버튼으로 멈춘 검색은 다음 검색 시작 때 이어서 검색
+            sweep_state.set_status(sweep_id, 'interrupted' if server_stopping else 'stopped')
+            search_active = False
+            emit_log(f"\n=== 검색이 중지되었습니다 (남은 {len(sweep_state.remaining(sweep_id))}개 항목은 다음에 이어서 검색) ===")
+            event_bus.status({
+                'status': 'waiting',
+                'current': progress.completed,
+                'total': total_items,
+                'keyword': '',
+                'message': '검색이 중지되었습니다'
+            })
+            return
+        
         # 5. 검색 완료
+        sweep_state.set_status(sweep_id, 'completed')
+        sweep_state.prune()
         search_active = False
         emit_log("\n=== 모든 검색이 완료되었습니다 ===")
-        socketio.emit('search_status', {
+        emit_log(f"스크롤 통계: {scroll_metrics.summary()}")
+        emit_log(f"검색 결과 캐시: {serp_cache.stats()}")
+        page_loads = page_load_metrics.summary()
+        emit_log(f"페이지 로드 통계: {page_loads['pages_loaded']}회 로드, "
+                 f"순서대로 검색 대비 {page_loads['pages_saved']}회 절약 "
+                 f"(힌트 사용 키워드 {page_loads['hinted']}개 중 {page_loads['hint_hits']}개 주변 페이지에서 발견)")
+        event_bus.status({
             'status': 'completed',
             'current': total_items,
             'total': total_items,
@@ -313,8 +553,11 @@ def perform_search():
         
     except Exception as e:
         emit_log(f"검색 프로���스 오류: {str(e)}")
+        sweeps_total.inc(outcome='error')
+        if sweep_id is not None:
+            sweep_state.set_status(sweep_id, 'interrupted')
         search_active = False
-        socketio.emit('search_status', {
+        event_bus.status({
             'status': 'error',
             'current': 0,
             'total': 0,
@@ -322,20 +565,23 @@ def perform_search():
             'message': f'검색 프로세스 오류: {str(e)}'
         })
 
+def log_latency(latency):
+    """전체 검색 중 허브 지연 요약 기록 (기준을 넘으면 경고)"""
+    emit_log(f"허브 지연: 최대 {latency['lag_max_ms']}ms (95% {latency['lag_p95_ms']}ms), "
+             f"ping 왕복 최대 {latency['rtt_max_ms']}ms ({latency['rtt_samples']}회), "
+             f"기준 {latency['threshold_ms']:.0f}ms",
+             level='INFO' if latency['ok'] else 'WARNING')
+
 @app.route("/")
 def index():
     try:
-        df = load_excel()
-        if df is not None:
-            data = df.to_dict('records')
-            # 최근 100개의 로그만 전달
-            recent_logs = log_messages[-100:] if log_messages else []
-            return render_template('template.html', 
-                                title="Coupang Rank Search",
-                                message="Welcome to Coupang Rank Search Service",
-                                data=data,
-                                log_messages=recent_logs)
-        return "엑셀 파일을 읽을 수 없습니다."
+        # 순위표 행은 페이지에서 /api/rows 로 필요한 만큼만 가져감
+        # 최근 100개의 로그만 전달
+        recent_logs = log_writer.recent_messages(100)
+        return render_template('template.html', 
+                            title="Coupang Rank Search",
+                            message="Welcome to Coupang Rank Search Service",
+                            log_messages=recent_logs)
     except Exception as e:
         emit_log(f"인덱스 페이지 로드 중 오류: {str(e)}")
         return str(e)
@@ -344,261 +590,332 @@ def index():
 def handle_connect():
     """클라이언트 연결 시 기존 로그 전송"""
     # 최근 100개의 로그만 전송
-    recent_logs = log_messages[-100:] if log_messages else []
-    for message in recent_logs:
-        emit('log_message', {'message': message})
+    event_bus.backlog(log_writer.recent_messages(100))
+
+@socketio.on('latency_ping')
+def handle_latency_ping(data=None):
+    """ping 왕복 시간 측정용 (ack 만 돌려줌)"""
+    return True
+
+@socketio.on('latency_report')
+def handle_latency_report(data):
+    """브라우저/latency_probe.py 가 잰 ping 왕복 시간 기록"""
+    try:
+        latency_probe.record_rtt(float(data['rtt']))
+    except (KeyError, TypeError, ValueError):
+        pass
+
+@app.route("/latency", methods=['GET'])
+def latency_stats():
+    """허브 지연 / ping 왕복 시간 통계 (seconds 를 주면 최근 N초만)"""
+    try:
+        seconds = request.args.get('seconds')
+        since = time.time() - float(seconds) if seconds else None
+        return jsonify({"status": "success", "stats": latency_probe.summary(since)})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/event_stats", methods=['GET'])
+def event_stats():
+    """Socket.IO 이벤트 전송 통계"""
+    return jsonify({"status": "success", "stats": event_bus.stats(), "log_dropped": log_writer.dropped})
+
+@app.route("/metrics", methods=['GET'])
+def prometheus_metrics():
+    """Prometheus 수집용 지표 (text exposition format)"""
+    try:
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        return Response(str(e), status=500, mimetype='text/plain')
+
+@app.route("/metrics/sweep", methods=['GET'])
+def sweep_summary():
+    """마지막 전체 검색 요약 (단계별 시간 포함)"""
+    return jsonify({"status": "success", "summary": last_sweep_summary})
+
+@app.route("/schedule", methods=['GET'])
+def schedule_stats():
+    """항목별 검색 주기 현황 (주기별 항목 수, 밀린 항목, 시간당 검색 수, 다음 검색 예정)"""
+    try:
+        return jsonify({"status": "success", "stats": item_scheduler.stats()})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/sweep_state", methods=['GET'])
+def sweep_state_summary():
+    """이어서 검색할 수 있는 전체 검색 (없으면 마지막 전체 검색) 의 진행 상태"""
+    try:
+        sweep = sweep_state.unfinished() or sweep_state.last()
+        summary = sweep_state.summary(sweep['id']) if sweep else None
+        if summary:
+            age = (datetime.now() - datetime.strptime(summary['updated_at'], '%Y-%m-%d %H:%M:%S')).total_seconds()
+            summary['resumable'] = summary['status'] in UNFINISHED and age < SWEEP_RESUME_MAX_AGE * 3600
+        return jsonify({"status": "success", "sweep": summary})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/search_queue", methods=['GET'])
+def search_queue_stats():
+    """검색 대기열 상태 (레인별 대기 수/가장 오래 기다린 시간, 실행 중인 작업)"""
+    try:
+        return jsonify({"status": "success", "stats": search_queue.stats()})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/search_workers", methods=['GET'])
+def search_worker_stats():
+    """검색 워커 상태 (진행 중인 키워드/페이지, 강제 종료·재시작 횟수)"""
+    try:
+        return jsonify({"status": "success", "stats": search_runner.stats()})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/capture_rank", methods=['GET'])
+def capture_rank():
+    """저장된 검색 결과에서 상품 순위 조회 (keyword, product_id, since, until)
+
+    검색 1회마다 found(나왔는지) 와 coverage(complete: 앞 페이지를 빠짐없이 저장함 / partial: 빠진 페이지가 있음) 포함
+    """
+    try:
+        if serp_capture is None:
+            return jsonify({"status": "error", "message": "검색 결과 저장(SERP_CAPTURE)이 꺼져 있습니다."})
+        args = request.args
+        keyword = args.get('keyword', '').strip()
+        product_id = args.get('product_id', '').strip()
+        if not keyword or not product_id:
+            return jsonify({"status": "error", "message": "keyword 와 product_id 가 필요합니다."})
+        results = blocking(serp_capture.lookup, keyword, product_id,
+                           since=args.get('since') or None,
+                           until=args.get('until') or None,
+                           limit=max(1, min(int(args.get('limit', 500)), 5000)))
+        return jsonify({"status": "success", "results": results, "stats": blocking(serp_capture.stats)})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/serp_cache", methods=['GET'])
+def serp_cache_stats():
+    """검색 결과 캐시 통계"""
+    try:
+        return jsonify({"status": "success", "stats": serp_cache.stats()})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/serp_cache/clear", methods=['POST'])
+def clear_serp_cache():
+    """검색 결과 캐시 비우기 (keyword 를 주면 그 키워드만)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        serp_cache.clear(data.get('keyword'))
+        return jsonify({"status": "success"})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/api/rows", methods=['GET'])
+def api_rows():
+    """순위표 행 목록 (page, per_page, sort, order, keyword, product_id 쿼리 지원, ETag 로 변경 없으면 304)"""
+    try:
+        args = request.args
+        result = rank_table.query(
+            page=args.get('page', 1),
+            per_page=args.get('per_page', 50),
+            sort=args.get('sort', 'number'),
+            order=args.get('order', 'asc'),
+            keyword=args.get('keyword', ''),
+            product_id=args.get('product_id', '')
+        )
+        etag = result.pop('etag')
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = jsonify(dict(result, status="success"))
+        response.set_etag(etag)
+        # 브라우저가 매번 ETag 로 다시 확인하도록
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/api/rows/<int:item_id>", methods=['GET'])
+def api_row(item_id):
+    """행 1개를 JSON 으로 반환"""
+    row = rank_table.get(item_id)
+    if row is None:
+        return jsonify({"status": "error", "message": "항목을 찾을 수 없습니다."}), 404
+    return jsonify({"status": "success", "row": row, "version": rank_table.version})
+
+@app.route("/api/rows/changes", methods=['GET'])
+def api_row_changes():
+    """since 버전 이후에 바뀐 행만 반환 (재연결 시 놓친 row_updated 보충용)"""
+    try:
+        since = int(request.args.get('since', 0))
+        return jsonify(dict(rank_table.changes(since), status="success"))
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
 
 @app.route("/update", methods=['POST'])
 def update_excel():
     """웹페이지에서 데이터 수정"""
     try:
         data = request.json
-        df = load_excel()
-        if df is not None:
-            row_index = int(data['index'])
-            column = data['column']
-            value = data['value'] if data['value'] != '' else ''  # 빈 문자열 처리
-            
-            # NaN 방지를 위한 처리
-            if column in ['page', 'rank', 'page_rank']:
-                value = 0 if value == '' else int(value)
-            elif column == 'ad':
-                value = '0' if value == '' else value
-                
-            df.at[row_index, column] = value
-            df.to_excel('coupang_rank.xlsx', index=False)
-            return jsonify({"status": "success"})
+        item_id = int(data['id'])
+        rank_table.update_item(item_id, data['column'], data['value'])
+        if data['column'] == 'check_interval':
+            # 새 주기 안에서 다음 검색 시각을 다시 정함
+            item_scheduler.reschedule(item_id)
+        row = rank_table.get(item_id)
+        if row is not None:
+            event_bus.emit('row_updated', dict(row, version=rank_table.version))
+        return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
+@app.route("/export_excel", methods=['GET'])
+def export_excel():
+    """순위표를 엑셀 파일로 내려받기"""
+    try:
+        buffer = io.BytesIO()
+        with xlsx_seconds.time(operation='export'):
+            blocking(rank_store.export_excel, buffer)
+        buffer.seek(0)
+        return send_file(buffer, as_attachment=True, download_name='coupang_rank.xlsx')
+    except Exception as e:
+        return str(e)
+
+@app.route("/import_excel", methods=['POST'])
+def import_excel():
+    """엑셀 파일의 행들을 순위표에 추가"""
+    try:
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({"status": "error", "message": "엑셀 파일이 없습니다."})
+        path = os.path.join(LOG_DIR, 'import_upload.xlsx')
+        upload.save(path)
+        # DB 에 직접 넣으면 순위표는 DB 파일이 바뀐 것을 보고 다시 읽음
+        with xlsx_seconds.time(operation='import'):
+            count = blocking(rank_store.import_excel, path)
+        os.remove(path)
+        emit_log(f"엑셀 파일에서 {count}개 항목을 가져왔습니다.")
+        return jsonify({"status": "success", "count": count})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+def index_logs():
+    """새로 추가된 로그를 검색 색인에 반영"""
+    try:
+        blocking(log_search.update)
+    except Exception as e:
+        emit_log(f"로그 색인 중 오류: {str(e)}", level='ERROR')
+
+def resume_interrupted_sweep():
+    """서버가 죽거나 다시 시작되어 끝나지 못한 전체 검색이 있으면 남은 항목부터 이어서 시작 (서버 시작 시 1회)"""
+    global search_active
+    try:
+        sweep_state.mark_interrupted()
+        sweep_state.abandon_older_than(SWEEP_RESUME_MAX_AGE)
+        unfinished = sweep_state.unfinished()
+        if not SWEEP_AUTO_RESUME or unfinished is None or unfinished['status'] != 'interrupted':
+            return
+        emit_log(f"중단된 전체 검색 #{unfinished['id']} 을(를) 이어서 시작합니다.")
+        search_active = True
+        socketio.start_background_task(perform_search, unfinished['lane'], True)
+    except Exception as e:
+        emit_log(f"중단된 전체 검색 확인 중 오류: {str(e)}", level='ERROR')
+
 def start_scheduler():
     """스케줄러 시작"""
     if not scheduler.running:
-        scheduler.add_job(scheduled_search, 'interval', hours=1, id='scheduled_search')
+        # 매시간 전체를 한꺼번에 검색하지 않고 검색할 차례가 된 항목만 조금씩 대기열에 넣음
+        # (작업 저장소에 남아 있는 같은 id 의 작업은 지금 설정으로 교체, 서버가 꺼져 있던 동안 밀린 실행은 1번만)
+        scheduler.add_job(dispatch_due_items, 'interval', seconds=SCHEDULE_TICK, id='dispatch_due_items',
+                          max_instances=1, coalesce=True, replace_existing=True)
+        # 로그 검색 색인은 미리 조금씩 반영해둬서 검색할 때 기다리지 않도록
+        scheduler.add_job(index_logs, 'interval', minutes=5, id='index_logs', coalesce=True, replace_existing=True)
         scheduler.start()
         emit_log("스케줄러가 시작되었습니다.")
 
 # -*- coding: utf-8 -*-
  
 
-def smooth_scroll(browser):
-    """사람처럼 천천히 스크롤하는 함수"""
-    # 현재 화면 높이 가져오기
-    screen_height = browser.execute_script("return window.innerHeight")
-    # 전체 문서 높이 가져오기
-    total_height = browser.execute_script("return document.body.scrollHeight")
-    
-    current_scroll = 0
-    scroll_increment = screen_height // 4  # 한 번에 스크롤할 높이 (화면 높이의 1/4)
-    
-    print("이지 스크롤 중...")
-    while current_scroll < total_height:
-        # 다음 스크롤 위치 계산
-        next_scroll = min(current_scroll + scroll_increment, total_height)
-        
-        # 드럽게 스크롤
-        browser.execute_script(f"window.scrollTo({current_scroll}, {next_scroll});")
-        current_scroll = next_scroll
-        
-        # 랜덤한 시간 대기 (0.5~1.5초)
-        time.sleep(random.uniform(0.5, 1.5))
-        
-        # 새로운 컨텐츠 로딩을 위한 대기
-        new_height = browser.execute_script("return document.body.scrollHeight")
-        if new_height > total_height:
-            total_height = new_height
-
-def analyze_page(soup, page, product_id):
-    """페이지 을 분석하여 상품 찾기"""
-    products = soup.select('.search-product')
-    non_ad_rank = 0
-    ad_rank = 0
-    ad_count = 0
-    
-    for product in products:
-        # 광고 상품 체크
-        is_ad = 'search-product__ad' in product.get('class', [])
-        
-        if is_ad:
-            ad_count += 1
-            ad_rank += 1
-        else:
-            non_ad_rank += 1
-        
-        # 상품 보 추출
-        product_link = product.select_one('a.search-product-link')
-        if not product_link:
-            continue
-        
-        current_name = product.select_one('.name')
-        if not current_name:
-            continue
-        
-        current_name = current_name.text.strip()
-        current_url = product_link.get('href', '')
-        current_id = current_url.split('/')[-1].split('?')[0]
-        
-        # 목록 상 확인
-        if product_id == current_id:
-            print("\n[상품 발견!]")
-            print(f"페이지: {page}")
-            
-            # 광고 상품인 경우
-            if is_ad:
-                print(f"광고 순위: {ad_rank}")
-                rank_type = "ad"
-                rank_value = ad_rank
-            else:
-                print(f"일반 순위: {non_ad_rank}")
-                rank_type = "normal"
-                rank_value = non_ad_rank
-                
-            if ad_count > 0:
-                print(f"광고 상품 수: {ad_count}개")
-            print(f"상품명: {current_name}")
-            print(f"상품 ID: {current_id}")
-            print(f"URL: https://www.coupang.com{current_url}")
-            
-            # 전체 페이지 순위 계산 (36개 기준)
-            page_rank = ((page - 1) * 36) + rank_value
-            
-            return {
-                'page': page,
-                'rank': rank_value,
-                'rank_type': rank_type,
-                'page_rank': page_rank,
-                'ad_count': ad_count,
-                'name': current_name,
-                'id': current_id,
-                'url': f"https://www.coupang.com{current_url}"
-            }
-    
-    return None
+@metrics.collector
+def collect_runtime_metrics():
+    """/metrics 응답 직전에 다른 객체의 현재 상태를 지표로 옮김"""
+    search_active_gauge.set(1 if search_active else 0)
+    hub_lag_gauge.set(latency_probe.summary(time.time() - 60)['lag_max_ms'])
+    for lane, queued in search_queue.stats()['lanes'].items():
+        queue_depth_gauge.set(queued['depth'], lane=lane)
+        queue_age_gauge.set(queued['oldest_age'], lane=lane)
+    schedule = item_scheduler.stats()
+    schedule_due_gauge.set(schedule['due'])
+    schedule_rate_gauge.set(schedule['checks_per_hour'])
+    worker_stats = search_runner.stats()
+    for event in ('timeouts', 'crashes', 'spawned', 'recycled', 'failed'):
+        if event in worker_stats:
+            search_worker_events.set(worker_stats[event], event=event)
+
+def record_search_stats(stats, sweep=False):
+    """검색 1회 통계를 스크롤 통계와 /metrics 지표에 합산
+
+    페이지 로드 통계와 단계별 시간 요약은 전체 검색 1회 단위이므로 전체 검색(sweep)의 검색만 합산한다.
+    (전체 검색 중에 끝난 즉시/예약 검색이 전체 검색 요약에 섞이지 않도록)
+    """
+    scroll_metrics.add(stats['scroll_time'], stats['wait_time'], pages=stats['scroll_pages'])
+    if sweep:
+        page_load_metrics.add(stats['pages_loaded'], stats['sequential_pages'], stats['hinted'], stats['hint_hit'])
+        phase_timings.add_spans(stats['spans'])
+    for phase, durations in stats['spans'].items():
+        for seconds in durations:
+            search_phase_seconds.observe(seconds, phase=phase)
+    pages_loaded_total.inc(stats['pages_loaded'])
+    browser_launches_total.inc(stats['browser_launches'])
+    serp_cache.add_counts(stats['cache'])
+
+def record_sweep(progress, searched, browser_launches):
+    """전체 검색 1회 요약을 지표에 반영하고 로그/대시보드로 전송"""
+    global last_sweep_summary
+    duration = max(time.time() - phase_timings.started, 0.001)
+    pages = page_load_metrics.summary()['pages_loaded']
+    summary = {
+        'outcome': 'cancelled' if progress.cancelled else 'completed',
+        'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'duration': round(duration, 1),
+        'keywords': searched['keywords'],
+        'items': searched['items'],
+        'pages_loaded': pages,
+        'pages_per_sec': round(pages / duration, 2),
+        'keywords_per_sec': round(searched['keywords'] / duration, 3),
+        'not_found_rate': round(searched['not_found'] / searched['items'], 3) if searched['items'] else 0.0,
+        'browser_launches': browser_launches,
+        'phases': phase_timings.summary()
+    }
+    last_sweep_summary = summary
+    sweeps_total.inc(outcome=summary['outcome'])
+    sweep_seconds.observe(duration)
+    for stat in ('duration', 'pages_per_sec', 'keywords_per_sec', 'not_found_rate', 'browser_launches'):
+        last_sweep_gauge.set(summary[stat], stat=stat)
 
-def search_product(keyword, product_id):
-    """쿠팡에서 품을 검색하고 순위를 찾는 함수"""
-    browser = None
+    slowest = ', '.join(f"{phase} {timing['total']}초" for phase, timing in list(summary['phases'].items())[:5])
+    emit_log(f"검색 요약: {summary['duration']}초, 키워드 {summary['keywords']}개 ({summary['keywords_per_sec']}개/초), "
+             f"페이지 {pages}회 ({summary['pages_per_sec']}페이지/초), 못 찾은 비율 {summary['not_found_rate']:.1%}, "
+             f"브라우저 실행 {browser_launches}회, 단계별 시간: {slowest or '없음'}")
+    event_bus.emit('sweep_summary', summary)
+
+def load_hints(keyword, product_ids):
+    """순위 기록에서 상품별 마지막 발견 페이지 (힌트를 쓰지 않으면 빈 dict)"""
+    if not SEARCH_USE_HINTS:
+        return {}
     try:
-        emit_log(f"검색 시작: 키워드 '{keyword}', 상품 ID '{product_id}'")
-        
-        # 브라우저 설정
-        options = webdriver.ChromeOptions()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-software-rasterizer")
-        options.add_argument("--ignore-certificate-errors")
-        options.add_argument("--window-size=1920x1080")
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36")
-        
-        # ChromeDriver 설정 - 단순화된 방식으로 변경
-        service = Service()
-        browser = webdriver.Chrome(service=service, options=options)
-        browser.maximize_window()
-        
-        encoded_keyword = urllib.parse.quote(keyword)
-        base_url = f'https://www.coupang.com/np/search?component=&q={encoded_keyword}&channel=user'
-        
-        page = 1
-        rank = 0
-        
-        while page <= 27:
-            try:
-                emit_log(f"\n{page}페이지 검색 중...")
-                url = f"{base_url}&page={page}"
-                
-                browser.delete_all_cookies()
-                browser.get(url)
-                
-                # 페이지 로딩 대기
-                WebDriverWait(browser, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "search-product"))
-                )
-                
-                # 천천히 스크롤
-                time.sleep(2)
-                smooth_scroll(browser)
-                
-                # 페이지 소스 분석
-                soup = BeautifulSoup(browser.page_source, 'html.parser')
-                result = analyze_page(soup, page, product_id)
-                
-                if result:
-                    emit_log(f"상품 발견! 페이지: {page}")
-                    return result
-                
-                # 다음 페이지로 이동
-                if page < 27:
-                    try:
-                        products = browser.find_elements(By.CSS_SELECTOR, ".search-product:not(.search-product__ad-label)")
-                        
-                        if products:
-                            browser.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", products[-1])
-                            time.sleep(2)
-                        
-                        next_page = WebDriverWait(browser, 10).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, f"a.page-link[href*='page={page + 1}']"))
-                        )
-                        
-                        browser.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", next_page)
-                        time.sleep(2)
-                        
-                        next_page.click()
-                        time.sleep(3)
-                        
-                    except Exception as e:
-                        emit_log(f"페이지 이동 중 오류: {str(e)}")
-                        page += 1
-                        continue
-                
-                page += 1
-                
-            except Exception as e:
-                emit_log(f"페이지 {page} 검색 중 오류: {str(e)}")
-                if browser:
-                    browser.quit()
-                browser = webdriver.Chrome(service=service, options=options)
-                browser.maximize_window()
-                time.sleep(3)
-                continue
-        
-        emit_log("\n[검색 결과]")
-        emit_log(f"키워드: {keyword}")
-        emit_log(f"상품 ID: {product_id}")
-        emit_log("해당 상품을 찾을 수 없습니다. (27페이지 내)")
-        return None
-        
+        return rank_store.last_known_pages(keyword, product_ids)
     except Exception as e:
-        emit_log(f"검색 중 오류 발생: {str(e)}")
-        return None
-        
-    finally:
-        if browser:
-            browser.quit()
-            emit_log("브라우저 종료")
+        emit_log(f"순위 힌트 조회 실패: {str(e)}", level='WARNING', keyword=keyword)
+        return {}
+
 
 # 새로운 라우트 추가
 @app.route("/add_row", methods=['POST'])
 def add_row():
     try:
-        df = load_excel()
-        if df is not None:
-            new_row = {
-                'number': len(df) + 1,
-                'keyword': '',
-                'product_id': '',
-                'page': 0,
-                'rank': 0,
-                'ad': '0',
-                'page_rank': 0,
-                'date': '',
-                'time': ''
-            }
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            df.to_excel('coupang_rank.xlsx', index=False)
-            return jsonify({"status": "success"})
+        item_id = rank_table.add_item()
+        return jsonify({"status": "success", "id": item_id})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
@@ -606,11 +923,8 @@ def add_row():
 def delete_row():
     try:
         data = request.json
-        df = load_excel()
-        if df is not None:
-            df.drop(index=int(data['index']), inplace=True)
-            df.to_excel('coupang_rank.xlsx', index=False)
-            return jsonify({"status": "success"})
+        rank_table.delete_item(int(data['id']))
+        return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
@@ -618,43 +932,55 @@ def delete_row():
 def search_now():
     try:
         data = request.json
-        df = load_excel()
-        if df is not None:
-            row = df.iloc[int(data['index'])]
-            # 백그라운드에서 검색 실행
-            scheduler.add_job(
-                perform_single_search,  # 새로운 함수 사용
-                args=[row['keyword'], row['product_id'], int(data['index'])],
-                id=f"immediate_search_{data['index']}"
-            )
-            return jsonify({"status": "success"})
+        item = rank_table.get(int(data['id']))
+        if item is None:
+            return jsonify({"status": "error", "message": "항목을 찾을 수 없습니다."})
+        item_id = item['id']
+        keyword = str(item['keyword']).strip()
+        product_id = str(item['product_id']).strip()
+        # 즉시 검색 레인에 넣음 (진행 중인 전체 검색의 남은 키워드보다 먼저 실행)
+        job, _ = search_queue.submit('interactive', keyword, [(item_id, product_id)],
+                                     lambda job: search_rows(job.keyword, job.rows, mode='single'))
+        if job is None:
+            # 이미 대기 중이면 그 작업이 즉시 검색 레인으로 올라가 있음
+            existing = search_queue.job_of(item_id)
+            if existing is None or existing.started_at is not None:
+                return jsonify({"status": "success", "queued": False, "message": "이미 검색 중인 항목입니다."})
+            job = existing
+        return jsonify({"status": "success", "queued": True, "ahead": search_queue.ahead_of(job)})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
-def perform_single_search(keyword, product_id, index):
-    """단일 항목 검색을 수행하는 함수"""
+def search_rows(keyword, rows, mode='single'):
+    """즉시/예약 검색: 한 키워드의 항목들을 검색해서 저장 (전체 검색 진행 상황과 무관), 저장했으면 True"""
+    product_ids = {product_id for _, product_id in rows}
+    started = time.time()
     try:
-        df = load_excel()
-        if df is not None:
-            result = search_product(keyword, product_id)
-            
-            df.loc[index, 'date'] = datetime.now().strftime('%Y-%m-%d')
-            df.loc[index, 'time'] = datetime.now().strftime('%H:%M:%S')
-            
-            if result:
-                df.loc[index, 'page'] = result['page']
-                df.loc[index, 'rank'] = float(result['rank']) if result['rank_type'] != 'ad' else None
-                df.loc[index, 'ad'] = 'O' if result['rank_type'] == 'ad' else None
-                df.loc[index, 'page_rank'] = float(result['page_rank'])
-            else:
-                df.loc[index, 'page'] = None
-                df.loc[index, 'rank'] = 999
-                df.loc[index, 'ad'] = None
-                df.loc[index, 'page_rank'] = 999
-            
-            df.to_excel('coupang_rank.xlsx', index=False)
+        found, stats = search_runner.submit(keyword, product_ids, hints=load_hints(keyword, product_ids)).result()
     except Exception as e:
-        emit_log(f"단일 검색 중 오류 발생: {str(e)}")
+        # 실패/취소된 항목은 잠시 뒤 다시 검색
+        keywords_searched_total.inc(outcome='cancelled' if isinstance(e, SearchCancelled) else 'error')
+        item_scheduler.retry_later([item_id for item_id, _ in rows])
+        emit_log(f"{'단일' if mode == 'single' else '예약'} 검색 중 오류 발생: {keyword} {str(e)}", keyword=keyword)
+        return False
+    record_search_stats(stats)
+    keyword_search_seconds.observe(time.time() - started, mode=mode)
+    keywords_searched_total.inc(outcome='done')
+    for item_id, product_id in rows:
+        result = found.get(product_id)
+        products_searched_total.inc(result='found' if result else 'not_found')
+        save_result(item_id, keyword, product_id, result)
+    return True
+
+def save_result(item_id, keyword, product_id, result):
+    """검색 결과 1건 저장 + 다음 검색 시각/자동 주기 갱신 후 화면에 반영"""
+    with rank_write_seconds.time():
+        values = rank_table.record_result(item_id, keyword, product_id, result)
+    try:
+        values.update(item_scheduler.checked(item_id) or {})
+    except Exception as e:
+        emit_log(f"다음 검색 시각 저장 실패: {str(e)}", level='WARNING', keyword=keyword, product_id=product_id)
+    event_bus.emit('row_updated', values)
 
 @app.route("/start_search", methods=['POST'])
 def start_search():
@@ -665,45 +991,49 @@ def start_search():
             emit_log("이미 검색이 진행 중입니다.")
             return jsonify({"status": "error", "message": "이미 검색이 진행 중입니다."})
         
-        # 검색 시작 전 엑셀 데이터 확인
-        df = load_excel()
-        if df is None:
-            emit_log("엑셀 파일을 읽을 수 없습니다.")
-            return jsonify({"status": "error", "message": "엑셀 파일을 읽을 수 없습니다."})
+        # 보충(backfill) 레인으로 시작하면 즉시/정기 검색이 없을 때만 진행
+        # 중단된 전체 검색이 있으면 남은 항목만 이어서 검색 (restart 이면 처음부터)
+        options = request.get_json(silent=True) or {}
+        lane = options.get('lane', 'scheduled')
+        resume = not options.get('restart', False)
+        if lane not in ('scheduled', 'backfill'):
+            return jsonify({"status": "error", "message": f"알 수 없는 검색 레인: {lane}"})
         
-        # 유효한 데이터 확인
-        valid_df = df[
-            df['keyword'].notna() & (df['keyword'].str.strip() != '') &
-            df['product_id'].notna() & (df['product_id'].str.strip() != '')
-        ]
+        # 검색 시작 전 유효한 데이터 확인
+        valid_rows = rank_table.valid_rows()
         
-        if len(valid_df) == 0:
+        if len(valid_rows) == 0:
             emit_log("검색할 유효한 데이터가 없습니다. 키워드와 상품 ID를 확인해주세요.")
             return jsonify({"status": "error", "message": "검색할 데이터가 없습니다."})
         
         # 검색 시작
         search_active = True
-        emit_log(f"\n=== 검색 시작 (총 {len(valid_df)}개 항목) ===")
+        emit_log(f"\n=== 검색 시작 (총 {len(valid_rows)}개 항목) ===")
         
         # 초기 상태 업데이트
-        first_keyword = str(valid_df.iloc[0]['keyword'])
-        socketio.emit('search_status', {
+        first_keyword = str(valid_rows[0]['keyword'])
+        event_bus.status({
             'status': 'initializing',
             'current': 0,
-            'total': len(valid_df),
+            'total': len(valid_rows),
             'keyword': first_keyword,
-            'message': f'검색 초기화 중... (총 {len(valid_df)}개 항목)'
+            'message': f'검색 초기화 중... (총 {len(valid_rows)}개 항목)'
         })
         
-        # 백그라운드에서 검색 행
-        eventlet.spawn(perform_search)
-        return jsonify({"status": "success", "message": f"검색을 시작합니다. (총 {len(valid_df)}개 항목)"})
+        # 백그라운드에서 검색 실행
+        sweep_state.abandon_older_than(SWEEP_RESUME_MAX_AGE)
+        unfinished = sweep_state.unfinished() if resume else None
+        remaining = len(sweep_state.remaining(unfinished['id'])) if unfinished else 0
+        socketio.start_background_task(perform_search, lane, resume)
+        if unfinished:
+            return jsonify({"status": "success", "message": f"중단된 검색을 이어서 시작합니다. (남은 {remaining}개 항목)"})
+        return jsonify({"status": "success", "message": f"검색을 시작합니다. (총 {len(valid_rows)}개 항목)"})
         
     except Exception as e:
         search_active = False
         error_msg = f"검색 시작 중 오류 발생: {str(e)}"
         emit_log(error_msg)
-        socketio.emit('search_status', {
+        event_bus.status({
             'status': 'error',
             'current': 0,
             'total': 0,
@@ -721,7 +1051,12 @@ def stop_search():
             return jsonify({"status": "error", "message": "진행 중인 검색이 없습니다."})
             
         search_active = False
-        socketio.emit('search_status', {'status': 'waiting'})
+        # 이 전체 검색의 대기 중인 키워드는 바로 취소, 검색 중인 워커는 다음 페이지로 넘어갈 때 중단
+        # (즉시 검색과 항목별 예약 검색은 대기 중이든 실행 중이든 그대로 둠)
+        search_queue.cancel(('scheduled', 'backfill'), tag='sweep')
+        if current_sweep is not None:
+            search_runner.cancel(current_sweep.searches)
+        event_bus.status({'status': 'waiting'})
         emit_log("\n=== 검색이 중지되었습니다 ===")
         return jsonify({"status": "success"})
     except Exception as e:
@@ -742,32 +1077,98 @@ def get_logs():
 
 @app.route("/view_log/<filename>")
 def view_log(filename):
-    """특정 로그 파일 내용 표시"""
+    """특정 로그 파일 내용 표시 (마지막 부분만 먼저 보여주고 나머지는 /api/logs 로 읽음)
+
+    ?line=N 이면 N번째 줄(0부터)부터 표시 (로그 검색 결과에서 이동할 때)
+    """
     try:
-        log_path = os.path.join(LOG_DIR, filename)
-        if os.path.exists(log_path):
-            with open(log_path, 'r', encoding='utf-8') as f:
-                logs = f.readlines()
-            return render_template('log_viewer.html', 
-                                logs=logs, 
-                                filename=filename)
-        return "로그 파일을 찾을 수 없습니다."
+        line = request.args.get('line')
+        if line is not None:
+            logs = blocking(lambda: log_reader.read_range(filename, log_reader.offset_of_line(filename, int(line)), 500))
+        else:
+            logs = blocking(log_reader.tail, filename, 500)
+        return render_template('log_viewer.html', 
+                            logs=logs['lines'], 
+                            offset=logs['offset'],
+                            next_offset=logs['next_offset'],
+                            filename=filename)
+    except Exception as e:
+        return str(e)
+
+@app.route("/api/logs/<filename>", methods=['GET'])
+def api_log_lines(filename):
+    """로그 파일 범위 읽기
+
+    tail=N          파일 끝 N줄
+    before=OFFSET   OFFSET 바로 앞 limit 줄 (이전 페이지)
+    offset=OFFSET   OFFSET 부터 limit 줄 (다음 페이지)
+    line=N          N번째 줄(0부터)부터 limit 줄
+    time=T          시각이 T('YYYY-MM-DD HH:MM:SS' 또는 앞부분) 이후인 첫 줄부터 limit 줄
+    """
+    try:
+        args = request.args
+        limit = max(1, min(int(args.get('limit', 500)), 5000))
+        
+        def read():
+            if 'tail' in args:
+                return log_reader.tail(filename, max(1, min(int(args['tail']), 5000)))
+            if 'before' in args:
+                return log_reader.read_before(filename, int(args['before']), limit)
+            if 'line' in args:
+                return log_reader.read_range(filename, log_reader.offset_of_line(filename, int(args['line'])), limit)
+            if 'time' in args:
+                return log_reader.read_range(filename, log_reader.offset_of_time(filename, args['time']), limit)
+            return log_reader.read_range(filename, int(args.get('offset', 0)), limit)
+        
+        return jsonify(dict(blocking(read), status="success"))
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/search_logs", methods=['GET'])
+def search_logs():
+    """전체 로그 파일 검색 (q, keyword, product_id, errors=1, start, end, limit)"""
+    try:
+        args = request.args
+        results = blocking(
+            log_search.search,
+            text=args.get('q', ''),
+            keyword=args.get('keyword', ''),
+            product_id=args.get('product_id', ''),
+            errors=args.get('errors') in ('1', 'true'),
+            start=args.get('start') or None,
+            end=args.get('end') or None,
+            limit=max(1, min(int(args.get('limit', 200)), 2000))
+        )
+        return jsonify({"status": "success", "results": results, "index": blocking(log_search.stats)})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/download_log/<filename>")
+def download_log(filename):
+    """로그 파일 전체를 나눠서 스트리밍 다운로드"""
+    try:
+        log_reader.path(filename)  # 파일 이름 확인 (스트리밍 시작 전에 오류 반환)
+        response = Response(log_reader.stream(filename), mimetype='text/plain; charset=utf-8')
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
     except Exception as e:
         return str(e)
 
 @app.route("/stop_single_search", methods=['POST'])
 def stop_single_search():
-    """단일 검색 중지"""
+    """대기 중인 단일 검색 취소"""
     try:
         data = request.json
-        index = data['index']
-        job_id = f"immediate_search_{index}"
+        index = int(data['id'])
         
-        if scheduler.get_job(job_id):
-            scheduler.remove_job(job_id)
+        # 전체 검색의 키워드 작업은 다른 항목도 함께 들어 있으므로 개별로 취소하지 않음 (검색 중지 사용)
+        job = search_queue.job_of(index)
+        if job is not None and job.tag == 'sweep':
+            return jsonify({"status": "error", "message": "전체 검색에 포함된 항목은 검색 중지로만 멈출 수 있습니다."})
+        if search_queue.cancel_item(index, keep_tag='sweep'):
             emit_log(f"검색 항목 {index} 중단됨")
             return jsonify({"status": "success"})
-        return jsonify({"status": "error", "message": "진행 중인 검색이 없습니다."})
+        return jsonify({"status": "error", "message": "대기 중인 검색이 없습니다."})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
@@ -775,28 +1176,21 @@ def stop_single_search():
 def get_rank_history(product_id, date=None):
     """특정 상품의 시간별/일별 순위 이력 조회"""
     try:
-        df = load_excel()
-        if df is None:
-            return None
-            
-        # 해당 상품의 데이터만 필터링
-        product_df = df[df['product_id'] == product_id].copy()
-        
-        if date:
-            # 특정 날짜의 데이터만 필터링
-            product_df = product_df[product_df['date'] == date]
-            
-        # 날짜와 시간으로 정렬
-        product_df = product_df.sort_values(['date', 'time'], ascending=[False, False])
-        
-        # 결과 데이터 구성
+        # 순위 기록은 최신순으로 정렬되어 있음
         result = []
-        for _, row in product_df.iterrows():
+        for row in blocking(rank_store.history, product_id, date):
+            date_part, time_part = row['observed_at'].split(' ')
+            if not row['found']:
+                rank = '없음'
+            elif row['rank_type'] == 'ad':
+                rank = f"광고 {row['page_rank']}위"
+            else:
+                rank = row['rank']
             result.append({
-                'date': row['date'],
-                'time': row['time'],
+                'date': date_part,
+                'time': time_part,
                 'keyword': row['keyword'],
-                'rank': row['rank'] if row['ad'] != 'O' else f"광고 {row['page_rank']}위",
+                'rank': rank,
                 'page': row['page'],
                 'page_rank': row['page_rank']
             })
@@ -815,12 +1209,10 @@ def view_rank_history():
         product_id = data.get('product_id')
         date = data.get('date')  # 특정 날짜 조회 시
         
-        df = load_excel()
-        if df is None:
-            return jsonify({"status": "error", "message": "데이터를 읽을 수 없습니다."})
-            
         # 해당 상품 정보 가져오기
-        product_info = df[df['product_id'] == product_id].iloc[0]
+        product_info = rank_table.find_by_product(product_id)
+        if product_info is None:
+            return jsonify({"status": "error", "message": "상품을 찾을 수 없습니다."})
         
         # 순위 이력 조회
         rank_history = get_rank_history(product_id, date)
@@ -845,14 +1237,22 @@ if __name__ == "__main__":
         # 검색 상태 초기화
         search_active = False
         
+        # 처음 실행 시 기존 엑셀 데이터를 DB 로 가져오기
+        import_excel_if_empty()
+        
         print("""
 --------------------------------
     Hello, Rank Search
 --------------------------------
         """)
         
-        # 스케줄러 시작
+        # 스케줄러 / 이벤트 전송 시작
         start_scheduler()
+        event_bus.start()
+        latency_probe.start(socketio.start_background_task)
+        search_runner.start()
+        search_queue.start()
+        resume_interrupted_sweep()
         
         # SocketIO 서버 시작
         socketio.run(app, 
@@ -864,6 +1264,14 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"프로그램 실행 중 오류 발생: {str(e)}")
     finally:
+        # 진행 중인 전체 검색은 다음 서버 시작 때 이어서 검색
+        server_stopping = True
         search_active = False
         if scheduler.running:
             scheduler.shutdown()
+        latency_probe.stop()
+        search_queue.stop()
+        search_runner.stop()
+        event_bus.stop()
+        log_writer.close()
+        log_search.close()
@@ -8,12 +8,26 @@ from bs4 import BeautifulSoup
 import time
 import random
 import urllib.parse
-import pandas as pd
 from datetime import datetime
+from browser_pool import BrowserPool
+from rank_store import RankStore
+import os
 
 # -*- coding: utf-8 -*-
 print("안녕하세요")  # Non-ASCII 문자 (한글)
 
+_driver_path = None
+
+def chrome_service():
+    """ChromeDriver 자동 설치 (최초 1회) 및 서비스 생성"""
+    global _driver_path
+    if _driver_path is None:
+        _driver_path = ChromeDriverManager().install()
+    return Service(_driver_path)
+
+# 모든 검색에서 재사용하는 브라우저 (CLI는 순차 실행이므로 1개)
+browser_pool = BrowserPool(size=1, max_uses=50, service_factory=chrome_service)
+
 def smooth_scroll(browser):
     """사람처럼 천천히 스크롤하는 함수"""
     # 현재 화면 높이 가져오기
@@ -112,22 +126,8 @@ def search_product(keyword, product_id):
     """쿠팡에서 상품을 검색하고 순위를 찾는 함수"""
     browser = None
     try:
-        # 브라우저 설정
-        options = webdriver.ChromeOptions()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-software-rasterizer")
-        options.add_argument("--ignore-certificate-errors")
-        options.add_argument("--window-size=1920x1080")
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36")
-        
-        # ChromeDriver 자동 설치 및 서비스 설정
-        service = Service(ChromeDriverManager().install())
-        browser = webdriver.Chrome(service=service, options=options)
-        browser.maximize_window()
+        # 브라우저 풀에서 대여 (매번 새로 띄우지 않음)
+        browser = browser_pool.checkout()
         
         encoded_keyword = urllib.parse.quote(keyword)
         base_url = f'https://www.coupang.com/np/search?component=&q={encoded_keyword}&channel=user'
@@ -193,11 +193,10 @@ def search_product(keyword, product_id):
                 
             except Exception as e:
                 print(f"페이지 {page} 검색 중 오류: {str(e)}")
-                # 브라우저 재시작
-                if browser:
-                    browser.quit()
-                browser = webdriver.Chrome(service=service, options=options)
-                browser.maximize_window()
+                # 고장난 브라우저는 폐기하고 새 브라우저로 교체
+                # (새 브라우저를 띄우다 실패해도 종료한 브라우저를 finally 에서 다시 반납하지 않도록 먼저 비움)
+                broken, browser = browser, None
+                browser = browser_pool.replace(broken)
                 time.sleep(3)
                 continue
         
@@ -212,24 +211,26 @@ def search_product(keyword, product_id):
         return None
         
     finally:
-        if browser:
-            browser.quit()
+        if browser is not None:
+            browser_pool.checkin(browser)
 
 def main():
     try:
-        # coupang_rank.xlsx 파일 읽기
-        rank_df = pd.read_excel('coupang_rank.xlsx')
-        print("\n=== coupang_rank.xlsx 파일 읽기 성공 ===")
+        # 순위 DB 열기 (비어 있으면 coupang_rank.xlsx 에서 가져오기)
+        rank_store = RankStore()
+        if rank_store.is_empty() and os.path.exists('coupang_rank.xlsx'):
+            count = rank_store.import_excel('coupang_rank.xlsx')
+            print(f"\n=== coupang_rank.xlsx 에서 {count}개 항목 가져오기 성공 ===")
         
-        # number 순서대로 정렬
-        rank_df = rank_df.sort_values('number')
+        # number 순서대로 정렬된 항목
+        items = rank_store.items()
         
         # 각 행에 대해 검색 수행
-        for index, row in rank_df.iterrows():
-            keyword = str(row['keyword'])
-            product_id = str(row['product_id'])
+        for item in items:
+            keyword = str(item['keyword'])
+            product_id = str(item['product_id'])
             
-            print(f"\n=== 검색 {row['number']} 시작 ===")
+            print(f"\n=== 검색 {item['number']} 시작 ===")
             print(f"키워드: {keyword}")
             print(f"상품 ID: {product_id}")
             
@@ -237,26 +238,10 @@ def main():
             result = search_product(keyword, product_id)
             
             if result:
-                # 결과 업데이트
-                rank_df.loc[index, 'date'] = datetime.now().strftime('%Y-%m-%d')
-                rank_df.loc[index, 'time'] = datetime.now().strftime('%H:%M:%S')
-                rank_df.loc[index, 'page'] = result['page']
-                
-                # 광고/일반 순위 구분
-                if result['rank_type'] == 'ad':
-                    rank_df.loc[index, 'rank'] = None
-                    rank_df.loc[index, 'ad'] = 'O'  # 광고인 경우 'O'로 표시
-                else:
-                    rank_df.loc[index, 'rank'] = float(result['rank'])
-                    rank_df.loc[index, 'ad'] = None
-                
-                # 전체 페이지 순위 저장
-                rank_df.loc[index, 'page_rank'] = float(result['page_rank'])
-                
-                # 중간 결과 저장
-                rank_df.to_excel('coupang_rank.xlsx', index=False)
+                # 결과 저장 (마지막 결과 갱신 + 순위 기록 추가)
+                values = rank_store.record_result(item['id'], keyword, product_id, result)
                 print("\n검색이 완료되었습니다.")
-                print(f"시간: {rank_df.loc[index, 'time']}")
+                print(f"시간: {values['time']}")
                 print(f"페이지: {result['page']}")
                 if result['rank_type'] == 'ad':
                     print(f"광고 상품 (순위: {result['rank']})")
@@ -271,6 +256,8 @@ def main():
             
     except Exception as e:
         print(f"프로그램 실행 중 오류 발생: {str(e)}")
+    finally:
+        browser_pool.close_all()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,190 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from contextlib import contextmanager
+import threading
+import time
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36"
+
+
+def default_chrome_options():
+    """검색용 기본 크롬 옵션 생성"""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-software-rasterizer")
+    options.add_argument("--ignore-certificate-errors")
+    options.add_argument("--window-size=1920x1080")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    return options
+
+
+class BrowserPool:
+    """크롬 브라우저를 미리 띄워두고 재사용하는 풀
+
+    - checkout()/checkin() 으로 브라우저를 빌려주고 돌려받음
+    - 빌려줄 때 상태 확인(health check) 후 죽은 브라우저는 새로 띄움
+    - max_uses 번 사용된 브라우저는 종료 후 새로 띄움 (메모리 누수 방지)
+    - 돌려받을 때 쿠키/스토리지를 초기화해서 다음 검색에 흔적이 남지 않게 함
+    """
+
+    def __init__(self, size=2, max_uses=50, options_factory=None, service_factory=None, log=print):
+        self.size = size
+        self.max_uses = max_uses
+        self.options_factory = options_factory or default_chrome_options
+        self.service_factory = service_factory or Service
+        self.log = log
+
+        self._lock = threading.Condition()
+        self._idle = []        # 대기 중인 브라우저
+        self._uses = {}        # id(browser) -> 사용 횟수
+        self._created = 0      # 현재 살아있는 브라우저 수 (대여 중 포함)
+        self._closed = False
+
+        # 통계
+        self.launch_count = 0
+        self.recycle_count = 0
+
+    def _launch(self):
+        """새 크롬 브라우저 실행"""
+        browser = webdriver.Chrome(service=self.service_factory(), options=self.options_factory())
+        browser.maximize_window()
+        self.launch_count += 1
+        self._uses[id(browser)] = 0
+        return browser
+
+    def _quit(self, browser):
+        """브라우저 종료 (오류 무시)"""
+        self._uses.pop(id(browser), None)
+        try:
+            browser.quit()
+        except Exception as e:
+            self.log(f"브라우저 종료 중 오류: {str(e)}")
+
+    def _is_healthy(self, browser):
+        """브라우저가 응답하는지 확인"""
+        try:
+            return browser.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _reset(self, browser):
+        """다음 대여를 위해 쿠키/스토리지 초기화"""
+        try:
+            browser.delete_all_cookies()
+            browser.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+            # 여러 탭이 열려 있으면 첫 탭만 남김
+            handles = browser.window_handles
+            for handle in handles[1:]:
+                browser.switch_to.window(handle)
+                browser.close()
+            browser.switch_to.window(handles[0])
+            browser.get("about:blank")
+            return True
+        except Exception as e:
+            self.log(f"브라우저 초기화 실패: {str(e)}")
+            return False
+
+    def checkout(self, timeout=None, block=True):
+        """브라우저 대여 (풀이 가득 차 있으면 반납될 때까지 대기)
+
+        block=False 이면 즉시 빌릴 수 없을 때 None 반환
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("브라우저 풀이 종료되었습니다.")
+                if self._idle:
+                    browser = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    browser = None
+                    break
+                if not block:
+                    return None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("사용 가능한 브라우저가 없습니다.")
+                self._lock.wait(remaining)
+
+        # 브라우저 실행/상태 확인은 잠금 밖에서 수행
+        try:
+            if browser is not None and not self._is_healthy(browser):
+                self.log("응답 없는 브라우저를 새로 띄웁니다.")
+                self._quit(browser)
+                browser = None
+            if browser is None:
+                browser = self._launch()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+                self._lock.notify()
+            raise
+
+        self._uses[id(browser)] = self._uses.get(id(browser), 0) + 1
+        return browser
+
+    def checkin(self, browser, broken=False):
+        """브라우저 반납 (broken=True 이면 재사용하지 않고 종료)"""
+        if browser is None:
+            return
+        retire = broken or self._closed or self._uses.get(id(browser), 0) >= self.max_uses
+        if not retire and not self._reset(browser):
+            retire = True
+
+        if retire:
+            if not broken and not self._closed:
+                self.recycle_count += 1
+            self._quit(browser)
+            with self._lock:
+                self._created -= 1
+                self._lock.notify()
+            return
+
+        with self._lock:
+            self._idle.append(browser)
+            self._lock.notify()
+
+    def replace(self, browser):
+        """고장난 브라우저를 종료하고 새 브라우저를 대여"""
+        self.checkin(browser, broken=True)
+        return self.checkout()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """with 문으로 브라우저 대여/반납"""
+        browser = self.checkout(timeout=timeout)
+        broken = False
+        try:
+            yield browser
+        except Exception:
+            broken = not self._is_healthy(browser)
+            raise
+        finally:
+            self.checkin(browser, broken=broken)
+
+    def stats(self):
+        """풀 상태 반환"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'alive': self._created,
+                'idle': len(self._idle),
+                'launches': self.launch_count,
+                'recycles': self.recycle_count
+            }
+
+    def close_all(self):
+        """대기 중인 브라우저를 모두 종료 (대여 중인 브라우저는 반납 시 종료)"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._lock.notify_all()
+        for browser in idle:
+            self._quit(browser)
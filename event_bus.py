@@ -0,0 +1,127 @@
+"""
+Socket.IO 이벤트 묶음 전송
+
+로그 한 줄, 상태 변경 한 번마다 socketio.emit 을 부르는 대신
+    - log_message 는 모아두었다가 interval 마다 log_batch 한 프레임으로 전송
+    - search_status 는 마지막 상태만 남겨서 전송 (중간 상태는 버리지만 'error' 상태는 버리지 않음)
+    - latest(event, ...) 로 보낸 이벤트도 이벤트마다 마지막 것만 전송 (대기열 상태 등)
+    - 그 외 이벤트는 바로 전송
+한다. 접속한 클라이언트에게 보내는 이전 로그도 log_batch 한 프레임으로 보낸다.
+"""
+
+from flask_socketio import emit
+import threading
+
+
+class EventBus:
+    """로그/상태 이벤트를 모아서 주기적으로 보내는 전송기"""
+
+    def __init__(self, socketio, interval=0.25, max_pending=2000):
+        self.socketio = socketio
+        self.interval = interval
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._logs = []        # 보낼 로그 레코드
+        self._statuses = []    # 보낼 상태 (마지막 상태 + 그 앞의 'error' 상태)
+        self._latest = {}      # 이벤트 이름 → 보낼 마지막 payload
+        self._running = False
+
+        # 통계
+        self.counters = {
+            'logs_queued': 0,
+            'logs_sent': 0,
+            'logs_dropped': 0,
+            'status_queued': 0,
+            'status_sent': 0,
+            'status_collapsed': 0,
+            'latest_queued': 0,
+            'latest_collapsed': 0,
+            'events_sent': 0,
+            'frames_sent': 0
+        }
+
+    def log(self, record):
+        """로그 레코드 1건 추가 (다음 프레임에 함께 전송)"""
+        with self._lock:
+            self._logs.append(record)
+            self.counters['logs_queued'] += 1
+            # 너무 많이 쌓이면 오래된 것부터 버림 (파일에는 이미 기록됨)
+            overflow = len(self._logs) - self.max_pending
+            if overflow > 0:
+                del self._logs[:overflow]
+                self.counters['logs_dropped'] += overflow
+
+    def status(self, payload):
+        """검색 상태 갱신 (다음 프레임에 마지막 상태만 전송, 오류 상태는 덮어쓰지 않고 함께 전송)"""
+        with self._lock:
+            if self._statuses and self._statuses[-1].get('status') != 'error':
+                self._statuses.pop()
+                self.counters['status_collapsed'] += 1
+            self._statuses.append(payload)
+            self.counters['status_queued'] += 1
+
+    def latest(self, event, payload):
+        """마지막 값만 의미 있는 이벤트 (다음 프레임에 event 별로 마지막 것만 전송)
+
+        payload 가 함수면 보낼 때 호출해서 그 결과를 보낸다 (자주 바뀌는 상태를 매번 만들지 않도록)
+        """
+        with self._lock:
+            if event in self._latest:
+                self.counters['latest_collapsed'] += 1
+            self._latest[event] = payload
+            self.counters['latest_queued'] += 1
+
+    def emit(self, event, payload):
+        """묶지 않고 바로 보내는 이벤트"""
+        self.socketio.emit(event, payload)
+        with self._lock:
+            self.counters['events_sent'] += 1
+
+    def backlog(self, records):
+        """방금 접속한 클라이언트에게 이전 로그 레코드를 한 프레임으로 전송 (connect 핸들러 안에서 호출)"""
+        emit('log_batch', {'records': records})
+        with self._lock:
+            self.counters['frames_sent'] += 1
+
+    def flush(self):
+        """모아둔 로그/상태 전송"""
+        with self._lock:
+            logs, self._logs = self._logs, []
+            statuses, self._statuses = self._statuses, []
+            latest, self._latest = self._latest, {}
+            if logs:
+                self.counters['logs_sent'] += len(logs)
+                self.counters['frames_sent'] += 1
+            self.counters['status_sent'] += len(statuses)
+            self.counters['frames_sent'] += len(statuses)
+            self.counters['events_sent'] += len(latest)
+
+        if logs:
+            self.socketio.emit('log_batch', {'records': logs})
+        for status in statuses:
+            self.socketio.emit('search_status', status)
+        for event, payload in latest.items():
+            self.socketio.emit(event, payload() if callable(payload) else payload)
+
+    def _run(self):
+        while self._running:
+            self.socketio.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"이벤트 전송 중 오류: {e}")
+
+    def start(self):
+        """백그라운드 전송 루프 시작"""
+        if not self._running:
+            self._running = True
+            self.socketio.start_background_task(self._run)
+
+    def stop(self):
+        self._running = False
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, logs_pending=len(self._logs))
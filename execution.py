@@ -0,0 +1,117 @@
+"""
+서버 실행 모델 (eventlet)
+
+서버는 eventlet.monkey_patch() 를 가장 먼저 실행하므로 threading / socket / time 이 모두 green 버전이 된다.
+즉 서버 프로세스 안의 "스레드" (APScheduler 작업 스레드, ThreadPoolExecutor, LogWriter, EventBus,
+검색 워커 감시 스레드) 는 전부 Socket.IO 허브 위에서 도는 green 스레드이고, I/O 를 기다릴 때만 양보한다.
+양보하지 않는 C 호출(SQLite, pandas/openpyxl, lxml 파싱, 큰 파일 읽기)이 허브를 멈추지 않도록 일은 세 곳으로 나눈다.
+
+    1. 허브 (green 스레드)
+       Socket.IO / HTTP 응답, 이벤트 전송, 검색 워커 감시, 순위표 메모리 조회, 짧은 DB 쓰기(결과 1건)
+       → 오래 걸리는 일을 직접 하지 않는다. 기다리는 일(Future.result, socketio.sleep)만 한다.
+    2. 실제 OS 스레드 (eventlet.tpool) : blocking(fn, ...)
+       로그 색인/검색, 로그 범위 읽기, 엑셀 가져오기/내보내기, 순위 이력, 저장된 검색 결과 조회
+       → 여기서 실행하는 함수는 green 락/이벤트를 쓰면 안 되므로 공유 객체의 락은 os_lock() 으로 만든다.
+    3. 검색 워커 프로세스 (search_workers)
+       크롬/HTTP 검색, 스크롤, 페이지 분석 → 서버 프로세스와 완전히 분리 (SEARCH_ISOLATION=process, 기본값)
+       SEARCH_ISOLATION=thread 는 디버깅용으로, 검색이 허브의 green 스레드에서 돈다.
+
+백그라운드 작업은 socketio.start_background_task 로 시작하고(정기/단일 검색은 APScheduler 가 green 스레드에서 실행),
+LatencyProbe 로 허브 지연과 브라우저의 Socket.IO ping 왕복 시간을 재서 위 규칙이 지켜지는지 확인한다.
+"""
+
+from collections import deque
+import threading
+import time
+
+try:
+    from eventlet import tpool
+    from eventlet.patcher import is_monkey_patched, original
+except ImportError:
+    tpool = None
+
+
+def patched():
+    """eventlet 으로 threading 이 패치된 프로세스인지"""
+    return tpool is not None and is_monkey_patched('thread')
+
+
+def blocking(fn, *args, **kwargs):
+    """허브를 멈추지 않도록 fn 을 실제 OS 스레드(tpool)에서 실행하고 결과 반환 (패치 전이면 바로 실행)"""
+    if patched():
+        return tpool.execute(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def os_lock():
+    """패치와 상관없는 실제 OS 락 (blocking() 안에서 여러 스레드가 함께 쓰는 객체용)"""
+    if tpool is not None:
+        return original('_thread').allocate_lock()
+    return threading.Lock()
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+class LatencyProbe:
+    """허브 응답 지연 측정기
+
+    interval 마다 green 스레드가 잠들었다 깨어날 때 늦어진 시간(허브 지연)을 기록하고,
+    브라우저가 보고한 Socket.IO ping 왕복 시간(RTT)도 함께 모은다.
+    begin(name) / end(name) 사이 구간(예: 전체 검색 1회)의 최대/95% 값을 threshold_ms 와 비교해서 요약한다.
+    """
+
+    def __init__(self, sleep=time.sleep, interval=0.5, threshold_ms=250, history=3600):
+        self.sleep = sleep
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.lags = deque(maxlen=history)   # (시각, ms)
+        self.rtts = deque(maxlen=history)   # (시각, ms)
+        self._windows = {}
+        self._running = False
+
+    def _run(self):
+        while self._running:
+            started = time.monotonic()
+            self.sleep(self.interval)
+            lag = (time.monotonic() - started - self.interval) * 1000
+            self.lags.append((time.time(), max(0.0, lag)))
+
+    def start(self, spawn):
+        """spawn(함수) 로 측정 루프 시작 (socketio.start_background_task 등)"""
+        if not self._running:
+            self._running = True
+            spawn(self._run)
+
+    def stop(self):
+        self._running = False
+
+    def record_rtt(self, rtt_ms):
+        self.rtts.append((time.time(), float(rtt_ms)))
+
+    def begin(self, name):
+        self._windows[name] = time.time()
+
+    def end(self, name):
+        """begin(name) 이후 구간 요약"""
+        return self.summary(self._windows.pop(name, None))
+
+    def summary(self, since=None):
+        since = since or 0
+        lags = [value for at, value in list(self.lags) if at >= since]
+        rtts = [value for at, value in list(self.rtts) if at >= since]
+        worst = max(max(lags, default=0.0), max(rtts, default=0.0))
+        return {
+            'lag_samples': len(lags),
+            'lag_max_ms': round(max(lags, default=0.0), 1),
+            'lag_p95_ms': round(percentile(lags, 0.95), 1),
+            'rtt_samples': len(rtts),
+            'rtt_max_ms': round(max(rtts, default=0.0), 1),
+            'rtt_p95_ms': round(percentile(rtts, 0.95), 1),
+            'threshold_ms': self.threshold_ms,
+            'ok': worst < self.threshold_ms
+        }
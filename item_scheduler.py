@@ -0,0 +1,242 @@
+"""
+항목별 검색 주기 스케줄러
+
+매시간 모든 항목을 한꺼번에 다시 검색하는 대신 항목마다 다음 검색 시각(next_check_at)을 두고,
+tick 초마다 시각이 된 항목만 검색 대기열(scheduled 레인)에 넣는다.
+
+    - 주기: check_interval(분)을 직접 정하면 그 값, 0 이면 auto_interval (자동 조정, 처음에는 default_interval)
+    - 다음 검색 시각 = 검색한 시각 + 주기 x (1 ± jitter) 라서 같이 검색된 항목들도 다음에는 조금씩 흩어진다
+    - 다음 검색 시각이 없는 항목(새 항목, 예전 DB)은 주기 안에 고르게 나눠서 정한다
+      (한 번도 검색하지 않은 항목은 min_interval 안에)
+    - tick 마다 넣는 항목 수는 평소 tick 당 검색량의 2배까지로 제한해서, 재시작 후 밀린 항목도 몰리지 않게 한다
+    - 같은 키워드의 다른 항목이 주기의 1/4 안에 검색할 차례면 같이 넣는다 (검색 결과 페이지를 한 번만 봄)
+    - 자동 주기: 최근 순위 기록에서 순위(또는 발견 여부)가 바뀐 비율이 높으면 한 단계 줄이고, 낮으면 한 단계 늘린다
+"""
+
+from datetime import datetime, timedelta
+import random
+import math
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 자동 주기 단계 (분)
+INTERVAL_STEPS = (15, 30, 60, 120, 240, 480, 720, 1440)
+
+# 자동 조정에 쓰는 최근 기록 수 / 최소 기록 수
+TUNE_WINDOW = 12
+TUNE_MIN_OBSERVATIONS = 4
+
+# 바뀐 비율이 이 이상이면 주기를 줄이고, 이 이하이면 늘림
+TUNE_FASTER = 0.5
+TUNE_SLOWER = 0.1
+
+# 같은 키워드 항목을 함께 검색할 범위 (주기 대비)
+PIGGYBACK_RATIO = 0.25
+
+
+def parse_time(text):
+    try:
+        return datetime.strptime(text, TIME_FORMAT) if text else None
+    except ValueError:
+        return None
+
+
+def format_time(value):
+    return value.strftime(TIME_FORMAT)
+
+
+def change_rate(observations):
+    """최근 기록 [(발견 여부, 전체 순위), ...] 에서 이웃한 두 기록이 다른 비율"""
+    if len(observations) < 2:
+        return 0.0
+    changes = sum(1 for newer, older in zip(observations, observations[1:]) if newer != older)
+    return changes / (len(observations) - 1)
+
+
+def tune_interval(current, observations, min_interval=15, max_interval=1440):
+    """최근 기록의 변화 비율에 따라 자동 주기를 한 단계 조정 (기록이 적으면 그대로)"""
+    steps = [step for step in INTERVAL_STEPS if min_interval <= step <= max_interval] or [current]
+    if len(observations) < TUNE_MIN_OBSERVATIONS:
+        return current
+    index = min(range(len(steps)), key=lambda i: abs(steps[i] - current))
+    rate = change_rate(observations)
+    if rate >= TUNE_FASTER:
+        index -= 1
+    elif rate <= TUNE_SLOWER:
+        index += 1
+    return steps[max(0, min(index, len(steps) - 1))]
+
+
+class ItemScheduler:
+    """다음 검색 시각이 된 항목을 골라서 submit(키워드, [(항목 id, 상품 ID), ...]) 으로 넘기는 스케줄러
+
+    rank_table 은 rank_store.RankTable, pending(항목 id) 는 이미 대기/검색 중인지 확인하는 함수.
+    검색 결과를 저장한 뒤 checked() 를 불러서 자동 주기와 다음 검색 시각을 갱신한다.
+    """
+
+    def __init__(self, rank_table, submit, pending=None, default_interval=60, min_interval=15,
+                 max_interval=1440, jitter=0.1, tick=60, auto_tune=True, log=print):
+        self.rank_table = rank_table
+        self.submit = submit
+        self.pending = pending or (lambda item_id: False)
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.tick_seconds = tick
+        self.auto_tune = auto_tune
+        self.log = log
+
+        # 통계
+        self.counters = {
+            'ticks': 0,
+            'dispatched_items': 0,
+            'dispatched_jobs': 0,
+            'piggybacked': 0,
+            'deferred': 0,
+            'spread': 0,
+            'tuned_faster': 0,
+            'tuned_slower': 0,
+            'retries': 0
+        }
+        self.last_tick = None
+
+    def interval_of(self, row):
+        """항목의 실제 검색 주기 (분)"""
+        return int(row.get('check_interval') or 0) or int(row.get('auto_interval') or 0) or self.default_interval
+
+    def next_check(self, interval, now):
+        """now 부터 주기 ± jitter 뒤"""
+        return now + timedelta(minutes=interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def budget(self, rows):
+        """tick 1회에 넣을 최대 항목 수 (평소 tick 당 검색량의 2배, 최소 1)"""
+        expected = sum(self.tick_seconds / (self.interval_of(row) * 60) for row in rows)
+        return max(1, math.ceil(expected * 2))
+
+    def _spread(self, rows, now):
+        """다음 검색 시각이 없는 항목들을 주기 안에 고르게 배치"""
+        if not rows:
+            return {}
+        rows = sorted(rows, key=lambda row: row['id'])
+        schedules = {}
+        for index, row in enumerate(rows):
+            # 한 번도 검색하지 않은 항목은 빨리 (min_interval 안에) 검색
+            window = self.interval_of(row) if row.get('date') else min(self.min_interval, self.interval_of(row))
+            offset = window * (index + random.random()) / len(rows)
+            schedules[row['id']] = {
+                'auto_interval': int(row.get('auto_interval') or 0) or self.default_interval,
+                'next_check_at': format_time(now + timedelta(minutes=offset))
+            }
+        self.rank_table.update_schedules(schedules)
+        self.counters['spread'] += len(schedules)
+        for row in rows:
+            row.update(schedules[row['id']])
+        return schedules
+
+    def tick(self, now=None):
+        """다음 검색 시각이 된 항목을 키워드별로 묶어서 submit, {'dispatched', 'jobs', 'deferred', 'due'} 반환"""
+        now = now or datetime.now()
+        self.counters['ticks'] += 1
+        self.last_tick = now
+        rows = [row for row in self.rank_table.valid_rows() if not self.pending(row['id'])]
+        self._spread([row for row in rows if parse_time(row['next_check_at']) is None], now)
+
+        due_at = {row['id']: parse_time(row['next_check_at']) for row in rows}
+        by_keyword = {}
+        for row in rows:
+            by_keyword.setdefault(str(row['keyword']).strip(), []).append(row)
+        due = sorted((row for row in rows if due_at[row['id']] <= now), key=lambda row: due_at[row['id']])
+
+        budget = self.budget(rows)
+        dispatched = set()
+        jobs = 0
+        for row in due:
+            if len(dispatched) >= budget:
+                break
+            if row['id'] in dispatched:
+                continue
+            keyword = str(row['keyword']).strip()
+            group = [other for other in by_keyword[keyword] if other['id'] not in dispatched and
+                     due_at[other['id']] <= now + timedelta(minutes=self.interval_of(other) * PIGGYBACK_RATIO)]
+            self.submit(keyword, [(other['id'], str(other['product_id']).strip()) for other in group])
+            dispatched.update(other['id'] for other in group)
+            self.counters['piggybacked'] += sum(1 for other in group if due_at[other['id']] > now)
+            jobs += 1
+
+        deferred = sum(1 for row in due if row['id'] not in dispatched)
+        self.counters['dispatched_items'] += len(dispatched)
+        self.counters['dispatched_jobs'] += jobs
+        self.counters['deferred'] += deferred
+        return {'dispatched': len(dispatched), 'jobs': jobs, 'deferred': deferred, 'due': len(due)}
+
+    def checked(self, item_id, now=None):
+        """검색 결과를 저장한 항목의 자동 주기/다음 검색 시각 갱신 후 갱신된 값 반환 (항목이 없으면 None)"""
+        row = self.rank_table.get(item_id)
+        if row is None:
+            return None
+        now = now or datetime.now()
+        current = int(row.get('auto_interval') or 0) or self.default_interval
+        auto_interval = current
+        if self.auto_tune:
+            observations = self.rank_table.store.recent_observations(item_id, TUNE_WINDOW)
+            auto_interval = tune_interval(current, observations, self.min_interval, self.max_interval)
+            if auto_interval != current:
+                self.counters['tuned_faster' if auto_interval < current else 'tuned_slower'] += 1
+                self.log(f"자동 검색 주기 조정: {row['keyword']} / {row['product_id']} {current}분 → {auto_interval}분 "
+                         f"(최근 {len(observations)}회 중 변화 비율 {change_rate(observations):.0%})")
+        interval = int(row.get('check_interval') or 0) or auto_interval
+        schedule = {'auto_interval': auto_interval, 'next_check_at': format_time(self.next_check(interval, now))}
+        return self.rank_table.update_schedules({item_id: schedule})[item_id]
+
+    def retry_later(self, item_ids, now=None):
+        """검색이 실패/취소된 항목은 min_interval 뒤에 다시 (주기가 더 짧으면 주기 뒤)"""
+        now = now or datetime.now()
+        schedules = {}
+        for item_id in item_ids:
+            row = self.rank_table.get(item_id)
+            if row is None:
+                continue
+            delay = min(self.min_interval, self.interval_of(row))
+            schedules[item_id] = {'auto_interval': int(row.get('auto_interval') or 0) or self.default_interval,
+                                  'next_check_at': format_time(self.next_check(delay, now))}
+        self.counters['retries'] += len(schedules)
+        return self.rank_table.update_schedules(schedules) if schedules else {}
+
+    def reschedule(self, item_id, now=None):
+        """주기를 바꾼 항목의 다음 검색 시각을 새 주기 안에서 다시 정함"""
+        row = self.rank_table.get(item_id)
+        if row is None:
+            return None
+        now = now or datetime.now()
+        offset = self.interval_of(row) * random.random()
+        schedule = {'auto_interval': int(row.get('auto_interval') or 0) or self.default_interval,
+                    'next_check_at': format_time(now + timedelta(minutes=offset))}
+        return self.rank_table.update_schedules({item_id: schedule})[item_id]
+
+    def stats(self, now=None):
+        now = now or datetime.now()
+        rows = self.rank_table.valid_rows()
+        intervals = {}
+        due = 0
+        upcoming = []
+        for row in rows:
+            interval = self.interval_of(row)
+            intervals[interval] = intervals.get(interval, 0) + 1
+            at = parse_time(row['next_check_at'])
+            if at is None or at <= now:
+                due += 1
+            else:
+                upcoming.append((at, row))
+        upcoming.sort(key=lambda item: item[0])
+        return dict(self.counters,
+                    items=len(rows),
+                    due=due,
+                    checks_per_hour=round(sum(60 / self.interval_of(row) for row in rows), 1),
+                    budget_per_tick=self.budget(rows),
+                    tick_seconds=self.tick_seconds,
+                    intervals={str(interval): count for interval, count in sorted(intervals.items())},
+                    last_tick=format_time(self.last_tick) if self.last_tick else None,
+                    upcoming=[{'id': row['id'], 'keyword': row['keyword'], 'product_id': row['product_id'],
+                               'next_check_at': format_time(at), 'interval': self.interval_of(row)}
+                              for at, row in upcoming[:10]])
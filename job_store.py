@@ -0,0 +1,141 @@
+"""
+APScheduler 작업 저장소 (SQLite)
+
+스케줄러 작업을 메모리 대신 SQLite 파일에 저장해서 서버를 다시 시작해도 작업과 다음 실행 시각이 남게 한다.
+APScheduler 의 SQLAlchemyJobStore 와 같은 테이블 구조(id, next_run_time, job_state)를 쓰지만
+SQLAlchemy 없이 sqlite3 만으로 동작한다. (작업 상태는 pickle, 다음 실행 시각은 UTC 타임스탬프)
+
+작업 함수는 '모듈:함수' 참조로 저장되므로 모듈 최상위 함수만 등록할 수 있다.
+"""
+
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+from apscheduler.job import Job
+import threading
+import sqlite3
+import pickle
+import os
+
+JOB_DB_PATH = os.environ.get('SCHEDULER_DB', 'scheduler_jobs.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apscheduler_jobs (
+    id             TEXT PRIMARY KEY,
+    next_run_time  REAL,
+    job_state      BLOB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_apscheduler_jobs_next_run_time
+    ON apscheduler_jobs (next_run_time);
+"""
+
+
+class SQLiteJobStore(BaseJobStore):
+    """SQLite 파일에 작업을 저장하는 APScheduler 작업 저장소 (RankStore 와 같이 스레드마다 연결, WAL 모드)"""
+
+    def __init__(self, path=JOB_DB_PATH, pickle_protocol=pickle.HIGHEST_PROTOCOL):
+        super().__init__()
+        self.path = path
+        self.pickle_protocol = pickle_protocol
+        self._local = threading.local()
+
+    def _connect(self):
+        """현재 스레드의 연결 반환 (없으면 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def start(self, scheduler, alias):
+        super().start(scheduler, alias)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def lookup_job(self, job_id):
+        row = self._connect().execute("SELECT job_state FROM apscheduler_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._reconstitute_job(row[0]) if row else None
+
+    def get_due_jobs(self, now):
+        return self._get_jobs("WHERE next_run_time <= ?", (datetime_to_utc_timestamp(now),))
+
+    def get_next_run_time(self):
+        row = self._connect().execute(
+            "SELECT next_run_time FROM apscheduler_jobs WHERE next_run_time IS NOT NULL "
+            "ORDER BY next_run_time LIMIT 1"
+        ).fetchone()
+        return utc_timestamp_to_datetime(row[0]) if row else None
+
+    def get_all_jobs(self):
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+
+    def add_job(self, job):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO apscheduler_jobs (id, next_run_time, job_state) VALUES (?, ?, ?)",
+                    (job.id, datetime_to_utc_timestamp(job.next_run_time),
+                     pickle.dumps(job.__getstate__(), self.pickle_protocol))
+                )
+        except sqlite3.IntegrityError:
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE apscheduler_jobs SET next_run_time = ?, job_state = ? WHERE id = ?",
+                (datetime_to_utc_timestamp(job.next_run_time),
+                 pickle.dumps(job.__getstate__(), self.pickle_protocol), job.id)
+            )
+        if cursor.rowcount == 0:
+            raise JobLookupError(job.id)
+
+    def remove_job(self, job_id):
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM apscheduler_jobs WHERE id = ?", (job_id,))
+        if cursor.rowcount == 0:
+            raise JobLookupError(job_id)
+
+    def remove_all_jobs(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM apscheduler_jobs")
+
+    def shutdown(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _reconstitute_job(self, job_state):
+        job_state = pickle.loads(job_state)
+        job_state['jobstore'] = self
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _get_jobs(self, condition='', params=()):
+        """조건에 맞는 작업을 다음 실행 시각 순서로 반환 (복원할 수 없는 작업은 삭제)"""
+        jobs = []
+        failed = []
+        rows = self._connect().execute(
+            f"SELECT id, job_state FROM apscheduler_jobs {condition} ORDER BY next_run_time", params
+        ).fetchall()
+        for job_id, job_state in rows:
+            try:
+                jobs.append(self._reconstitute_job(job_state))
+            except BaseException:
+                self._logger.exception(f'작업 "{job_id}" 을(를) 복원할 수 없어서 삭제합니다')
+                failed.append(job_id)
+        if failed:
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM apscheduler_jobs WHERE id = ?", [(job_id,) for job_id in failed])
+        return jobs
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} (path={self.path})>"
@@ -0,0 +1,74 @@
+"""
+Socket.IO 응답 지연 측정 (전체 검색 중에도 허브가 멈추지 않는지 확인)
+
+서버에 Socket.IO 클라이언트로 접속해서 interval 초마다 latency_ping 을 보내고 응답(ack)까지 걸린 시간을 잰다.
+잰 값은 latency_report 로 서버에도 알려주므로 서버의 검색 완료 로그(허브 지연 요약)에도 함께 반영된다.
+--start-search 를 주면 /start_search 로 전체 검색을 시작하고 검색이 끝날 때까지 잰다.
+최대 왕복 시간이 --threshold(ms) 이상이거나 응답이 없었던 ping 이 있으면 종료 코드 1.
+
+사용 예:
+    python latency_probe.py --url http://127.0.0.1:5000 --start-search --threshold 250
+"""
+
+from execution import percentile
+import threading
+import argparse
+import requests
+import socketio
+import time
+import sys
+
+
+def probe(url, duration=60, interval=0.5, start_search=False, timeout=5):
+    """ping 왕복 시간 목록(ms)과 응답 없는 ping 수 반환"""
+    client = socketio.Client(reconnection=False)
+    finished = threading.Event()
+    seen = set()
+
+    @client.on('search_status')
+    def on_status(data):
+        status = data.get('status')
+        seen.add(status)
+        if status in ('completed', 'error') or (status == 'waiting' and 'searching' in seen):
+            finished.set()
+
+    client.connect(url, transports=['websocket'])
+    if start_search:
+        print(requests.post(f"{url}/start_search", json={}, timeout=10).json())
+
+    rtts = []
+    lost = 0
+    deadline = time.time() + duration
+    try:
+        while time.time() < deadline and not (start_search and finished.is_set()):
+            sent = time.monotonic()
+            try:
+                client.call('latency_ping', {}, timeout=timeout)
+                rtt = (time.monotonic() - sent) * 1000
+                rtts.append(rtt)
+                client.emit('latency_report', {'rtt': rtt})
+            except socketio.exceptions.TimeoutError:
+                lost += 1
+            time.sleep(interval)
+    finally:
+        client.disconnect()
+    return rtts, lost
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Socket.IO ping 왕복 시간 측정')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--duration', type=float, default=60, help='최대 측정 시간(초)')
+    parser.add_argument('--interval', type=float, default=0.5)
+    parser.add_argument('--threshold', type=float, default=250, help='허용 최대 왕복 시간(ms)')
+    parser.add_argument('--start-search', action='store_true', help='전체 검색을 시작하고 끝날 때까지 측정')
+    args = parser.parse_args()
+
+    rtts, lost = probe(args.url, args.duration, args.interval, args.start_search)
+    worst = max(rtts, default=0.0)
+    print(f"ping {len(rtts)}회 (응답 없음 {lost}회): "
+          f"중앙값 {percentile(rtts, 0.5):.1f}ms, 95% {percentile(rtts, 0.95):.1f}ms, 최대 {worst:.1f}ms "
+          f"(기준 {args.threshold:.0f}ms)")
+    ok = rtts and not lost and worst < args.threshold
+    print("OK" if ok else "기준 초과")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,210 @@
+"""
+로그 파일 읽기 (범위 읽기 / tail / 줄 번호·시각으로 이동 / 스트리밍 다운로드)
+
+로그 파일 전체를 readlines() 로 읽지 않고 바이트 위치(offset) 기준으로 필요한 부분만 읽는다.
+파일마다 일정 줄(stride)마다 (줄 번호, 바이트 위치, 시각) 을 기록한 작은 색인을 만들어 두고,
+로그는 뒤에 추가되기만 하므로 다음 번에는 새로 추가된 부분만 색인에 반영한다.
+"""
+
+from bisect import bisect_left, bisect_right
+from execution import os_lock
+import os
+import re
+
+LOG_FILE_PATTERN = re.compile(r'^search_log_\d{8}\.txt$')
+
+# 색인에 기록하는 간격 (줄 수)
+INDEX_STRIDE = 1000
+
+
+def line_timestamp(line):
+    """b"[YYYY-MM-DD HH:MM:SS] ..." 줄의 시각 문자열 (없으면 None)"""
+    if line[:1] == b'[' and line[20:21] == b']':
+        return line[1:20].decode('ascii', errors='replace')
+    return None
+
+
+def decode_lines(lines):
+    return [line.decode('utf-8', errors='replace').rstrip('\r\n') for line in lines]
+
+
+class LineIndex:
+    """로그 파일 1개의 희소 줄 색인
+
+    stride 줄마다 줄 번호(lines), 바이트 위치(offsets), 그 줄까지의 마지막 시각(times) 을 기록
+    """
+
+    def __init__(self, path, stride=INDEX_STRIDE):
+        self.path = path
+        self.stride = stride
+        self.lines = []
+        self.offsets = []
+        self.times = []
+        self.line_count = 0      # 색인에 반영한 줄 수
+        self.indexed_size = 0    # 색인에 반영한 바이트 수 (완성된 줄까지만)
+        self.last_timestamp = ''
+
+    def update(self):
+        """파일에 새로 추가된 줄만 색인에 반영"""
+        size = os.path.getsize(self.path)
+        if size < self.indexed_size:
+            # 파일이 줄었으면 (다시 만들어짐) 처음부터
+            self.__init__(self.path, self.stride)
+        if size == self.indexed_size:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # 아직 쓰는 중인 마지막 줄은 다음에
+                timestamp = line_timestamp(line)
+                if timestamp:
+                    self.last_timestamp = timestamp
+                if self.line_count % self.stride == 0:
+                    self.lines.append(self.line_count)
+                    self.offsets.append(offset)
+                    self.times.append(self.last_timestamp)
+                self.line_count += 1
+                offset += len(line)
+            self.indexed_size = offset
+
+    def nearest_line(self, line_no):
+        """line_no 이하에서 가장 가까운 (줄 번호, 바이트 위치)"""
+        i = bisect_right(self.lines, line_no) - 1
+        if i < 0:
+            return 0, 0
+        return self.lines[i], self.offsets[i]
+
+    def nearest_time(self, timestamp):
+        """시각이 timestamp 보다 이른 마지막 (줄 번호, 바이트 위치)"""
+        i = bisect_left(self.times, timestamp) - 1
+        if i < 0:
+            return 0, 0
+        return self.lines[i], self.offsets[i]
+
+
+class LogReader:
+    """LOG_DIR 의 로그 파일을 범위 단위로 읽는 클래스
+
+    읽기 결과는 {'filename', 'lines', 'offset', 'next_offset', 'size', 'eof'} dict
+    offset 은 첫 줄의 시작 위치, next_offset 은 마지막 줄 다음 위치 (이어서 읽을 때 사용)
+    서버에서는 execution.blocking() 으로 OS 스레드에서 부르므로 락도 OS 락을 쓴다.
+    """
+
+    def __init__(self, log_dir, stride=INDEX_STRIDE):
+        self.log_dir = log_dir
+        self.stride = stride
+        self._indexes = {}
+        self._lock = os_lock()
+
+    def path(self, filename):
+        """로그 파일 경로 (로그 파일 이름 형식이 아니거나 없으면 ValueError)"""
+        if not LOG_FILE_PATTERN.match(filename):
+            raise ValueError(f"잘못된 로그 파일 이름입니다: {filename}")
+        path = os.path.join(self.log_dir, filename)
+        if not os.path.exists(path):
+            raise ValueError("로그 파일을 찾을 수 없습니다.")
+        return path
+
+    def index(self, filename):
+        """최신 상태로 갱신된 줄 색인"""
+        path = self.path(filename)
+        with self._lock:
+            index = self._indexes.get(filename)
+            if index is None:
+                index = self._indexes[filename] = LineIndex(path, self.stride)
+            index.update()
+            return index
+
+    def _result(self, filename, lines, offset, next_offset, size):
+        return {
+            'filename': filename,
+            'lines': decode_lines(lines),
+            'offset': offset,
+            'next_offset': next_offset,
+            'size': size,
+            'eof': next_offset >= size
+        }
+
+    def read_range(self, filename, offset=0, limit=500):
+        """offset 부터 limit 줄 읽기 (offset 이 줄 중간이면 다음 줄부터)"""
+        path = self.path(filename)
+        size = os.path.getsize(path)
+        offset = max(0, min(int(offset), size))
+        lines = []
+        with open(path, 'rb') as f:
+            if offset > 0:
+                f.seek(offset - 1)
+                if f.read(1) != b'\n':
+                    offset += len(f.readline())
+            f.seek(offset)
+            position = offset
+            for line in f:
+                if len(lines) >= limit:
+                    break
+                lines.append(line)
+                position += len(line)
+        return self._result(filename, lines, offset, position, size)
+
+    def read_before(self, filename, end_offset=None, limit=200, block_size=64 * 1024):
+        """end_offset 바로 앞의 limit 줄 읽기 (end_offset 이 없으면 파일 끝 = tail)"""
+        path = self.path(filename)
+        size = os.path.getsize(path)
+        end = size if end_offset is None else max(0, min(int(end_offset), size))
+        data = b''
+        start = end
+        with open(path, 'rb') as f:
+            # 뒤에서부터 블록 단위로 읽어서 줄바꿈이 limit 개 넘게 모일 때까지
+            while start > 0 and data.count(b'\n') <= limit:
+                start = max(0, start - block_size)
+                f.seek(start)
+                data = f.read(end - start)
+        lines = data.splitlines(keepends=True)
+        if start > 0:
+            lines = lines[1:]  # 잘린 첫 줄은 버림
+        lines = lines[-limit:] if limit else []
+        first = end - sum(len(line) for line in lines)
+        return self._result(filename, lines, first, end, size)
+
+    def tail(self, filename, limit=200):
+        """파일 끝의 limit 줄"""
+        return self.read_before(filename, None, limit)
+
+    def offset_of_line(self, filename, line_no):
+        """0부터 센 line_no 번째 줄의 시작 위치"""
+        index = self.index(filename)
+        line, offset = index.nearest_line(max(0, int(line_no)))
+        with open(index.path, 'rb') as f:
+            f.seek(offset)
+            while line < line_no:
+                chunk = f.readline()
+                if not chunk:
+                    break
+                offset += len(chunk)
+                line += 1
+        return offset
+
+    def offset_of_time(self, filename, timestamp):
+        """시각이 timestamp('YYYY-MM-DD HH:MM:SS' 또는 그 앞부분) 이상인 첫 줄의 시작 위치"""
+        index = self.index(filename)
+        _, offset = index.nearest_time(timestamp)
+        with open(index.path, 'rb') as f:
+            f.seek(offset)
+            for chunk in f:
+                line_time = line_timestamp(chunk)
+                if line_time and line_time >= timestamp:
+                    break
+                offset += len(chunk)
+        return offset
+
+    def stream(self, filename, chunk_size=64 * 1024):
+        """파일 전체를 chunk_size 바이트씩 내보내는 제너레이터 (다운로드용)"""
+        path = self.path(filename)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
@@ -0,0 +1,220 @@
+"""
+로그 파일 전체 검색 (SQLite FTS5)
+
+LOG_DIR 의 search_log_YYYYMMDD.txt 파일들을 한 줄씩 log_lines 테이블에 넣고 FTS5 색인(log_fts)으로 검색한다.
+로그는 뒤에 추가되기만 하므로 파일마다 색인한 바이트 수를 기억해두고, 검색할 때마다 새로 추가된 부분만 읽어서 넣는다.
+
+    log_files  파일별 색인 상태 (색인한 바이트 수, 줄 수, 마지막 시각)
+    log_lines  로그 한 줄 (파일, 줄 번호, 바이트 위치, 시각, "[시각] " 을 뺀 내용)
+    log_fts    log_lines.text 의 FTS5 색인 (trigram 이면 부분 문자열 검색 가능)
+"""
+
+from log_reader import LOG_FILE_PATTERN, line_timestamp
+from execution import os_lock
+import sqlite3
+import os
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_files (
+    filename        TEXT PRIMARY KEY,
+    indexed_size    INTEGER NOT NULL DEFAULT 0,
+    line_count      INTEGER NOT NULL DEFAULT 0,
+    last_timestamp  TEXT NOT NULL DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS log_lines (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename    TEXT NOT NULL,
+    line_no     INTEGER NOT NULL,
+    offset      INTEGER NOT NULL,
+    logged_at   TEXT NOT NULL,
+    text        TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_log_lines_time ON log_lines (logged_at);
+CREATE INDEX IF NOT EXISTS idx_log_lines_file ON log_lines (filename, line_no);
+
+CREATE TRIGGER IF NOT EXISTS log_lines_ai AFTER INSERT ON log_lines BEGIN
+    INSERT INTO log_fts (rowid, text) VALUES (new.id, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS log_lines_ad AFTER DELETE ON log_lines BEGIN
+    INSERT INTO log_fts (log_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# 오류 로그로 볼 단어
+ERROR_WORDS = ['오류', '실패', 'error', 'Error']
+
+# 한 번에 넣는 줄 수
+INSERT_BATCH = 5000
+
+
+def fts_phrase(term):
+    """FTS5 MATCH 용 구문 (따옴표로 감싸서 특수문자를 그대로 검색)"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+class LogSearchIndex:
+    """로그 파일 전체 검색 색인
+
+    search() 를 부를 때마다 update() 로 새로 추가된 로그만 색인에 반영한 뒤 검색한다.
+    서버에서는 execution.blocking() 으로 OS 스레드에서 부르므로 락도 OS 락을 쓴다.
+    """
+
+    def __init__(self, log_dir, db_path=None):
+        self.log_dir = log_dir
+        self.db_path = db_path or os.path.join(log_dir, 'log_index.db')
+        self._lock = os_lock()
+        os.makedirs(log_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.trigram = self._create_fts()
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _create_fts(self):
+        """FTS5 테이블 생성 (trigram 토크나이저가 없는 SQLite 면 unicode61 로 대체)"""
+        row = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'log_fts'").fetchone()
+        if row is not None:
+            return 'trigram' in row['sql']
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE log_fts USING fts5(text, content='log_lines', content_rowid='id', tokenize='trigram')"
+            )
+            return True
+        except sqlite3.OperationalError:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE log_fts USING fts5(text, content='log_lines', content_rowid='id')"
+            )
+            return False
+
+    # ---- 색인 ----
+
+    def update(self):
+        """LOG_DIR 의 로그 파일에서 새로 추가된 줄만 색인에 반영, 추가한 줄 수 반환"""
+        added = 0
+        with self._lock:
+            files = {row['filename']: row for row in self._conn.execute("SELECT * FROM log_files")}
+            present = set()
+            for filename in sorted(os.listdir(self.log_dir)):
+                if not LOG_FILE_PATTERN.match(filename):
+                    continue
+                present.add(filename)
+                added += self._ingest(filename, files.get(filename))
+            # 지워진 로그 파일은 색인에서도 삭제
+            for filename in set(files) - present:
+                self._forget(filename)
+            self._conn.commit()
+        return added
+
+    def _forget(self, filename):
+        self._conn.execute("DELETE FROM log_lines WHERE filename = ?", (filename,))
+        self._conn.execute("DELETE FROM log_files WHERE filename = ?", (filename,))
+
+    def _ingest(self, filename, state):
+        """파일 1개의 새로 추가된 부분 색인"""
+        path = os.path.join(self.log_dir, filename)
+        size = os.path.getsize(path)
+        offset = state['indexed_size'] if state else 0
+        line_no = state['line_count'] if state else 0
+        last_timestamp = state['last_timestamp'] if state else ''
+        if size < offset:
+            # 파일이 줄었으면 (다시 만들어짐) 처음부터
+            self._forget(filename)
+            offset, line_no, last_timestamp = 0, 0, ''
+        if size == offset:
+            return 0
+
+        added = 0
+        batch = []
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # 아직 쓰는 중인 마지막 줄은 다음에
+                timestamp = line_timestamp(line)
+                if timestamp:
+                    last_timestamp = timestamp
+                    line_text = line[22:]  # 시각은 logged_at 에 따로 저장 (색인 크기 절약)
+                else:
+                    line_text = line
+                text = line_text.decode('utf-8', errors='replace').rstrip('\r\n')
+                if text.strip():
+                    batch.append((filename, line_no, offset, last_timestamp, text))
+                line_no += 1
+                offset += len(line)
+                if len(batch) >= INSERT_BATCH:
+                    added += self._insert(batch)
+                    batch = []
+        added += self._insert(batch)
+
+        self._conn.execute(
+            "INSERT INTO log_files (filename, indexed_size, line_count, last_timestamp) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(filename) DO UPDATE SET indexed_size = excluded.indexed_size, "
+            "line_count = excluded.line_count, last_timestamp = excluded.last_timestamp",
+            (filename, offset, line_no, last_timestamp)
+        )
+        return added
+
+    def _insert(self, batch):
+        if batch:
+            self._conn.executemany(
+                "INSERT INTO log_lines (filename, line_no, offset, logged_at, text) VALUES (?, ?, ?, ?, ?)",
+                batch
+            )
+        return len(batch)
+
+    # ---- 검색 ----
+
+    def search(self, text='', keyword='', product_id='', errors=False, start=None, end=None, limit=200):
+        """로그 검색 (조건은 모두 AND, 최신순)
+
+        text, keyword, product_id  부분 일치 검색어
+        errors                     오류/실패 로그만
+        start, end                 'YYYY-MM-DD HH:MM:SS' 또는 앞부분 ('2024-01-01', '2024-01-01 13' 등)
+        """
+        self.update()
+
+        terms = [term.strip() for term in (text, keyword, product_id) if term and term.strip()]
+        # trigram 은 3글자 이상만 색인으로 찾을 수 있으므로 짧은 검색어는 LIKE 로
+        match_terms = [term for term in terms if len(term) >= 3] if self.trigram else terms
+        like_terms = [term for term in terms if term not in match_terms]
+
+        query = "SELECT l.filename, l.line_no, l.offset, l.logged_at, l.text FROM log_lines l"
+        where = []
+        params = []
+        if match_terms:
+            query += " JOIN log_fts ON log_fts.rowid = l.id"
+            where.append("log_fts MATCH ?")
+            params.append(' AND '.join(fts_phrase(term) for term in match_terms))
+        for term in like_terms:
+            where.append("l.text LIKE ?")
+            params.append(f"%{term}%")
+        if errors:
+            where.append("(" + " OR ".join("l.text LIKE ?" for _ in ERROR_WORDS) + ")")
+            params += [f"%{word}%" for word in ERROR_WORDS]
+        if start:
+            where.append("l.logged_at >= ?")
+            params.append(start)
+        if end:
+            where.append("l.logged_at <= ?")
+            params.append(end + '~')  # 앞부분만 준 경우 그 구간 끝까지 포함
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY l.logged_at DESC, l.id DESC LIMIT ?"
+        params.append(int(limit))
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def stats(self):
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(line_count), 0) FROM log_files").fetchone()
+            return {'files': files[0], 'lines': files[1], 'trigram': self.trigram}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,138 @@
+"""
+검색 로그 기록기
+
+emit_log 가 부를 때마다 파일을 열고 닫지 않도록, 로그를 큐에 넣고
+백그라운드 스레드가 모아서(일정 줄 수 또는 일정 시간마다) 한 번에 파일에 쓴다.
+로그 파일은 날짜별(search_log_YYYYMMDD.txt)로 나뉘며, 날짜가 바뀌는 시점에 한 번만 새 파일로 넘어간다.
+같은 로그를 레코드 그대로(level, keyword, page, worker 등 필드 포함) search_log_YYYYMMDD.jsonl 에
+한 줄에 JSON 1개씩 함께 쓴다. (로그 보기/검색은 .txt 파일을 사용)
+"""
+
+from datetime import datetime, timedelta
+from collections import deque
+import threading
+import queue
+import json
+import time
+import os
+
+
+def log_filename(log_dir, day):
+    """날짜(datetime)에 해당하는 로그 파일 경로"""
+    return os.path.join(log_dir, f"search_log_{day.strftime('%Y%m%d')}.txt")
+
+
+def record_filename(log_dir, day):
+    """날짜(datetime)에 해당하는 구조화 로그(JSON Lines) 파일 경로"""
+    return os.path.join(log_dir, f"search_log_{day.strftime('%Y%m%d')}.jsonl")
+
+
+class LogWriter:
+    """버퍼링 + 날짜별 파일 교체를 하는 로그 기록기
+
+    - recent: 최근 로그 레코드 (deque, 최대 recent_size 개)
+    - 레코드는 {'timestamp', 'level', 'message', 'text', ...추가 필드(keyword, page, worker 등)} dict
+      'text' 는 .txt 파일에 쓰는 "[YYYY-MM-DD HH:MM:SS] 메시지" 형식, 레코드 전체는 .jsonl 파일에 씀
+    - 큐가 가득 차면 파일 기록만 건너뛰고 dropped 를 늘림 (검색은 막지 않음)
+    """
+
+    def __init__(self, log_dir, recent_size=1000, queue_size=10000, flush_lines=200, flush_interval=1.0):
+        self.log_dir = log_dir
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self.recent = deque(maxlen=recent_size)
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._records_file = None
+        self._path = None
+        self._next_rollover = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, message, level='INFO', **fields):
+        """로그 1건 기록 후 레코드 반환"""
+        now = datetime.now()
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+        record = {
+            'timestamp': timestamp,
+            'level': level,
+            'message': message,
+            'text': f"[{timestamp}] {message}",
+            'worker': threading.current_thread().name
+        }
+        record.update(fields)
+
+        self.recent.append(record)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        return record
+
+    def recent_messages(self, count=100):
+        """최근 로그 레코드 count 개 (화면에는 'text', 나머지는 필드)"""
+        return list(self.recent)[-count:]
+
+    def current_path(self):
+        """지금 기록 중인 로그 파일 경로"""
+        return self._path or log_filename(self.log_dir, datetime.now())
+
+    def _rollover(self):
+        """날짜가 바뀌었으면 새 로그 파일 열기"""
+        now = time.time()
+        if self._file is not None and now < self._next_rollover:
+            return
+        if self._file is not None:
+            self._file.close()
+            self._records_file.close()
+        today = datetime.now()
+        tomorrow = (today + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._next_rollover = tomorrow.timestamp()
+        self._path = log_filename(self.log_dir, today)
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._file = open(self._path, 'a', encoding='utf-8')
+        self._records_file = open(record_filename(self.log_dir, today), 'a', encoding='utf-8')
+
+    def _write_batch(self, records):
+        try:
+            self._rollover()
+            self._file.write('\n'.join(record['text'] for record in records) + '\n')
+            self._file.flush()
+            self._records_file.write(''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n'
+                                             for record in records))
+            self._records_file.flush()
+        except Exception as e:
+            print(f"로그 파일 저장 중 오류: {e}")
+
+    def _run(self):
+        """큐에서 로그를 모아 파일에 쓰는 백그라운드 루프"""
+        while not self._stopped or not self._queue.empty():
+            batch = []
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.flush_lines:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+                for _ in batch:
+                    self._queue.task_done()
+        if self._file is not None:
+            self._file.close()
+            self._records_file.close()
+
+    def flush(self):
+        """큐에 쌓인 로그가 모두 파일에 쓰일 때까지 대기"""
+        self._queue.join()
+
+    def close(self):
+        """남은 로그를 쓰고 기록 스레드 종료"""
+        self._stopped = True
+        self._thread.join(timeout=self.flush_interval * 2 + 1)
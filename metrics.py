@@ -0,0 +1,202 @@
+"""
+단계별 소요 시간 / 검색 통계 지표 (Prometheus 텍스트 형식)
+
+검색 엔진은 검색 1회 안의 단계(HTTP 수집, browser.get, 상품 대기, 스크롤, 파싱, 분석, 다음 페이지 클릭 등)마다
+걸린 시간을 stats['spans'] = {단계: [초, ...]} 로 돌려주고, 서버는 이것을 MetricsRegistry 의 히스토그램에 넣는다.
+/metrics 는 registry.render() 결과(Prometheus text exposition format 0.0.4)를 그대로 내보낸다.
+PhaseTimings 는 전체 검색 1회 동안의 단계별 합계를 모아서 검색이 끝날 때 대시보드에 보여줄 요약을 만든다.
+
+prometheus_client 없이 동작하도록 필요한 만큼(카운터/게이지/히스토그램, 라벨)만 직접 구현했다.
+"""
+
+from contextlib import contextmanager
+from execution import os_lock
+import math
+import time
+
+# 기본 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@contextmanager
+def span(stats, name):
+    """with 블록이 걸린 시간을 stats['spans'][name] 에 추가 (stats 가 None 이면 기록 안 함)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats['spans'].setdefault(name, []).append(time.perf_counter() - started)
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Metric:
+    """라벨 값 조합마다 값을 갖는 지표 (라벨 순서는 만들 때 정함)"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = os_lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name}: 라벨은 {self.labels} 이어야 합니다 ({tuple(labels)})")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{format_labels(self.labels, key)} {format_value(value)}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        """다른 객체가 센 누적 값을 그대로 옮길 때 (예: 검색 워커 재시작 횟수)"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_value(self, key, value):
+        counts, total = value
+        lines = [f'{self.name}_bucket{format_labels(self.labels, key, [("le", format_value(bound))])} {count}'
+                 for bound, count in zip(self.buckets, counts)]
+        lines.append(f'{self.name}_sum{format_labels(self.labels, key)} {format_value(total)}')
+        lines.append(f'{self.name}_count{format_labels(self.labels, key)} {counts[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """지표 모음. render() 는 모든 지표를 Prometheus 텍스트 형식으로 반환"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def collector(self, fn):
+        """render() 직전에 호출할 함수 등록 (다른 객체의 stats() 를 게이지로 옮길 때)"""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception:
+                pass
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class PhaseTimings:
+    """전체 검색 1회 동안의 단계별 횟수 / 합계 / 최대 시간 (검색 완료 요약용)"""
+
+    def __init__(self):
+        self._lock = os_lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._phases = {}
+            self.started = time.time()
+
+    def add_spans(self, spans):
+        with self._lock:
+            for phase, durations in spans.items():
+                count, total, worst = self._phases.get(phase, (0, 0.0, 0.0))
+                self._phases[phase] = (count + len(durations), total + sum(durations),
+                                       max([worst] + list(durations)))
+
+    def summary(self):
+        """{단계: {'count', 'total', 'avg_ms', 'max_ms'}} (합계가 큰 순서)"""
+        with self._lock:
+            phases = sorted(self._phases.items(), key=lambda item: item[1][1], reverse=True)
+        return {phase: {'count': count,
+                        'total': round(total, 2),
+                        'avg_ms': round(total * 1000 / count, 1) if count else 0.0,
+                        'max_ms': round(worst * 1000, 1)}
+                for phase, (count, total, worst) in phases}
@@ -0,0 +1,514 @@
+"""
+순위 데이터 저장소 (SQLite)
+
+    tracked_items      추적 중인 키워드/상품 목록 + 마지막 검색 결과 (화면 표시용) + 검색 주기/다음 검색 시각
+    rank_observations  검색할 때마다 쌓이는 순위 기록 (지우지 않고 추가만 함)
+
+엑셀(coupang_rank.xlsx)은 가져오기/내보내기 용도로만 사용한다.
+"""
+
+from datetime import datetime, timedelta
+import pandas as pd
+import threading
+import sqlite3
+import time
+import os
+
+DB_PATH = os.environ.get('RANK_DB', 'coupang_rank.db')
+
+# 화면/엑셀에 쓰는 컬럼 순서 (check_interval: 검색 주기(분), 0 이면 자동)
+COLUMNS = ['number', 'keyword', 'product_id', 'page', 'rank', 'ad', 'page_rank', 'date', 'time', 'check_interval']
+
+# 스케줄러가 관리하는 컬럼 (화면에는 보이지만 엑셀에는 넣지 않음)
+SCHEDULE_COLUMNS = ['auto_interval', 'next_check_at']
+
+# 웹에서 수정할 수 있는 컬럼
+EDITABLE_COLUMNS = {'number', 'keyword', 'product_id', 'page', 'rank', 'ad', 'page_rank', 'date', 'time', 'check_interval'}
+INT_COLUMNS = {'number', 'page', 'rank', 'page_rank', 'check_interval'}
+
+# 0 이 '못 찾음/광고' 를 뜻하는 컬럼 (정렬할 때 맨 뒤로)
+RESULT_COLUMNS = {'page', 'rank', 'page_rank'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked_items (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    number      INTEGER NOT NULL DEFAULT 0,
+    keyword     TEXT NOT NULL DEFAULT '',
+    product_id  TEXT NOT NULL DEFAULT '',
+    page        INTEGER NOT NULL DEFAULT 0,
+    rank        INTEGER NOT NULL DEFAULT 0,
+    ad          TEXT NOT NULL DEFAULT '0',
+    page_rank   INTEGER NOT NULL DEFAULT 0,
+    date        TEXT NOT NULL DEFAULT '',
+    time        TEXT NOT NULL DEFAULT '',
+    check_interval  INTEGER NOT NULL DEFAULT 0,
+    auto_interval   INTEGER NOT NULL DEFAULT 0,
+    next_check_at   TEXT NOT NULL DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS rank_observations (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id      INTEGER NOT NULL,
+    keyword      TEXT NOT NULL,
+    product_id   TEXT NOT NULL,
+    observed_at  TEXT NOT NULL,
+    found        INTEGER NOT NULL,
+    page         INTEGER NOT NULL DEFAULT 0,
+    rank         INTEGER NOT NULL DEFAULT 0,
+    rank_type    TEXT NOT NULL DEFAULT '',
+    page_rank    INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_observations_product_time
+    ON rank_observations (product_id, observed_at);
+
+CREATE INDEX IF NOT EXISTS idx_observations_item_time
+    ON rank_observations (item_id, observed_at);
+"""
+
+# 예전 DB 에 없으면 추가할 컬럼
+ADDED_COLUMNS = {
+    'check_interval': "INTEGER NOT NULL DEFAULT 0",
+    'auto_interval': "INTEGER NOT NULL DEFAULT 0",
+    'next_check_at': "TEXT NOT NULL DEFAULT ''"
+}
+
+
+def result_columns(result):
+    """검색 결과를 순위표 컬럼 값으로 변환 (못 찾으면 모두 0)"""
+    if not result:
+        return {'page': 0, 'rank': 0, 'ad': '0', 'page_rank': 0}
+    is_ad = result['rank_type'] == 'ad'
+    return {
+        'page': int(result['page']),
+        'rank': 0 if is_ad else int(result['rank']),
+        'ad': 'O' if is_ad else '0',
+        'page_rank': int(result['page_rank'])
+    }
+
+
+class RankStore:
+    """tracked_items / rank_observations 테이블 접근
+
+    스레드마다 연결을 따로 열고 WAL 모드를 사용해서,
+    스케줄러 검색과 웹 요청이 동시에 읽고 써도 서로 막지 않게 한다.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(tracked_items)")}
+            for column, definition in ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE tracked_items ADD COLUMN {column} {definition}")
+
+    def _connect(self):
+        """현재 스레드의 연결 반환 (없으면 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---- 추적 항목 ----
+
+    def items(self):
+        """추적 항목 전체 (화면 순서)"""
+        rows = self._connect().execute(
+            f"SELECT id, {', '.join(COLUMNS + SCHEDULE_COLUMNS)} FROM tracked_items ORDER BY number, id"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_item(self, item_id):
+        """추적 항목 1개 (없으면 None)"""
+        row = self._connect().execute(
+            f"SELECT id, {', '.join(COLUMNS + SCHEDULE_COLUMNS)} FROM tracked_items WHERE id = ?", (item_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def load_df(self):
+        """추적 항목 전체를 DataFrame 으로 반환 (id 컬럼 포함)"""
+        return pd.DataFrame(self.items(), columns=['id'] + COLUMNS)
+
+    def add_item(self, keyword='', product_id='', number=None):
+        """새 추적 항목 추가 후 id 반환"""
+        with self._connect() as conn:
+            if number is None:
+                number = conn.execute("SELECT COALESCE(MAX(number), 0) + 1 FROM tracked_items").fetchone()[0]
+            cursor = conn.execute(
+                "INSERT INTO tracked_items (number, keyword, product_id) VALUES (?, ?, ?)",
+                (number, str(keyword).strip(), str(product_id).strip())
+            )
+            return cursor.lastrowid
+
+    def update_item(self, item_id, column, value):
+        """추적 항목의 컬럼 1개 수정"""
+        if column not in EDITABLE_COLUMNS:
+            raise ValueError(f"수정할 수 없는 컬럼입니다: {column}")
+        if column in INT_COLUMNS:
+            value = 0 if value in ('', None) else int(value)
+            if column == 'check_interval' and value < 0:
+                raise ValueError("검색 주기는 0(자동) 이상이어야 합니다.")
+        elif column == 'ad':
+            value = '0' if value in ('', None) else str(value)
+        else:
+            value = '' if value is None else str(value).strip()
+        with self._connect() as conn:
+            conn.execute(f"UPDATE tracked_items SET {column} = ? WHERE id = ?", (value, item_id))
+
+    def delete_item(self, item_id):
+        """추적 항목 삭제 (순위 기록은 남겨둠)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tracked_items WHERE id = ?", (item_id,))
+
+    # ---- 순위 기록 ----
+
+    def record_result(self, item_id, keyword, product_id, result, observed_at=None):
+        """검색 결과 1건 저장: 추적 항목의 마지막 결과 갱신 + 순위 기록 추가
+
+        화면에 표시할 갱신된 컬럼 값 dict 반환
+        """
+        observed_at = observed_at or datetime.now()
+        values = result_columns(result)
+        values['date'] = observed_at.strftime('%Y-%m-%d')
+        values['time'] = observed_at.strftime('%H:%M:%S')
+
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE tracked_items SET page = ?, rank = ?, ad = ?, page_rank = ?, date = ?, time = ? WHERE id = ?",
+                (values['page'], values['rank'], values['ad'], values['page_rank'],
+                 values['date'], values['time'], item_id)
+            )
+            conn.execute(
+                "INSERT INTO rank_observations "
+                "(item_id, keyword, product_id, observed_at, found, page, rank, rank_type, page_rank) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (item_id, keyword, product_id, observed_at.strftime('%Y-%m-%d %H:%M:%S'),
+                 1 if result else 0,
+                 int(result['page']) if result else 0,
+                 int(result['rank']) if result else 0,
+                 result['rank_type'] if result else '',
+                 int(result['page_rank']) if result else 0)
+            )
+        return values
+
+    def update_schedules(self, schedules):
+        """{항목 id: {'auto_interval': 분, 'next_check_at': 'YYYY-MM-DD HH:MM:SS'}} 한 번에 저장"""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE tracked_items SET auto_interval = ?, next_check_at = ? WHERE id = ?",
+                [(values['auto_interval'], values['next_check_at'], item_id) for item_id, values in schedules.items()]
+            )
+
+    def recent_observations(self, item_id, limit=12):
+        """항목의 최근 순위 기록 [(발견 여부, 전체 순위), ...] (최신순)"""
+        rows = self._connect().execute(
+            "SELECT found, page_rank FROM rank_observations WHERE item_id = ? ORDER BY observed_at DESC, id DESC LIMIT ?",
+            (item_id, limit)
+        ).fetchall()
+        return [(row['found'], row['page_rank']) for row in rows]
+
+    def last_known_pages(self, keyword, product_ids, max_age_days=7):
+        """키워드에서 상품들이 마지막으로 (광고가 아닌 순위로) 발견된 페이지 {상품 ID: 페이지}
+
+        max_age_days 보다 오래된 기록은 힌트로 쓰지 않음
+        """
+        since = (datetime.now() - timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+        conn = self._connect()
+        pages = {}
+        for product_id in product_ids:
+            row = conn.execute(
+                "SELECT page FROM rank_observations "
+                "WHERE product_id = ? AND keyword = ? AND found = 1 AND rank_type != 'ad' AND observed_at >= ? "
+                "ORDER BY observed_at DESC LIMIT 1",
+                (product_id, keyword, since)
+            ).fetchone()
+            if row is not None and row['page'] > 0:
+                pages[product_id] = row['page']
+        return pages
+
+    def history(self, product_id, date=None, limit=500):
+        """상품의 순위 기록 (최신순), date='YYYY-MM-DD' 이면 그 날짜만"""
+        query = "SELECT * FROM rank_observations WHERE product_id = ?"
+        params = [product_id]
+        if date:
+            query += " AND observed_at BETWEEN ? AND ?"
+            params += [f"{date} 00:00:00", f"{date} 23:59:59"]
+        query += " ORDER BY observed_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._connect().execute(query, params).fetchall()]
+
+    # ---- 엑셀 가져오기/내보내기 ----
+
+    def is_empty(self):
+        return self._connect().execute("SELECT COUNT(*) FROM tracked_items").fetchone()[0] == 0
+
+    def import_excel(self, path):
+        """엑셀 파일의 행들을 추적 항목으로 추가 후 추가된 개수 반환"""
+        df = pd.read_excel(path)
+        missing_columns = [col for col in ['keyword', 'product_id'] if col not in df.columns]
+        if missing_columns:
+            raise ValueError(f"엑셀 파일에 필수 컬럼이 없습니다: {', '.join(missing_columns)}")
+
+        for col in COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        df = df[COLUMNS]
+        df[['page', 'rank', 'page_rank', 'check_interval']] = \
+            df[['page', 'rank', 'page_rank', 'check_interval']].fillna(0).astype(int)
+        df['ad'] = df['ad'].fillna('0').astype(str).replace({'0.0': '0'})
+        df['number'] = df['number'].fillna(0).astype(int)
+        df[['keyword', 'product_id', 'date', 'time']] = df[['keyword', 'product_id', 'date', 'time']].fillna('').astype(str)
+        df['keyword'] = df['keyword'].str.strip()
+        df['product_id'] = df['product_id'].str.strip()
+
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO tracked_items ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                df.itertuples(index=False, name=None)
+            )
+        return len(df)
+
+    def export_excel(self, path):
+        """추적 항목을 엑셀 파일(경로 또는 BytesIO)로 저장"""
+        self.load_df()[COLUMNS].to_excel(path, index=False)
+        return path
+
+
+def is_valid_item(item):
+    """키워드와 상품 ID 가 모두 있는 (검색할 수 있는) 항목인지"""
+    return bool(str(item['keyword']).strip()) and bool(str(item['product_id']).strip())
+
+
+def sort_key(column):
+    """컬럼 정렬 키 함수, 첫 값은 빈 값 여부 (빈 값/0 순위는 맨 뒤, 같으면 화면 순서)"""
+    if column in RESULT_COLUMNS:
+        return lambda row: (row[column] == 0, row[column], row['number'], row['id'])
+    if column == 'date':
+        return lambda row: (row['date'] == '', row['date'], row['time'], row['id'])
+    if column in INT_COLUMNS:
+        return lambda row: (False, row[column], row['id'])
+    return lambda row: (str(row[column]) == '', str(row[column]), row['number'], row['id'])
+
+
+class RankTable:
+    """메모리에 올려둔 순위표
+
+    - 처음 읽을 때 DB 에서 한 번 불러오고 (lazy load) 이후에는 메모리에서 바로 응답
+    - DB 파일(및 WAL 파일)의 수정 시간/크기가 바뀌면 다른 프로세스가 쓴 것으로 보고 다시 읽음
+    - 쓰기는 DB 에 먼저 저장한 뒤 메모리에도 반영 (write-through)
+    - 행마다 마지막으로 바뀐 version 을 기억해서 changes(since) 로 바뀐 행만 돌려줌
+    반환되는 행은 복사본이므로 수정해도 순위표에는 영향이 없다.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.RLock()
+        self._rows = None      # 화면 순서대로 정렬된 행 목록
+        self._by_id = {}       # id -> 행
+        self._stamp = None
+        self.version = 0       # 내용이 바뀔 때마다 1씩 증가
+        self._row_versions = {}   # id -> 마지막으로 바뀐 version
+        self._deleted = {}        # 삭제된 id -> 삭제된 version
+        self._reset_version = 0   # 전체를 다시 읽은 version (이전 version 기준 변경분은 알 수 없음)
+        self._sort_indexes = {}   # (컬럼, 방향) -> 정렬된 행 목록 (내용이 바뀌면 비움)
+        self._epoch = f"{os.getpid()}-{int(time.time())}"  # 재시작하면 version 이 다시 시작하므로 ETag 에 포함
+
+    def _file_stamp(self):
+        """DB/WAL 파일의 (수정 시간, 크기)"""
+        stamp = []
+        for path in (self.store.path, self.store.path + '-wal'):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _reload(self):
+        self._rows = self.store.items()
+        self._by_id = {row['id']: row for row in self._rows}
+        self._stamp = self._file_stamp()
+        self.version += 1
+        self._row_versions = {}
+        self._deleted = {}
+        self._reset_version = self.version
+        self._sort_indexes = {}
+
+    def _ensure_loaded(self):
+        """처음이거나 DB 파일이 바뀌었으면 다시 읽기 (잠금 안에서 호출)"""
+        if self._rows is None or self._file_stamp() != self._stamp:
+            self._reload()
+
+    def _sort(self):
+        self._rows.sort(key=lambda row: (row['number'], row['id']))
+
+    def _after_write(self, item_id=None, deleted=False):
+        """자기가 쓴 내용 때문에 다시 읽지 않도록 파일 상태 갱신 + 바뀐 행 version 기록"""
+        self._stamp = self._file_stamp()
+        self.version += 1
+        self._sort_indexes = {}
+        if item_id is not None:
+            if deleted:
+                self._row_versions.pop(item_id, None)
+                self._deleted[item_id] = self.version
+            else:
+                self._row_versions[item_id] = self.version
+
+    # ---- 읽기 ----
+
+    def rows(self):
+        """전체 행 (화면 순서)"""
+        with self._lock:
+            self._ensure_loaded()
+            return [dict(row) for row in self._rows]
+
+    def valid_rows(self):
+        """검색할 수 있는 행만"""
+        with self._lock:
+            self._ensure_loaded()
+            return [dict(row) for row in self._rows if is_valid_item(row)]
+
+    def get(self, item_id):
+        """id 로 행 1개 (없으면 None)"""
+        with self._lock:
+            self._ensure_loaded()
+            row = self._by_id.get(item_id)
+            return dict(row) if row else None
+
+    def changes(self, since):
+        """version since 이후에 바뀐 행만 반환
+
+        {'version': 현재 version, 'reset': 전체를 다시 받아야 하는지, 'rows': 바뀐 행, 'deleted': 삭제된 id}
+        since 가 전체를 다시 읽기 전 version 이면 reset=True 와 전체 행을 돌려준다.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if since < self._reset_version:
+                return {'version': self.version, 'reset': True,
+                        'rows': [dict(row) for row in self._rows], 'deleted': []}
+            rows = [dict(self._by_id[item_id]) for item_id, version in self._row_versions.items()
+                    if version > since and item_id in self._by_id]
+            deleted = [item_id for item_id, version in self._deleted.items() if version > since]
+            return {'version': self.version, 'reset': False, 'rows': rows, 'deleted': deleted}
+
+    def _sorted(self, column, order):
+        """컬럼 기준으로 정렬된 행 목록 (같은 version 동안 재사용, 빈 값은 내림차순에서도 맨 뒤)"""
+        rows = self._sort_indexes.get((column, order))
+        if rows is None:
+            key = sort_key(column)
+            rows = sorted(self._rows, key=key, reverse=(order == 'desc'))
+            if order == 'desc':
+                rows = [row for row in rows if not key(row)[0]] + [row for row in rows if key(row)[0]]
+            self._sort_indexes[(column, order)] = rows
+        return rows
+
+    def query(self, page=1, per_page=50, sort='number', order='asc', keyword='', product_id=''):
+        """정렬/필터/페이지 나눔을 적용한 행 목록
+
+        keyword, product_id 는 부분 일치 (대소문자 무시)
+        {'version', 'etag', 'total', 'page', 'per_page', 'rows'} 반환
+        """
+        if sort not in COLUMNS:
+            raise ValueError(f"정렬할 수 없는 컬럼입니다: {sort}")
+        page = max(1, int(page))
+        per_page = max(1, min(int(per_page), 500))
+        keyword = (keyword or '').strip().lower()
+        product_id = (product_id or '').strip().lower()
+
+        with self._lock:
+            self._ensure_loaded()
+            rows = self._sorted(sort, 'desc' if order == 'desc' else 'asc')
+            if keyword:
+                rows = [row for row in rows if keyword in str(row['keyword']).lower()]
+            if product_id:
+                rows = [row for row in rows if product_id in str(row['product_id']).lower()]
+            start = (page - 1) * per_page
+            return {
+                'version': self.version,
+                'etag': f"{self._epoch}-{self.version}",
+                'total': len(rows),
+                'page': page,
+                'per_page': per_page,
+                'rows': [dict(row) for row in rows[start:start + per_page]]
+            }
+
+    def find_by_product(self, product_id):
+        """상품 ID 로 첫 번째 행 (없으면 None)"""
+        with self._lock:
+            self._ensure_loaded()
+            for row in self._rows:
+                if row['product_id'] == product_id:
+                    return dict(row)
+            return None
+
+    # ---- 쓰기 (DB 저장 후 메모리 반영) ----
+
+    def add_item(self, keyword='', product_id='', number=None):
+        with self._lock:
+            self._ensure_loaded()
+            item_id = self.store.add_item(keyword, product_id, number)
+            row = self.store.get_item(item_id)
+            self._rows.append(row)
+            self._by_id[item_id] = row
+            self._sort()
+            self._after_write(item_id)
+            return item_id
+
+    def update_item(self, item_id, column, value):
+        with self._lock:
+            self._ensure_loaded()
+            self.store.update_item(item_id, column, value)
+            row = self.store.get_item(item_id)
+            if row is not None and item_id in self._by_id:
+                self._by_id[item_id].update(row)
+                if column == 'number':
+                    self._sort()
+            self._after_write(item_id)
+
+    def delete_item(self, item_id):
+        with self._lock:
+            self._ensure_loaded()
+            self.store.delete_item(item_id)
+            row = self._by_id.pop(item_id, None)
+            if row is not None:
+                self._rows.remove(row)
+            self._after_write(item_id, deleted=True)
+
+    def update_schedules(self, schedules):
+        """다음 검색 시각/자동 주기 저장 후 {항목 id: 갱신된 값 (id, version 포함)} 반환"""
+        with self._lock:
+            self._ensure_loaded()
+            self.store.update_schedules(schedules)
+            updated = {}
+            for item_id, values in schedules.items():
+                if item_id in self._by_id:
+                    self._by_id[item_id].update(values)
+                self._after_write(item_id)
+                updated[item_id] = dict(values, id=item_id, version=self.version)
+            return updated
+
+    def record_result(self, item_id, keyword, product_id, result, observed_at=None):
+        """검색 결과 저장 후 갱신된 컬럼 값 반환 (id, version 포함)"""
+        with self._lock:
+            self._ensure_loaded()
+            values = self.store.record_result(item_id, keyword, product_id, result, observed_at)
+            if item_id in self._by_id:
+                self._by_id[item_id].update(values)
+            self._after_write(item_id)
+            return dict(values, id=item_id, version=self.version)
+
+    def import_excel(self, path):
+        with self._lock:
+            count = self.store.import_excel(path)
+            self._reload()
+            return count
+
+    def export_excel(self, path):
+        with self._lock:
+            return self.store.export_excel(path)
@@ -0,0 +1,590 @@
+"""
+키워드 검색 엔진 (브라우저 풀 / HTTP 수집 / 검색 결과 캐시 / 전체 저장)
+
+웹 서버(Flask, eventlet) 와 상관없이 동작하도록 분리한 검색 부분이다.
+서버 프로세스 안에서 스레드로 쓰거나(SEARCH_ISOLATION=thread),
+search_workers 의 워커 프로세스 안에서 따로 만들어서 쓴다(SEARCH_ISOLATION=process).
+
+설정은 dict 로 받는다 (워커 프로세스로 그대로 넘길 수 있도록). 빠진 값은 DEFAULT_CONFIG 사용.
+로그는 log(message, level='INFO', **fields), 페이지를 열기 시작할 때마다 heartbeat(keyword, page) 호출.
+검색 통계의 spans 에는 단계별 소요 시간이 들어간다 (metrics.span, 서버에서 히스토그램으로 합산).
+"""
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import ThreadPoolExecutor
+from browser_pool import BrowserPool
+from serp_fetch import SerpFetcher, PagePrefetcher, page_url
+from serp_parser import extract_products
+from serp_cache import SerpCache, CACHE_PATH
+from serp_capture import SerpCaptureStore, CAPTURE_PATH
+from metrics import span
+import threading
+import random
+import time
+
+# 검색 결과 마지막 페이지
+LAST_PAGE = 27
+
+DEFAULT_CONFIG = {
+    'fetch_mode': 'http',            # 'http' (HTTP 우선, 상품 목록이 없으면 브라우저) / 'browser'
+    'browser_pool_size': 1,
+    'browser_max_uses': 50,
+    'fetch_pool_size': 2,            # HTTP 연결 풀 크기
+    'prefetch_depth': 1,             # 미리 가져올 다음 페이지 수 (0 이면 안 함)
+    'prefetch_workers': 1,
+    'hint_radius': 2,                # 힌트 페이지 앞뒤로 먼저 볼 페이지 수
+    'cache_ttl': 600,                # 검색 결과 캐시 (0 이면 사용 안 함)
+    'cache_max_entries': 5000,
+    'capture': True,                 # 검색한 페이지의 상품 목록 전체 저장
+    'scroll_humanize_budget': 1.5,
+    'scroll_settle_time': 0.5,
+    'page_load_timeout': 30,         # 브라우저 페이지 로드 제한 시간 (초)
+    'page_retries': 2,               # 페이지 오류 시 다시 시도할 횟수 (넘으면 그 페이지는 건너뜀)
+    'base_url': None,                # 검색 주소 (None 이면 COUPANG_BASE_URL, 벤치마크/테스트 서버용)
+    'cache_path': None,              # 검색 결과 캐시 DB (None 이면 SERP_CACHE_PATH)
+    'capture_path': None             # 전체 저장 DB (None 이면 SERP_CAPTURE_PATH)
+}
+
+# 스크롤 1회 후 화면 상태 (상품 수, 문서 높이, 현재 보이는 영역의 아래쪽 위치)
+SCROLL_STATE_JS = """
+return [document.querySelectorAll('.search-product').length,
+        document.body.scrollHeight,
+        window.scrollY + window.innerHeight];
+"""
+
+
+class SearchCancelled(Exception):
+    """검색 중지 요청으로 검색이 중단됨"""
+    pass
+
+
+class BrowserUnavailable(Exception):
+    """브라우저를 띄우지 못해서 검색을 중단함 (같은 페이지를 다시 시도해도 소용없음)"""
+    pass
+
+
+class ScrollMetrics:
+    """스크롤에 쓴 시간 / 지연 로딩을 기다린 시간 누적 통계"""
+
+    def __init__(self):
+        self.pages = 0
+        self.scroll_time = 0.0
+        self.wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, scroll_time, wait_time, pages=1):
+        with self._lock:
+            self.pages += pages
+            self.scroll_time += scroll_time
+            self.wait_time += wait_time
+
+    def summary(self):
+        with self._lock:
+            pages = max(self.pages, 1)
+            return {
+                'pages': self.pages,
+                'scroll_time': round(self.scroll_time, 2),
+                'wait_time': round(self.wait_time, 2),
+                'avg_per_page': round((self.scroll_time + self.wait_time) / pages, 2)
+            }
+
+
+class PageLoadMetrics:
+    """키워드 검색마다 실제로 연 페이지 수와 1페이지부터 순서대로 봤다면 열었을 페이지 수 누적 (검색 1회 단위)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.keywords = 0
+            self.pages_loaded = 0
+            self.sequential_pages = 0
+            self.hinted = 0
+            self.hint_hits = 0
+
+    def add(self, pages_loaded, sequential_pages, hinted, hint_hit):
+        with self._lock:
+            self.keywords += 1
+            self.pages_loaded += pages_loaded
+            self.sequential_pages += sequential_pages
+            self.hinted += 1 if hinted else 0
+            self.hint_hits += 1 if hint_hit else 0
+
+    def summary(self):
+        with self._lock:
+            return {
+                'keywords': self.keywords,
+                'pages_loaded': self.pages_loaded,
+                'sequential_pages': self.sequential_pages,
+                'pages_saved': self.sequential_pages - self.pages_loaded,
+                'hinted': self.hinted,
+                'hint_hits': self.hint_hits
+            }
+
+
+def plan_pages(hint_pages, last_page=LAST_PAGE, radius=2):
+    """페이지 방문 순서와 힌트 주변 페이지 수 반환
+
+    힌트 페이지마다 힌트, 힌트-1, 힌트+1, 힌트-2, 힌트+2 ... (radius 까지) 를 먼저 보고,
+    그 안에서 못 찾으면 1페이지부터 아직 안 본 페이지를 순서대로 본다.
+    """
+    order = []
+    for hint in sorted(set(hint_pages)):
+        for distance in range(radius + 1):
+            for page in ((hint,) if distance == 0 else (hint - distance, hint + distance)):
+                if 1 <= page <= last_page and page not in order:
+                    order.append(page)
+    neighborhood = len(order)
+    order += [page for page in range(1, last_page + 1) if page not in order]
+    return order, neighborhood
+
+
+def adaptive_scroll(browser, humanize_budget=1.5, settle_time=0.5, poll_interval=0.1):
+    """지연 로딩되는 상품이 더 이상 늘지 않을 때까지만 스크롤하는 함수
+
+    한 화면씩 내리면서 .search-product 개수와 문서 높이를 짧게 폴링하고,
+    settle_time 동안 변화가 없고 문서 끝에 닿으면 바로 종료한다.
+    사람처럼 보이기 위한 랜덤 대기는 페이지당 humanize_budget 초 안에서만 사용한다.
+    {'scroll_time', 'wait_time', 'steps', 'products'} 반환
+    """
+    screen_height = browser.execute_script("return window.innerHeight")
+    count, total_height, bottom = browser.execute_script(SCROLL_STATE_JS)
+
+    scroll_time = 0.0
+    wait_time = 0.0
+    steps = 0
+    current_scroll = 0
+
+    while True:
+        # 한 화면씩 스크롤 + 남은 예산 안에서 짧은 랜덤 대기
+        started = time.time()
+        current_scroll = min(current_scroll + screen_height, total_height)
+        browser.execute_script(f"window.scrollTo(0, {current_scroll});")
+        steps += 1
+        pause = min(random.uniform(0.1, 0.4), humanize_budget)
+        if pause > 0:
+            time.sleep(pause)
+            humanize_budget -= pause
+        scroll_time += time.time() - started
+
+        # 중간에서는 한 번만 확인하고, 문서 끝에 닿으면 변화가 멈출 때까지 폴링
+        started = time.time()
+        stable_since = time.time()
+        while True:
+            new_count, new_height, bottom = browser.execute_script(SCROLL_STATE_JS)
+            if new_count != count or new_height != total_height:
+                count, total_height = new_count, new_height
+                stable_since = time.time()
+            if bottom < total_height or time.time() - stable_since >= settle_time:
+                break
+            time.sleep(poll_interval)
+        wait_time += time.time() - started
+
+        # 문서 끝 도달 (무한 스크롤 페이지 대비 최대 50회)
+        if bottom >= total_height or steps >= 50:
+            break
+
+    return {
+        'scroll_time': scroll_time,
+        'wait_time': wait_time,
+        'steps': steps,
+        'products': count
+    }
+
+
+def analyze_page(products, page, product_ids):
+    """페이지 을 분석하여 상품 찾기
+
+    products 는 serp_parser.extract_products() 결과 (페이지의 상품 목록)
+    product_ids 에 있는 상품들을 한 번에 찾아서 {상품 ID: 결과} 로 반환
+    """
+    non_ad_rank = 0
+    ad_rank = 0
+    ad_count = 0
+    found = {}
+
+    for product in products:
+        # 광고 상품 체크
+        is_ad = product['is_ad']
+
+        if is_ad:
+            ad_count += 1
+            ad_rank += 1
+        else:
+            non_ad_rank += 1
+
+        # 링크/상품명이 없는 상품은 순위에만 포함
+        if product['id'] is None:
+            continue
+
+        current_name = product['name']
+        current_url = product['href']
+        current_id = product['id']
+
+        # 목록 상 확인
+        if current_id in product_ids and current_id not in found:
+            print("\n[상품 발견!]")
+            print(f"페이지: {page}")
+
+            # 광고 상품인 경우
+            if is_ad:
+                print(f"광고 순위: {ad_rank}")
+                rank_type = "ad"
+                rank_value = ad_rank
+            else:
+                print(f"일반 순위: {non_ad_rank}")
+                rank_type = "normal"
+                rank_value = non_ad_rank
+
+            if ad_count > 0:
+                print(f"광고 상품 수: {ad_count}개")
+            print(f"상품명: {current_name}")
+            print(f"상품 ID: {current_id}")
+            print(f"URL: https://www.coupang.com{current_url}")
+
+            # 전체 페이지 순위 계산 (36개 기준)
+            page_rank = ((page - 1) * 36) + rank_value
+
+            found[current_id] = {
+                'page': page,
+                'rank': rank_value,
+                'rank_type': rank_type,
+                'page_rank': page_rank,
+                'ad_count': ad_count,
+                'name': current_name,
+                'id': current_id,
+                'url': f"https://www.coupang.com{current_url}"
+            }
+
+    return found
+
+
+def go_to_next_page(browser, page):
+    """브라우저에서 다음 페이지 버튼 클릭 (사람처럼 이동)"""
+    next_page = WebDriverWait(browser, 10).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, f"a.page-link[href*='page={page + 1}']"))
+    )
+
+    browser.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_page)
+    time.sleep(random.uniform(0.2, 0.5))
+
+    # 클릭 후 이전 페이지가 사라질 때까지 대기 (고정 대기 대신)
+    next_page.click()
+    WebDriverWait(browser, 10).until(EC.staleness_of(next_page))
+
+
+def new_search_stats():
+    """search() 1회의 통계 (검색 결과와 함께 반환, 서버에서 ScrollMetrics/PageLoadMetrics 에 합산)"""
+    return {
+        'pages_loaded': 0,
+        'sequential_pages': 0,
+        'hinted': False,
+        'hint_hit': False,
+        'scroll_pages': 0,
+        'scroll_time': 0.0,
+        'wait_time': 0.0,
+        'parse_time': 0.0,
+        'browser_launches': 0,
+        'skipped_pages': [],  # page_retries 번 넘게 실패해서 건너뛴 페이지
+        'cache': {'hits': 0, 'misses': 0, 'stores': 0, 'evicted': 0},   # 검색 결과 캐시 사용 횟수
+        'spans': {}      # 단계별 소요 시간 목록 (http_fetch, browser_get, wait_products, scroll, parse, analyze ...)
+    }
+
+
+class SearchEngine:
+    """한 키워드의 검색 결과를 훑어서 여러 상품의 순위를 찾는 검색기
+
+    브라우저 풀, HTTP 세션, 미리 가져오기 스레드, 검색 결과 캐시/저장소를 직접 갖고 있고 close() 로 정리한다.
+    search() 는 여러 스레드에서 동시에 불러도 된다 (브라우저는 풀에서 하나씩 대여).
+    """
+
+    def __init__(self, config=None, log=print, heartbeat=None):
+        self.config = dict(DEFAULT_CONFIG, **(config or {}))
+        self.log = log
+        self.heartbeat = heartbeat or (lambda keyword, page: None)
+        config = self.config
+
+        self.browser_pool = BrowserPool(size=config['browser_pool_size'], max_uses=config['browser_max_uses'],
+                                        log=log)
+        # 브라우저 모드의 미리 가져오기는 전용 브라우저(미리 가져오기 스레드 수만큼)로만 한다.
+        # 검색용 풀에서 빌리면 워커가 자기 브라우저를 기다리게 되므로 (풀 크기 1 이면 순서대로 도는 것과 같음)
+        self.prefetch_pool = None
+        if config['fetch_mode'] == 'browser' and config['prefetch_depth'] > 0:
+            self.prefetch_pool = BrowserPool(size=max(1, config['prefetch_workers']),
+                                             max_uses=config['browser_max_uses'], log=log)
+        self.serp_fetcher = SerpFetcher(base_url=config['base_url'], pool_size=config['fetch_pool_size'], log=log)
+        self.serp_cache = SerpCache(path=config['cache_path'] or CACHE_PATH, ttl=config['cache_ttl'],
+                                    max_entries=config['cache_max_entries'])
+        self.serp_capture = SerpCaptureStore(config['capture_path'] or CAPTURE_PATH) if config['capture'] else None
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=max(1, config['prefetch_workers']),
+                                                    thread_name_prefix='prefetch')
+
+    def load_page_with_browser(self, browser, url, stats=None):
+        """브라우저로 검색 결과 페이지를 열고 스크롤까지 마친 뒤 HTML 반환"""
+        browser.delete_all_cookies()
+        # 응답 없는 페이지에서 무한히 기다리지 않도록
+        browser.set_page_load_timeout(self.config['page_load_timeout'])
+        with span(stats, 'browser_get'):
+            browser.get(url)
+
+        # 페이지 로딩 대기
+        with span(stats, 'wait_products'):
+            WebDriverWait(browser, 10).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "search-product"))
+            )
+
+        # 지연 로딩이 끝날 때까지만 스크롤
+        with span(stats, 'scroll'):
+            scroll = adaptive_scroll(browser, self.config['scroll_humanize_budget'], self.config['scroll_settle_time'])
+        self.log(f"스크롤 완료: 상품 {scroll['products']}개, 스크롤 {scroll['scroll_time']:.1f}초, 대기 {scroll['wait_time']:.1f}초")
+        if stats is not None:
+            stats['scroll_pages'] += 1
+            stats['scroll_time'] += scroll['scroll_time']
+            stats['wait_time'] += scroll['wait_time']
+
+        return browser.page_source
+
+    def fetch_page_detached(self, keyword, page, stats=None):
+        """검색 워커의 브라우저를 쓰지 않고 페이지 HTML 가져오기 (미리 가져오기용)
+
+        HTTP 모드면 HTTP 로, 브라우저 모드면 미리 가져오기 전용 브라우저가 비어 있을 때만 그 브라우저로 가져온다.
+        가져오지 못하면 None (워커가 직접 다시 가져옴)
+        """
+        if self.config['fetch_mode'] == 'http':
+            with span(stats, 'http_fetch'):
+                return self.serp_fetcher.fetch(keyword, page)
+
+        browser = self.prefetch_pool.checkout(block=False) if self.prefetch_pool else None
+        if browser is None:
+            return None
+        broken = False
+        try:
+            return self.load_page_with_browser(browser, page_url(keyword, page, self.config['base_url']), stats)
+        except Exception as e:
+            self.log(f"{page}페이지 미리 가져오기 실패: {str(e)}")
+            broken = True
+            return None
+        finally:
+            self.prefetch_pool.checkin(browser, broken=broken)
+
+    def launch_count(self):
+        """검색용 + 미리 가져오기용 브라우저를 띄운 횟수"""
+        return self.browser_pool.launch_count + (self.prefetch_pool.launch_count if self.prefetch_pool else 0)
+
+    def checkout_browser(self):
+        """풀에서 브라우저 대여, 띄우지 못하면 BrowserUnavailable (페이지 재시도 대상이 아님)"""
+        try:
+            return self.browser_pool.checkout()
+        except Exception as e:
+            raise BrowserUnavailable(f"브라우저를 띄우지 못했습니다: {str(e)}") from e
+
+    def search_products(self, keyword, product_ids, should_stop=None, hints=None):
+        """{상품 ID: 결과} 만 반환하는 search()"""
+        return self.search(keyword, product_ids, should_stop=should_stop, hints=hints)[0]
+
+    def search(self, keyword, product_ids, should_stop=None, hints=None, resume=None, on_page=None):
+        """한 키워드의 검색 결과를 한 번만 훑으면서 여러 상품의 순위를 찾는 함수
+
+        모든 상품을 찾거나 27페이지까지 본 뒤 ({상품 ID: 결과}, 통계) 반환 (못 찾은 상품은 빠짐)
+        hints({상품 ID: 마지막 발견 페이지}) 에 모든 상품의 페이지가 있으면 그 주변 페이지부터 보고,
+        거기서 못 찾은 경우에만 1페이지부터 나머지를 본다. (page_rank 는 페이지 번호로 계산하므로 순서와 무관)
+        fetch_mode 가 'http' 이면 페이지를 HTTP 로 먼저 가져오고,
+        응답에 상품 목록이 없을 때만 브라우저로 다시 연다.
+        prefetch_depth > 0 이면 현재 페이지를 분석하는 동안 다음 페이지를 미리 가져온다.
+        should_stop 이 주어지면 페이지마다 확인해서 True 이면 SearchCancelled 발생
+        페이지 오류는 page_retries 번까지 다시 시도하고 그래도 실패하면 그 페이지를 건너뛴다.
+        브라우저를 띄우지 못하면 재시도하지 않고 BrowserUnavailable 발생
+        resume({'pages': [이미 본 페이지], 'found': {상품 ID: 결과}}) 는 중단된 검색의 중간 저장으로,
+        이미 본 페이지는 건너뛰고 그때 찾은 상품은 찾은 것으로 시작한다.
+        on_page(페이지, {상품 ID: 결과}) 는 페이지 1개를 다 볼 때마다 호출된다 (중간 저장용)
+        """
+        config = self.config
+        log = self.log
+        browser = None
+        remaining = set(product_ids)
+        resume = resume or {}
+        found = {product_id: result for product_id, result in resume.get('found', {}).items() if product_id in remaining}
+        remaining -= set(found)
+        stats = new_search_stats()
+        launches = self.launch_count()
+        hints = hints or {}
+        hinted = bool(remaining) and all(product_id in hints for product_id in remaining)
+        if hinted:
+            order, neighborhood = plan_pages([hints[product_id] for product_id in remaining],
+                                             radius=config['hint_radius'])
+        else:
+            order, neighborhood = list(range(1, LAST_PAGE + 1)), 0
+        # 중단되기 전에 이미 본 페이지는 건너뜀 (주변 페이지 수도 남은 페이지 기준)
+        skipped = set(resume.get('pages', []))
+        if skipped:
+            neighborhood -= sum(1 for page in order[:neighborhood] if page in skipped)
+            order = [page for page in order if page not in skipped]
+        capture_run = None
+        prefetcher = None
+        if config['prefetch_depth'] > 0:
+            prefetcher = PagePrefetcher(lambda page: self.fetch_page_detached(keyword, page, stats),
+                                        self.prefetch_executor, depth=config['prefetch_depth'])
+        try:
+            log(f"검색 시작: 키워드 '{keyword}', 상품 ID {', '.join(sorted(remaining))}")
+            if skipped:
+                log(f"중단된 검색 이어서: {len(skipped)}페이지 건너뜀, 이미 찾은 상품 {len(found)}개", keyword=keyword)
+            if found and not remaining:
+                return found, stats
+            if hinted:
+                log(f"이전 순위 기준으로 {', '.join(map(str, order[:neighborhood]))}페이지부터 검색", keyword=keyword)
+
+            index = 0
+            failures = {}   # 페이지 → 오류 횟수
+
+            while index < len(order):
+                page = order[index]
+                if should_stop and should_stop():
+                    raise SearchCancelled()
+
+                try:
+                    log(f"\n{page}페이지 검색 중...", keyword=keyword, page=page)
+                    self.heartbeat(keyword, page)
+                    url = page_url(keyword, page, config['base_url'])
+
+                    # 최근(cache_ttl 안)에 본 페이지면 저장된 상품 목록 사용
+                    products = self.serp_cache.get(keyword, page)
+                    if self.serp_cache.enabled:
+                        stats['cache']['hits' if products is not None else 'misses'] += 1
+                    used_browser = False
+                    if products is not None:
+                        log(f"{page}페이지: 캐시된 검색 결과 사용", keyword=keyword, page=page)
+                    else:
+                        # 다음에 볼 페이지들(캐시에 없는 것만)을 미리 요청해두고 현재 페이지 처리
+                        if prefetcher:
+                            prefetcher.advance(page, [next_page for next_page in order[index + 1:]
+                                                      if self.serp_cache.age(keyword, next_page) is None])
+                        with span(stats, 'prefetch_wait'):
+                            prefetched, html = prefetcher.take(page) if prefetcher else (False, None)
+                        if not prefetched and config['fetch_mode'] == 'http':
+                            with span(stats, 'http_fetch'):
+                                html = self.serp_fetcher.fetch(keyword, page)
+
+                        used_browser = html is None
+                        if used_browser:
+                            # 브라우저 풀에서 대여 (매번 새로 띄우지 않음, 필요할 때만 대여, 새로 띄우는 시간 포함)
+                            if browser is None:
+                                with span(stats, 'browser_checkout'):
+                                    browser = self.checkout_browser()
+                            html = self.load_page_with_browser(browser, url, stats)
+
+                        stats['pages_loaded'] += 1
+
+                        # 페이지 소스 분석 후 캐시에 저장
+                        with span(stats, 'parse'):
+                            products = extract_products(html)
+                        evicted = self.serp_cache.put(keyword, page, products)
+                        if evicted is not None:
+                            stats['cache']['stores'] += 1
+                            stats['cache']['evicted'] += evicted
+
+                    # 페이지의 상품 목록 전체 기록 (캐시에서 꺼낸 페이지도 이번 검색이 본 페이지로 기록,
+                    # 저장된 기록으로 순위를 계산할 때 검색 1회가 어느 페이지까지 빠짐없이 봤는지 알 수 있도록)
+                    if self.serp_capture:
+                        try:
+                            if capture_run is None:
+                                capture_run = self.serp_capture.start_run(keyword)
+                            with span(stats, 'capture'):
+                                self.serp_capture.add_page(capture_run, keyword, page, products)
+                        except Exception as e:
+                            log(f"검색 결과 저장 실패: {str(e)}", level='WARNING', keyword=keyword, page=page)
+
+                    with span(stats, 'analyze'):
+                        page_found = analyze_page(products, page, remaining)
+
+                    for current_id, result in page_found.items():
+                        log(f"상품 발견! 상품 ID: {current_id}, 페이지: {page}", keyword=keyword, page=page, product_id=current_id)
+                        found[current_id] = result
+                        remaining.discard(current_id)
+
+                    if on_page:
+                        try:
+                            on_page(page, page_found)
+                        except Exception as e:
+                            log(f"{page}페이지 중간 저장 실패: {str(e)}", level='WARNING', keyword=keyword, page=page)
+
+                    if not remaining:
+                        return found, stats
+
+                    # 다음 페이지로 이동 (미리 가져오기 없이 브라우저로 봤고 다음 페이지가 바로 뒤 페이지일 때만 버튼 클릭)
+                    next_page = order[index + 1] if index + 1 < len(order) else None
+                    if next_page == page + 1 and used_browser and not prefetcher:
+                        try:
+                            with span(stats, 'next_page_click'):
+                                go_to_next_page(browser, page)
+                        except Exception as e:
+                            log(f"페이지 이동 중 오류: {str(e)}", level='WARNING', keyword=keyword, page=page)
+                            index += 1
+                            continue
+
+                    index += 1
+
+                except (SearchCancelled, BrowserUnavailable):
+                    raise
+                except Exception as e:
+                    log(f"페이지 {page} 검색 중 오류: {str(e)}", level='ERROR', keyword=keyword, page=page)
+                    # 고장난 브라우저는 폐기 (새 브라우저는 다음에 필요할 때 대여)
+                    if browser:
+                        with span(stats, 'browser_replace'):
+                            self.browser_pool.checkin(browser, broken=True)
+                        browser = None
+                    failures[page] = failures.get(page, 0) + 1
+                    if failures[page] > config['page_retries']:
+                        # 계속 실패하는 페이지에서 멈춰 있지 않도록 건너뜀 (하트비트는 계속 나가므로 감시로는 못 잡음)
+                        log(f"{page}페이지 {failures[page]}회 실패, 건너뜀", level='WARNING', keyword=keyword, page=page)
+                        stats['skipped_pages'].append(page)
+                        index += 1
+                        continue
+                    time.sleep(3)
+                    continue
+
+            log("\n[검색 결과]")
+            log(f"키워드: {keyword}")
+            log(f"상품 ID: {', '.join(sorted(remaining))}")
+            log("해당 상품을 찾을 수 없습니다. (27페이지 내)")
+            return found, stats
+
+        except SearchCancelled:
+            raise
+        except BrowserUnavailable as e:
+            # 못 찾은 상품을 '순위 없음' 으로 기록하지 않도록 검색 실패로 끝냄
+            log(f"검색 중단: {str(e)}", level='ERROR', keyword=keyword)
+            raise
+        except Exception as e:
+            log(f"검색 중 오류 발생: {str(e)}", level='ERROR', keyword=keyword)
+            return found, stats
+
+        finally:
+            # 1페이지부터 순서대로 봤다면 열었을 페이지 수와 비교 (못 찾은 상품이 있으면 끝까지)
+            stats['sequential_pages'] = max((result['page'] for result in found.values()), default=0) if not remaining else LAST_PAGE
+            stats['hinted'] = hinted
+            stats['parse_time'] = sum(stats['spans'].get('parse', []))
+            # 동시에 도는 다른 검색이 띄운 브라우저도 섞일 수 있음 (워커 프로세스에서는 정확)
+            stats['browser_launches'] = self.launch_count() - launches
+            stats['hint_hit'] = hinted and not remaining and all(
+                result['page'] in order[:neighborhood] for result in found.values())
+            if hinted:
+                log(f"페이지 로드: {stats['pages_loaded']}회 (순서대로 검색 시 {stats['sequential_pages']}회)", keyword=keyword)
+            if prefetcher:
+                # 상품을 찾았으면 남은 미리 가져오기 요청은 취소
+                prefetcher.cancel()
+                log(f"미리 가져오기: 사용 {prefetcher.hits}페이지, 취소 {prefetcher.cancelled}페이지")
+            if browser:
+                self.browser_pool.checkin(browser)
+                log("브라우저 반납")
+
+    def close(self):
+        """브라우저 종료, 미리 가져오기 스레드 정리"""
+        self.prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        self.browser_pool.close_all()
+        if self.prefetch_pool:
+            self.prefetch_pool.close_all()
+        self.serp_fetcher.close()
@@ -0,0 +1,230 @@
+"""
+검색 작업 대기열 (우선순위 레인)
+
+작업은 키워드 1개 + 그 키워드로 찾을 순위표 항목들(항목 id, 상품 ID)이고, 세 레인 중 하나에 들어간다.
+    interactive  : 화면에서 누른 즉시 검색
+    scheduled    : 정기 검색 / 검색 시작 버튼으로 시작한 전체 검색
+    backfill     : 급하지 않은 전체 검색 (다른 검색이 없을 때만 진행)
+workers 개의 실행 슬롯은 비는 대로 interactive > scheduled > backfill 순서로, 같은 레인에서는 먼저 들어온 작업을 가져간다.
+전체 검색도 키워드마다 작업 1개씩 넣으므로 진행 중인 전체 검색 사이에 들어온 즉시 검색이 다음 빈 슬롯을 바로 차지한다.
+(이미 실행 중인 키워드 검색은 끝까지 둔다)
+
+같은 항목은 대기 중이거나 실행 중이면 다시 넣지 않는다.
+작업에 tag 를 붙여 두면 cancel(lanes, tag) 로 그 작업들만 취소할 수 있다 (전체 검색 중지가 예약 검색까지 취소하지 않도록).
+대기 중인 항목을 더 높은 레인으로 다시 요청하면 그 항목이 들어 있는 작업을 높은 레인 끝으로 옮긴다.
+"""
+
+from concurrent.futures import Future
+from collections import deque
+import itertools
+import threading
+import time
+
+# 우선순위 순서
+LANES = ('interactive', 'scheduled', 'backfill')
+
+
+class SearchJob:
+    """대기열의 작업 1개. run(job) 결과(또는 예외)가 future 에 들어간다"""
+
+    def __init__(self, job_id, lane, keyword, rows, run, tag=None):
+        self.job_id = job_id
+        self.lane = lane
+        self.keyword = keyword
+        self.rows = rows                # [(항목 id, 상품 ID), ...]
+        self.run = run
+        self.tag = tag                  # 작업 묶음 (예: 전체 검색 'sweep'), cancel 에서 골라서 취소
+        self.future = Future()
+        self.enqueued_at = time.time()
+        self.started_at = None
+
+    def describe(self, now):
+        return {
+            'id': self.job_id,
+            'lane': self.lane,
+            'keyword': self.keyword,
+            'items': len(self.rows),
+            'waited': round((self.started_at or now) - self.enqueued_at, 1),
+            'running': round(now - self.started_at, 1) if self.started_at else None
+        }
+
+
+class SearchQueue:
+    """우선순위 레인이 있는 검색 작업 대기열 + 실행 슬롯
+
+    spawn(함수) 로 실행 슬롯 workers 개를 띄운다 (socketio.start_background_task 등).
+    on_change() 는 대기열이 바뀔 때마다 락 밖에서 호출된다 (화면 갱신용).
+    """
+
+    def __init__(self, workers, spawn, log=print, on_change=None):
+        self.workers = workers
+        self.spawn = spawn
+        self.log = log
+        self.on_change = on_change or (lambda: None)
+
+        self._lock = threading.Condition()
+        self._lanes = {lane: deque() for lane in LANES}
+        self._items = {}       # 항목 id → 대기/실행 중인 작업
+        self._running = {}     # 작업 id → 실행 중인 작업
+        self._ids = itertools.count(1)
+        self._started = False
+        self._stopping = False
+
+        # 통계
+        self.counters = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'promoted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0
+        }
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            for _ in range(self.workers):
+                self.spawn(self._worker)
+
+    def stop(self):
+        """대기 중인 작업을 모두 취소하고 실행 슬롯 종료 (실행 중인 작업은 끝까지 둠)"""
+        self.cancel(LANES)
+        with self._lock:
+            self._stopping = True
+            self._lock.notify_all()
+
+    def submit(self, lane, keyword, rows, run, tag=None):
+        """rows 중 대기/실행 중이 아닌 항목만으로 작업을 만들어 넣는다
+
+        (작업 또는 None, {이미 대기/실행 중이라 뺀 항목 id: 그 항목이 들어 있는 작업}) 반환.
+        뺀 항목이 더 낮은 레인에서 대기 중이면 그 작업을 lane 으로 올린다.
+        """
+        if lane not in LANES:
+            raise ValueError(f"알 수 없는 레인: {lane}")
+        with self._lock:
+            fresh = []
+            duplicates = {}
+            for item_id, product_id in rows:
+                existing = self._items.get(item_id)
+                if existing is None:
+                    fresh.append((item_id, product_id))
+                    continue
+                duplicates[item_id] = existing
+                self.counters['deduplicated'] += 1
+                if existing.started_at is None and LANES.index(lane) < LANES.index(existing.lane):
+                    self._promote(existing, lane)
+
+            job = None
+            if fresh:
+                job = SearchJob(next(self._ids), lane, keyword, fresh, run, tag)
+                self._lanes[lane].append(job)
+                for item_id, _ in fresh:
+                    self._items[item_id] = job
+                self.counters['submitted'] += 1
+                self._lock.notify()
+        self.on_change()
+        return job, duplicates
+
+    def _promote(self, job, lane):
+        self._lanes[job.lane].remove(job)
+        self.log(f"검색 대기열: '{job.keyword}' 를 {job.lane} → {lane} 으로 올림")
+        job.lane = lane
+        self._lanes[lane].append(job)
+        self.counters['promoted'] += 1
+
+    def job_of(self, item_id):
+        """항목이 들어 있는 대기/실행 중인 작업 (없으면 None)"""
+        with self._lock:
+            return self._items.get(item_id)
+
+    def ahead_of(self, job):
+        """job 보다 먼저 실행될 대기 작업 수"""
+        with self._lock:
+            ahead = 0
+            for lane in LANES:
+                if lane == job.lane:
+                    return ahead + next((index for index, queued in enumerate(self._lanes[lane]) if queued is job), 0)
+                ahead += len(self._lanes[lane])
+            return ahead
+
+    def cancel(self, lanes, tag=None):
+        """lanes 에서 대기 중인 작업 취소 (tag 를 주면 그 tag 의 작업만, future 는 CancelledError), 취소한 작업 수 반환"""
+        with self._lock:
+            cancelled = []
+            for lane in lanes:
+                kept = deque()
+                for job in self._lanes[lane]:
+                    (cancelled if tag is None or job.tag == tag else kept).append(job)
+                self._lanes[lane] = kept
+            for job in cancelled:
+                self._release(job)
+            self.counters['cancelled'] += len(cancelled)
+        for job in cancelled:
+            job.future.cancel()
+        if cancelled:
+            self.on_change()
+        return len(cancelled)
+
+    def cancel_item(self, item_id, keep_tag=None):
+        """항목이 들어 있는 대기 작업 취소 (실행 중이거나 keep_tag 작업이면 False)"""
+        with self._lock:
+            job = self._items.get(item_id)
+            if job is None or job.started_at is not None or (keep_tag is not None and job.tag == keep_tag):
+                return False
+            self._lanes[job.lane].remove(job)
+            self._release(job)
+            self.counters['cancelled'] += 1
+        job.future.cancel()
+        self.on_change()
+        return True
+
+    def _release(self, job):
+        for item_id, _ in job.rows:
+            if self._items.get(item_id) is job:
+                del self._items[item_id]
+
+    def _next_job(self):
+        for lane in LANES:
+            if self._lanes[lane]:
+                return self._lanes[lane].popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                job = self._next_job()
+                while job is None and not self._stopping:
+                    self._lock.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+                job.started_at = time.time()
+                self._running[job.job_id] = job
+            self.on_change()
+
+            try:
+                result = job.run(job)
+            except Exception as e:
+                job.future.set_exception(e)
+                counter = 'failed'
+            else:
+                job.future.set_result(result)
+                counter = 'completed'
+            with self._lock:
+                del self._running[job.job_id]
+                self._release(job)
+                self.counters[counter] += 1
+            self.on_change()
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            lanes = {lane: {'depth': len(jobs),
+                            'items': sum(len(job.rows) for job in jobs),
+                            'oldest_age': round(now - min(job.enqueued_at for job in jobs), 1) if jobs else 0.0}
+                     for lane, jobs in self._lanes.items()}
+            return dict(self.counters,
+                        workers=self.workers,
+                        lanes=lanes,
+                        running=[job.describe(now) for job in self._running.values()],
+                        next=[job.describe(now) for lane in LANES for job in list(self._lanes[lane])[:5]][:5])
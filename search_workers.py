@@ -0,0 +1,627 @@
+"""
+검색 워커 프로세스 (프로세스 격리 + 감시)
+
+크롬/크롬드라이버가 멈추거나 메모리를 계속 먹거나 죽어도 웹 서버에는 영향이 없도록
+키워드 검색을 별도 프로세스(워커)에서 실행한다. 워커마다 SearchEngine(브라우저 풀 포함)을 따로 갖는다.
+
+    SearchSupervisor      서버 쪽 관리자. submit() 으로 받은 검색을 쉬는 워커에 1개씩 보내고,
+                          감시 스레드가 워커의 응답/하트비트/종료를 확인한다.
+    worker_main()         워커 프로세스 본체 (python search_workers.py --port N --worker-id K)
+    InlineSearchRunner    같은 인터페이스로 서버 프로세스 안의 스레드에서 검색 (SEARCH_ISOLATION=thread)
+
+워커는 multiprocessing 의 spawn/fork 대신 새 파이썬 인터프리터로 띄운다.
+(spawn 은 서버 스크립트 전체를 다시 실행하고, fork 는 eventlet 허브 상태까지 복사하기 때문)
+서버와는 127.0.0.1 소켓 1개로 연결하고 multiprocessing.connection 의 인증/메시지 형식을 그대로 쓴다.
+
+감시 규칙
+    - 페이지를 열기 시작할 때마다 워커가 하트비트를 보냄. page_timeout 초 동안 없으면 멈춘 것으로 보고 종료
+    - 키워드 1개가 keyword_timeout 초를 넘어도 종료
+    - 워커가 죽으면(크래시, 메모리 부족 등) 진행 중이던 검색은 실패 처리
+    - 종료할 때는 워커와 그 자식(크롬, 크롬드라이버) 전체를 강제 종료하고 회수한 뒤 새 워커를 띄움
+    - max_tasks 개 검색한 워커는 새 워커로 교체 (메모리 누수 방지)
+"""
+
+from multiprocessing.connection import Connection, answer_challenge, deliver_challenge
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from weakref import WeakKeyDictionary
+from search_engine import SearchEngine, SearchCancelled
+import subprocess
+import threading
+import itertools
+import argparse
+import secrets
+import signal
+import socket
+import time
+import sys
+import os
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+WORKER_SCRIPT = os.path.abspath(__file__)
+
+# 인증 키는 명령줄에 보이지 않도록 환경 변수로 전달
+AUTHKEY_ENV = 'SEARCH_WORKER_AUTHKEY'
+
+
+class SearchWorkerError(Exception):
+    """워커 안에서 검색이 예외로 끝남"""
+    pass
+
+
+class WorkerCrashed(SearchWorkerError):
+    """검색 도중 워커 프로세스가 죽음"""
+    pass
+
+
+class SearchTimeout(SearchWorkerError):
+    """하트비트가 끊기거나 키워드 제한 시간을 넘겨서 워커를 종료함"""
+    pass
+
+
+def kill_process_tree(pid):
+    """워커 프로세스와 그 자식(크롬, 크롬드라이버) 전부 강제 종료"""
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            processes = parent.children(recursive=True) + [parent]
+        except psutil.NoSuchProcess:
+            processes = []
+        for process in processes:
+            try:
+                process.kill()
+            except psutil.NoSuchProcess:
+                pass
+    if os.name == 'posix':
+        # 워커는 새 세션(프로세스 그룹)으로 띄우므로 그룹 전체 종료 (워커가 먼저 죽어서 남은 크롬 포함)
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    elif psutil is None:
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], capture_output=True)
+
+
+def open_connection(sock):
+    """소켓 → multiprocessing Connection (블로킹 모드)"""
+    sock.setblocking(True)
+    fd = sock.detach()
+    if os.name == 'posix':
+        os.set_blocking(fd, True)  # eventlet 소켓은 fd 를 논블로킹으로 바꿔둠
+    return Connection(fd)
+
+
+# ---- 워커 프로세스 ----
+
+class WorkerChannel:
+    """워커 → 서버 메시지 전송 (검색 스레드와 미리 가져오기 스레드가 함께 씀)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.task_id = None
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def send(self, *message):
+        with self._lock:
+            self.conn.send(message)
+
+    def log(self, message, level='INFO', **fields):
+        self.send('log', message, level, fields)
+
+    def beat(self, keyword, page):
+        self.send('beat', self.task_id, page)
+
+    def page_done(self, page, page_found):
+        self.send('page', self.task_id, page, page_found)
+
+    def should_stop(self):
+        """서버가 보낸 취소 요청 확인 (검색 스레드에서만 호출)"""
+        while self.conn.poll():
+            message = self.conn.recv()
+            if message[0] == 'stop' or (message[0] == 'cancel' and message[1] == self.task_id):
+                self.cancelled = True
+        return self.cancelled
+
+
+def worker_main(host, port, worker_id):
+    """워커 프로세스 본체: 서버에 접속해서 검색 요청을 하나씩 처리"""
+    authkey = bytes.fromhex(os.environ.pop(AUTHKEY_ENV))
+    conn = open_connection(socket.create_connection((host, port)))
+    answer_challenge(conn, authkey)
+    deliver_challenge(conn, authkey)
+    conn.send(('ready', worker_id, os.getpid()))
+
+    channel = WorkerChannel(conn)
+    _, config = conn.recv()
+    engine = SearchEngine(config, log=channel.log, heartbeat=channel.beat)
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == 'stop':
+                break
+            if message[0] != 'search':
+                continue  # 검색이 끝난 뒤 도착한 취소 요청
+
+            _, task_id, keyword, product_ids, hints, resume = message
+            channel.task_id = task_id
+            channel.cancelled = False
+            try:
+                found, stats = engine.search(keyword, product_ids, should_stop=channel.should_stop, hints=hints,
+                                             resume=resume, on_page=channel.page_done)
+                channel.send('result', task_id, found, stats)
+            except SearchCancelled:
+                channel.send('cancelled', task_id)
+            except Exception as e:
+                channel.send('error', task_id, str(e))
+    except (EOFError, OSError):
+        pass  # 서버 연결이 끊어짐 (서버 종료)
+    finally:
+        engine.close()
+
+
+# ---- 서버 쪽 관리자 ----
+
+class SearchTask:
+    """대기/진행 중인 검색 1건"""
+
+    def __init__(self, task_id, keyword, product_ids, hints, resume=None, on_page=None):
+        self.task_id = task_id
+        self.keyword = keyword
+        self.product_ids = list(product_ids)
+        self.hints = hints or {}
+        self.resume = resume
+        self.on_page = on_page
+        self.future = Future()
+
+
+class WorkerHandle:
+    """서버에서 본 워커 프로세스 1개"""
+
+    def __init__(self, worker_id, process, conn):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.started_at = time.time()
+        self.task = None
+        self.task_started = 0.0
+        self.last_beat = 0.0
+        self.page = None
+        self.cancel_sent = None
+        self.tasks_done = 0
+
+    @property
+    def name(self):
+        return f"search-worker-{self.worker_id}"
+
+
+def settle(future, result=None, error=None):
+    """Future 에 결과/예외 설정 (이미 끝났거나 취소된 Future 는 무시)"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class SearchSupervisor:
+    """검색 워커 프로세스 size 개를 띄우고 감시하는 관리자
+
+    submit(keyword, product_ids, hints, resume, on_page) → Future (결과는 ({상품 ID: 결과}, 통계))
+    on_page(페이지, {상품 ID: 결과}) 는 워커가 페이지 1개를 다 볼 때마다 감시 스레드에서 호출된다.
+    Future 는 취소되면 SearchCancelled, 워커가 멈추거나 죽으면 SearchTimeout / WorkerCrashed 로 끝난다.
+    워커와의 통신은 감시 스레드 하나만 하므로 다른 스레드에서는 대기열과 플래그만 건드린다.
+    """
+
+    def __init__(self, size, config, log=print, page_timeout=120, keyword_timeout=1200, max_tasks=200,
+                 start_timeout=60, cancel_grace=30, poll_interval=0.05):
+        self.size = size
+        self.config = config
+        self.log = log
+        self.page_timeout = page_timeout
+        self.keyword_timeout = keyword_timeout
+        self.max_tasks = max_tasks
+        self.start_timeout = start_timeout
+        self.cancel_grace = cancel_grace
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._task_ids = itertools.count(1)
+        self._workers = {}      # worker_id → WorkerHandle
+        self._starting = {}     # worker_id → (Popen, 시작 시각)
+        self._retry_at = {}     # worker_id → 다시 띄울 수 있는 시각 (연속 실패 시 대기)
+        self._cancel_requested = False
+        self._cancel_futures = set()   # 진행 중이면 워커에 취소 요청을 보낼 검색의 Future
+        self._running = False
+        self._thread = None
+
+        self._authkey = secrets.token_bytes(32)
+        self._server = socket.create_server(('127.0.0.1', 0))
+        self._server.setblocking(False)
+        self.address = self._server.getsockname()
+
+        # 통계
+        self.counters = {
+            'tasks': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'timeouts': 0,
+            'crashes': 0,
+            'spawned': 0,
+            'recycled': 0
+        }
+
+    # ---- 외부 인터페이스 ----
+
+    def start(self):
+        """감시 스레드 시작 (워커는 감시 스레드가 띄움)"""
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name='search-supervisor', daemon=True)
+            self._thread.start()
+
+    def submit(self, keyword, product_ids, hints=None, resume=None, on_page=None):
+        task = SearchTask(next(self._task_ids), keyword, product_ids, hints, resume, on_page)
+        with self._lock:
+            self._pending.append(task)
+            self.counters['tasks'] += 1
+        return task.future
+
+    def cancel_all(self):
+        """대기 중인 검색은 바로 취소하고, 진행 중인 검색에는 취소 요청 전송"""
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+            self._cancel_requested = True
+            self.counters['cancelled'] += len(pending)
+        for task in pending:
+            settle(task.future, error=SearchCancelled())
+
+    def cancel(self, futures):
+        """submit() 이 돌려준 Future 중 주어진 검색만 취소 (대기 중이면 바로, 진행 중이면 워커에 취소 요청)"""
+        futures = set(futures)
+        with self._lock:
+            pending = [task for task in self._pending if task.future in futures]
+            self._pending = deque(task for task in self._pending if task.future not in futures)
+            self._cancel_futures |= futures
+            self.counters['cancelled'] += len(pending)
+        for task in pending:
+            settle(task.future, error=SearchCancelled())
+
+    def stop(self, timeout=10):
+        """워커 전체 종료 (진행 중인 검색은 취소)"""
+        if self._running:
+            self._running = False
+            self._thread.join(timeout)
+        else:
+            self._shutdown()
+
+    def stats(self):
+        now = time.time()
+        workers = []
+        for handle in list(self._workers.values()):
+            task = handle.task
+            workers.append({
+                'id': handle.worker_id,
+                'pid': handle.process.pid,
+                'busy': task is not None,
+                'keyword': task.keyword if task else None,
+                'page': handle.page if task else None,
+                'task_seconds': round(now - handle.task_started, 1) if task else 0,
+                'since_heartbeat': round(now - handle.last_beat, 1) if task else 0,
+                'tasks_done': handle.tasks_done,
+                'uptime': round(now - handle.started_at, 1)
+            })
+        with self._lock:
+            return dict(self.counters,
+                        mode='process',
+                        size=self.size,
+                        pending=len(self._pending),
+                        starting=len(self._starting),
+                        psutil=psutil is not None,
+                        workers=sorted(workers, key=lambda worker: worker['id']))
+
+    # ---- 감시 스레드 ----
+
+    def _run(self):
+        while self._running:
+            try:
+                self._accept()
+                now = time.time()
+                for worker_id in range(self.size):
+                    handle = self._workers.get(worker_id)
+                    if handle is None:
+                        self._maybe_spawn(worker_id, now)
+                        continue
+                    self._drain(handle)
+                    if self._workers.get(worker_id) is handle:
+                        self._watch(handle, now)
+                self._send_cancels()
+                self._dispatch()
+            except Exception as e:
+                self.log(f"검색 워커 관리 중 오류: {str(e)}", level='ERROR')
+            time.sleep(self.poll_interval)
+        self._shutdown()
+
+    def _maybe_spawn(self, worker_id, now):
+        """비어 있는 자리에 워커 실행 (접속은 _accept 에서 받음)"""
+        starting = self._starting.get(worker_id)
+        if starting is not None:
+            process, started = starting
+            if process.poll() is not None or now - started > self.start_timeout:
+                self.log(f"검색 워커 {worker_id} 시작 실패 (종료 코드 {process.poll()})", level='ERROR')
+                self._reap(process)
+                del self._starting[worker_id]
+                self._retry_at[worker_id] = now + 5
+            return
+        if now < self._retry_at.get(worker_id, 0):
+            return
+
+        env = dict(os.environ)
+        env[AUTHKEY_ENV] = self._authkey.hex()
+        if os.name == 'posix':
+            options = {'start_new_session': True}
+        else:
+            options = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        host, port = self.address
+        process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, '--host', host, '--port', str(port), '--worker-id', str(worker_id)],
+            env=env, **options
+        )
+        self._starting[worker_id] = (process, now)
+        self.counters['spawned'] += 1
+
+    def _accept(self):
+        """시작 중인 워커의 접속 받기 (인증 후 설정 전송)"""
+        while self._starting:
+            try:
+                sock, _ = self._server.accept()
+            except (BlockingIOError, socket.timeout):
+                return
+            conn = open_connection(sock)
+            try:
+                deliver_challenge(conn, self._authkey)
+                answer_challenge(conn, self._authkey)
+                _, worker_id, pid = conn.recv()
+            except Exception as e:
+                self.log(f"검색 워커 인증 실패: {str(e)}", level='ERROR')
+                conn.close()
+                continue
+            starting = self._starting.pop(worker_id, None)
+            if starting is None or starting[0].pid != pid:
+                conn.close()
+                continue
+            conn.send(('init', self.config))
+            self._workers[worker_id] = WorkerHandle(worker_id, starting[0], conn)
+            self._retry_at.pop(worker_id, None)
+
+    def _drain(self, handle):
+        """워커가 보낸 메시지 처리"""
+        try:
+            while handle.conn.poll():
+                self._handle_message(handle, handle.conn.recv())
+        except (EOFError, OSError):
+            pass  # 연결이 끊김 → _watch 에서 종료 코드로 확인
+
+    def _handle_message(self, handle, message):
+        kind = message[0]
+        if kind == 'log':
+            _, text, level, fields = message
+            fields.setdefault('worker', handle.name)
+            self.log(text, level=level, **fields)
+            return
+        task = handle.task
+        if task is None or message[1] != task.task_id:
+            return  # 이미 실패 처리한 검색의 늦은 응답
+        if kind == 'beat':
+            handle.last_beat = time.time()
+            handle.page = message[2]
+            return
+        if kind == 'page':
+            handle.last_beat = time.time()
+            if task.on_page:
+                try:
+                    task.on_page(message[2], message[3])
+                except Exception as e:
+                    self.log(f"{message[2]}페이지 중간 저장 실패: {str(e)}", level='WARNING', keyword=task.keyword)
+            return
+
+        if kind == 'result':
+            settle(task.future, result=(message[2], message[3]))
+            counter = 'completed'
+        elif kind == 'cancelled':
+            settle(task.future, error=SearchCancelled())
+            counter = 'cancelled'
+        else:
+            settle(task.future, error=SearchWorkerError(message[2]))
+            counter = 'failed'
+        with self._lock:
+            self.counters[counter] += 1
+        handle.task = None
+        handle.page = None
+        handle.cancel_sent = None
+        handle.tasks_done += 1
+        if self.max_tasks and handle.tasks_done >= self.max_tasks:
+            self.log(f"{handle.name}: 검색 {handle.tasks_done}회 완료, 새 워커로 교체")
+            self.counters['recycled'] += 1
+            self._retire(handle, graceful=True)
+
+    def _watch(self, handle, now):
+        """워커 종료 / 하트비트 끊김 / 키워드 제한 시간 확인"""
+        code = handle.process.poll()
+        if code is not None:
+            if handle.task:
+                self.log(f"{handle.name} 비정상 종료 (종료 코드 {code}): {handle.task.keyword}", level='ERROR',
+                         keyword=handle.task.keyword)
+                self._fail(handle, WorkerCrashed(f"검색 워커가 종료되었습니다 (종료 코드 {code})"), 'crashes')
+            else:
+                self.log(f"{handle.name} 종료됨 (종료 코드 {code}), 다시 시작", level='WARNING')
+            self._retire(handle)
+            return
+        if handle.task is None:
+            return
+
+        if handle.cancel_sent and now - handle.cancel_sent > self.cancel_grace:
+            # 취소 요청을 확인하지 못할 만큼 멈춰 있으면 기다리지 않고 종료
+            self.log(f"{handle.name} 취소 요청에 응답 없음, 강제 종료", level='WARNING')
+            self._fail(handle, SearchCancelled(), 'cancelled')
+            self._retire(handle)
+            return
+
+        reason = None
+        if now - handle.last_beat > self.page_timeout:
+            reason = f"{handle.page or 1}페이지에서 {self.page_timeout:.0f}초 동안 응답 없음"
+        elif now - handle.task_started > self.keyword_timeout:
+            reason = f"키워드 검색 제한 시간 {self.keyword_timeout:.0f}초 초과"
+        if reason:
+            self.log(f"{handle.name} 강제 종료: {handle.task.keyword} - {reason}", level='ERROR',
+                     keyword=handle.task.keyword)
+            self._fail(handle, SearchTimeout(reason), 'timeouts')
+            self._retire(handle)
+
+    def _fail(self, handle, error, counter):
+        settle(handle.task.future, error=error)
+        with self._lock:
+            self.counters[counter] += 1
+            if counter != 'cancelled':
+                self.counters['failed'] += 1
+        handle.task = None
+
+    def _retire(self, handle, graceful=False):
+        """워커 종료 후 회수 (자리가 비면 다음 반복에서 새 워커 실행)"""
+        self._workers.pop(handle.worker_id, None)
+        if graceful:
+            try:
+                handle.conn.send(('stop',))
+                handle.process.wait(timeout=10)
+            except Exception:
+                pass
+        handle.conn.close()
+        self._reap(handle.process)
+
+    def _reap(self, process):
+        """프로세스 트리 강제 종료 후 wait() 로 좀비 회수"""
+        kill_process_tree(process.pid)
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.log(f"검색 워커 {process.pid} 회수 실패", level='ERROR')
+
+    def _send_cancels(self):
+        with self._lock:
+            requested, self._cancel_requested = self._cancel_requested, False
+            targets, self._cancel_futures = self._cancel_futures, set()
+        if not requested and not targets:
+            return
+        for handle in list(self._workers.values()):
+            if handle.task and (requested or handle.task.future in targets):
+                try:
+                    handle.conn.send(('cancel', handle.task.task_id))
+                    handle.cancel_sent = time.time()
+                except OSError:
+                    pass
+
+    def _dispatch(self):
+        """쉬는 워커에 대기 중인 검색 배정"""
+        for handle in list(self._workers.values()):
+            if handle.task is not None:
+                continue
+            with self._lock:
+                if not self._pending:
+                    return
+                task = self._pending.popleft()
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            handle.task = task
+            handle.task_started = handle.last_beat = time.time()
+            handle.page = None
+            handle.cancel_sent = None
+            try:
+                handle.conn.send(('search', task.task_id, task.keyword, task.product_ids, task.hints, task.resume))
+            except OSError as e:
+                self._fail(handle, WorkerCrashed(f"검색 워커에 요청을 보내지 못했습니다: {str(e)}"), 'crashes')
+                self._retire(handle)
+
+    def _shutdown(self):
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+        for task in pending:
+            settle(task.future, error=SearchCancelled())
+        for handle in list(self._workers.values()):
+            if handle.task:
+                settle(handle.task.future, error=SearchCancelled())
+                handle.task = None
+            try:
+                handle.conn.send(('stop',))
+            except OSError:
+                pass
+        deadline = time.time() + 5
+        for handle in list(self._workers.values()):
+            try:
+                handle.process.wait(timeout=max(0.1, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                pass
+            self._retire(handle)
+        for process, _ in list(self._starting.values()):
+            self._reap(process)
+        self._starting.clear()
+        self._server.close()
+
+
+class InlineSearchRunner:
+    """SearchSupervisor 와 같은 인터페이스로 서버 프로세스 안의 스레드에서 검색 (격리 없음)"""
+
+    def __init__(self, engine, workers):
+        self.engine = engine
+        self.size = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search-engine')
+        self._generation = 0
+        self._stops = WeakKeyDictionary()   # Future → 그 검색만 멈추는 Event
+        self.tasks = 0
+
+    def start(self):
+        pass
+
+    def submit(self, keyword, product_ids, hints=None, resume=None, on_page=None):
+        generation = self._generation
+        stop = threading.Event()
+        self.tasks += 1
+        future = self._executor.submit(self.engine.search, keyword, product_ids,
+                                       lambda: self._generation != generation or stop.is_set(), hints, resume, on_page)
+        self._stops[future] = stop
+        return future
+
+    def cancel(self, futures):
+        """주어진 검색만 취소 (시작 전이면 바로, 진행 중이면 다음 페이지로 넘어갈 때 SearchCancelled)"""
+        for future in futures:
+            future.cancel()
+            stop = self._stops.get(future)
+            if stop is not None:
+                stop.set()
+
+    def cancel_all(self):
+        """지금까지 받은 검색 전부 취소 (다음 페이지로 넘어갈 때 SearchCancelled)"""
+        self._generation += 1
+
+    def stop(self, timeout=None):
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.engine.close()
+
+    def stats(self):
+        return {'mode': 'thread', 'size': self.size, 'tasks': self.tasks}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='검색 워커 프로세스 (SearchSupervisor 가 실행)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--worker-id', type=int, default=0)
+    args = parser.parse_args()
+    worker_main(args.host, args.port, args.worker_id)
@@ -0,0 +1,278 @@
+"""
+오프라인 전체 검색 벤치마크 (로컬 SERP 테스트 서버 사용)
+
+serp_standin 의 합성 페이지(키워드마다 27페이지 x 36개, 광고 / a.page-link 페이지 링크 / 지연 로딩)를 띄우고
+검색 엔진이 그 주소(base_url)를 보도록 해서 키워드 10 / 100 / 1000 개 전체 검색을 실행한다.
+키워드 10개 중 1개는 없는 상품이라 27페이지를 모두 본다. 나머지는 키워드마다 정해진 페이지/위치에 있다.
+
+키워드 수마다 새 프로세스에서 실행해서(최대 메모리를 따로 재기 위해) 다음 값을 JSON 으로 저장한다.
+    키워드별: 소요 시간, 연 페이지 수, 브라우저 실행 수, 파싱 시간, 찾은 페이지가 맞는지
+    전체: 처리량, 소요 시간 중앙값/95%/최대, 합계, 최대 RSS (벤치마크 프로세스 / 가장 큰 하위 프로세스)
+--compare 로 다른 커밋에서 저장한 결과와 키워드 수별로 비교한다 (tolerance 이상 나빠지면 종료 코드 1).
+
+사용 예:
+    python serp_benchmark.py --sizes 10 100 1000
+    python serp_benchmark.py --sizes 100 --compare benchmarks/bench-1a2b3c4-20260101-120000.json
+    python serp_benchmark.py --compare old.json new.json
+    python serp_benchmark.py --fetch-mode browser --lazy --sizes 10 --workers 1
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from execution import percentile
+from serp_standin import start_standin, synthetic_product_id, SYNTHETIC_LAST_PAGE, SYNTHETIC_PAGE_SIZE
+import subprocess
+import tempfile
+import argparse
+import json
+import time
+import sys
+import os
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RESULT_DIR = 'benchmarks'
+
+# 비교할 값과 좋은 방향 (True 면 클수록 좋음)
+COMPARED_METRICS = {
+    'keywords_per_sec': True,
+    'wall_time_p50': False,
+    'wall_time_p95': False,
+    'pages_loaded': False,
+    'browser_launches': False,
+    'parse_ms_per_page': False,
+    'peak_rss_mb': False,
+    'peak_child_rss_mb': False,
+    'errors': False
+}
+
+
+def bench_keywords(count):
+    """(키워드, 상품 ID 목록, 있어야 할 페이지) 목록 (10개 중 1개는 없는 상품 → 페이지 None)"""
+    keywords = []
+    for index in range(count):
+        keyword = f'bench-{index:04d}'
+        if index % 10 == 9:
+            keywords.append((keyword, [f'missing{index}'], None))
+            continue
+        page = 1 + (index * 7) % SYNTHETIC_LAST_PAGE
+        position = (index * 5) % SYNTHETIC_PAGE_SIZE
+        keywords.append((keyword, [synthetic_product_id(keyword, page, position)], page))
+    return keywords
+
+
+def peak_rss_mb(children=False):
+    """최대 RSS(MB). children 이면 종료된 하위 프로세스 중 가장 큰 값 (resource 모듈이 없으면 None)"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # 리눅스는 KB, macOS 는 바이트 단위
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return round(usage.ru_maxrss * scale / 1024 / 1024, 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def summarize(results, total_time, workers):
+    wall_times = [result['wall_time'] for result in results]
+    pages = sum(result['pages_loaded'] for result in results)
+    parse_time = sum(result['parse_time'] for result in results)
+    return {
+        'keywords': len(results),
+        'workers': workers,
+        'total_time': round(total_time, 2),
+        'keywords_per_sec': round(len(results) / total_time, 2) if total_time else 0.0,
+        'wall_time_p50': round(percentile(wall_times, 0.5), 3),
+        'wall_time_p95': round(percentile(wall_times, 0.95), 3),
+        'wall_time_max': round(max(wall_times, default=0.0), 3),
+        'pages_loaded': pages,
+        'browser_launches': sum(result['browser_launches'] for result in results),
+        'parse_time': round(parse_time, 3),
+        'parse_ms_per_page': round(parse_time * 1000 / pages, 3) if pages else 0.0,
+        'errors': sum(1 for result in results if not result['correct'])
+    }
+
+
+def run_sweep(count, base_url, workers, isolation, config):
+    """키워드 count 개 전체 검색 1회 실행 후 {'summary', 'keywords'} 반환 (이 프로세스 안에서)"""
+    from search_engine import SearchEngine
+    from search_workers import SearchSupervisor, InlineSearchRunner
+
+    workdir = tempfile.mkdtemp(prefix='serp-bench-')
+    config = dict(config, base_url=base_url,
+                  cache_path=os.path.join(workdir, 'serp_cache.db'),
+                  capture_path=os.path.join(workdir, 'serp_capture.db'))
+
+    def quiet(message, level='INFO', **fields):
+        if level in ('ERROR', 'CRITICAL'):
+            print(message, file=sys.stderr)
+
+    if isolation == 'process':
+        runner = SearchSupervisor(workers, config, log=quiet)
+    else:
+        runner = InlineSearchRunner(SearchEngine(config, log=quiet), workers)
+    runner.start()
+
+    def search_one(item):
+        keyword, product_ids, expected = item
+        started = time.perf_counter()
+        found, stats = runner.submit(keyword, product_ids).result()
+        result = found.get(product_ids[0])
+        return {
+            'keyword': keyword,
+            'wall_time': round(time.perf_counter() - started, 4),
+            'pages_loaded': stats['pages_loaded'],
+            'browser_launches': stats['browser_launches'],
+            'parse_time': round(stats['parse_time'], 4),
+            'found_page': result['page'] if result else None,
+            'correct': (result['page'] if result else None) == expected
+        }
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(search_one, bench_keywords(count)))
+        total_time = time.perf_counter() - started
+    finally:
+        runner.stop()
+
+    summary = summarize(results, total_time, workers)
+    summary['peak_rss_mb'] = peak_rss_mb()
+    summary['peak_child_rss_mb'] = peak_rss_mb(children=True)
+    return {'summary': summary, 'keywords': results}
+
+
+def run_sweep_process(count, base_url, args):
+    """run_sweep 을 새 프로세스에서 실행 (키워드 수마다 최대 메모리를 따로 재기 위해)"""
+    with tempfile.TemporaryDirectory(prefix='serp-bench-') as workdir:
+        result_path = os.path.join(workdir, 'result.json')
+        command = [sys.executable, os.path.abspath(__file__), '--single', str(count), '--base-url', base_url,
+                   '--result-file', result_path] + sweep_options(args)
+        subprocess.run(command, check=True)
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def sweep_options(args):
+    options = ['--workers', str(args.workers), '--isolation', args.isolation, '--fetch-mode', args.fetch_mode,
+               '--prefetch-depth', str(args.prefetch_depth)]
+    return options + (['--capture'] if args.capture else [])
+
+
+def engine_config(args):
+    return {
+        'fetch_mode': args.fetch_mode,
+        'browser_pool_size': args.workers if args.isolation == 'thread' else 1,
+        'prefetch_depth': args.prefetch_depth,
+        'cache_ttl': 0,                  # 매번 실제로 가져와서 잰다
+        'capture': args.capture
+    }
+
+
+def compare(old, new, tolerance=0.1):
+    """키워드 수가 같은 실행끼리 비교해서 출력하고, tolerance 이상 나빠진 항목 수 반환"""
+    old_runs = {run['summary']['keywords']: run['summary'] for run in old['runs']}
+    regressions = 0
+    print(f"비교: {old.get('commit')} ({old.get('created_at')}) → {new.get('commit')} ({new.get('created_at')})")
+    for run in new['runs']:
+        current = run['summary']
+        previous = old_runs.get(current['keywords'])
+        if previous is None:
+            print(f"  키워드 {current['keywords']}개: 이전 결과 없음")
+            continue
+        print(f"  키워드 {current['keywords']}개")
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = previous.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else (0.0 if after == before else float('inf'))
+            worse = -change if higher_is_better else change
+            mark = ''
+            if worse > tolerance:
+                regressions += 1
+                mark = '  ← 악화'
+            print(f"    {metric:<20} {before:>10} → {after:<10} ({change:+.1%}){mark}")
+    return regressions
+
+
+def load_result(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='로컬 테스트 서버로 전체 검색 벤치마크')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='전체 검색 키워드 수')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SEARCH_WORKERS', '2')))
+    parser.add_argument('--isolation', choices=['process', 'thread'], default='process')
+    parser.add_argument('--fetch-mode', choices=['http', 'browser'], default='http')
+    parser.add_argument('--prefetch-depth', type=int, default=1)
+    parser.add_argument('--capture', action='store_true', help='검색 결과 전체 저장 포함')
+    parser.add_argument('--lazy', action='store_true', help='합성 페이지 지연 로딩 (브라우저 모드)')
+    parser.add_argument('--delay', type=float, default=0.0, help='테스트 서버 응답 지연 (초)')
+    parser.add_argument('--output', help=f'결과 JSON 경로 (기본: {RESULT_DIR}/bench-<커밋>-<시각>.json)')
+    parser.add_argument('--compare', nargs='+', metavar='JSON',
+                        help='이전 결과와 비교 (파일 2개를 주면 실행 없이 두 결과만 비교)')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='악화로 볼 변화율')
+    # 내부용: 키워드 수 하나만 이 프로세스에서 실행
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        # 검색 중 print 출력(워커 프로세스 포함)은 버림
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        result = run_sweep(args.single, args.base_url, args.workers, args.isolation, engine_config(args))
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        sys.exit(0)
+
+    if args.compare and len(args.compare) == 2:
+        sys.exit(1 if compare(load_result(args.compare[0]), load_result(args.compare[1]), args.tolerance) else 0)
+
+    server, base_url = start_standin(None, synthetic=True, lazy=args.lazy, delay=args.delay)
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'options': dict(engine_config(args), isolation=args.isolation, workers=args.workers,
+                        lazy=args.lazy, delay=args.delay),
+        'runs': []
+    }
+    try:
+        for size in args.sizes:
+            print(f"키워드 {size}개 전체 검색 중...", file=sys.stderr)
+            run = run_sweep_process(size, base_url, args)
+            summary = run['summary']
+            print(f"  {summary['total_time']}초 ({summary['keywords_per_sec']}개/초), "
+                  f"키워드당 중앙값 {summary['wall_time_p50']}초 / 95% {summary['wall_time_p95']}초, "
+                  f"페이지 {summary['pages_loaded']}회, 브라우저 실행 {summary['browser_launches']}회, "
+                  f"파싱 {summary['parse_ms_per_page']}ms/페이지, 최대 RSS {summary['peak_rss_mb']}MB "
+                  f"(하위 {summary['peak_child_rss_mb']}MB), 오류 {summary['errors']}건")
+            report['runs'].append(run)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    output = args.output or os.path.join(RESULT_DIR, f"bench-{commit or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+    if args.compare:
+        sys.exit(1 if compare(load_result(args.compare[0]), report, args.tolerance) else 0)
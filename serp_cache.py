@@ -0,0 +1,160 @@
+"""
+검색 결과(SERP) 스냅샷 캐시
+
+(키워드, 페이지) 마다 serp_parser.extract_products() 결과(상품 목록, 순서 = 페이지 내 위치)를
+zlib 으로 압축해서 SQLite 에 저장해두고, TTL 안에 같은 키워드를 다시 검색하면
+브라우저/HTTP 로 페이지를 다시 열지 않고 저장된 목록으로 순위를 계산한다.
+항목 수가 max_entries 를 넘으면 가장 오래 쓰지 않은 것부터 지운다 (LRU).
+"""
+
+import threading
+import sqlite3
+import zlib
+import json
+import time
+import os
+
+CACHE_PATH = os.environ.get('SERP_CACHE_PATH', 'serp_cache.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS serp_snapshots (
+    keyword     TEXT NOT NULL,
+    page        INTEGER NOT NULL,
+    fetched_at  REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    data        BLOB NOT NULL,
+    PRIMARY KEY (keyword, page)
+);
+
+CREATE INDEX IF NOT EXISTS idx_snapshots_last_used ON serp_snapshots (last_used);
+"""
+
+
+def pack(products):
+    return zlib.compress(json.dumps(products, ensure_ascii=False).encode('utf-8'))
+
+
+def unpack(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+class SerpCache:
+    """(키워드, 페이지) → 상품 목록 캐시
+
+    ttl 초가 지난 스냅샷은 없는 것으로 본다. ttl 이 0 이면 캐시를 쓰지 않음.
+    RankStore 와 같이 스레드마다 연결을 따로 열고 WAL 모드를 사용한다.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=600, max_entries=5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evicted = 0
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def _connect(self):
+        """현재 스레드의 연결 반환 (없으면 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def age(self, keyword, page):
+        """스냅샷이 저장된 지 몇 초 지났는지 (없거나 만료됐으면 None)"""
+        if not self.enabled:
+            return None
+        row = self._connect().execute(
+            "SELECT fetched_at FROM serp_snapshots WHERE keyword = ? AND page = ?", (keyword, page)
+        ).fetchone()
+        if row is None:
+            return None
+        age = time.time() - row[0]
+        return age if age < self.ttl else None
+
+    def get(self, keyword, page):
+        """저장된 상품 목록 (없거나 만료됐으면 None)"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at, data FROM serp_snapshots WHERE keyword = ? AND page = ?", (keyword, page)
+            ).fetchone()
+            if row is None or now - row[0] >= self.ttl:
+                self._count('misses')
+                return None
+            conn.execute(
+                "UPDATE serp_snapshots SET last_used = ? WHERE keyword = ? AND page = ?", (now, keyword, page)
+            )
+        self._count('hits')
+        return unpack(row[1])
+
+    def put(self, keyword, page, products):
+        """상품 목록 저장 (빈 목록은 저장하지 않음) 후 만료/초과 항목 정리, 지운 항목 수 반환 (저장하지 않았으면 None)"""
+        if not self.enabled or not products:
+            return None
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO serp_snapshots (keyword, page, fetched_at, last_used, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (keyword, page, now, now, pack(products))
+            )
+            evicted = conn.execute("DELETE FROM serp_snapshots WHERE fetched_at < ?", (now - self.ttl,)).rowcount
+            overflow = conn.execute("SELECT COUNT(*) FROM serp_snapshots").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                evicted += conn.execute(
+                    "DELETE FROM serp_snapshots WHERE rowid IN "
+                    "(SELECT rowid FROM serp_snapshots ORDER BY last_used LIMIT ?)", (overflow,)
+                ).rowcount
+        self._count('stores')
+        self._count('evicted', evicted)
+        return evicted
+
+    def add_counts(self, counts):
+        """다른 프로세스/검색 엔진의 캐시가 센 hits/misses/stores/evicted 를 이 캐시의 통계에 합산"""
+        for name in ('hits', 'misses', 'stores', 'evicted'):
+            self._count(name, counts.get(name, 0))
+
+    def clear(self, keyword=None):
+        """스냅샷 삭제 (keyword 가 없으면 전체)"""
+        with self._connect() as conn:
+            if keyword is None:
+                conn.execute("DELETE FROM serp_snapshots")
+            else:
+                conn.execute("DELETE FROM serp_snapshots WHERE keyword = ?", (keyword,))
+
+    def stats(self):
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM serp_snapshots"
+        ).fetchone()
+        with self._lock:
+            return {
+                'ttl': self.ttl,
+                'entries': entries,
+                'bytes': size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evicted': self.evicted
+            }
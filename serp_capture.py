@@ -0,0 +1,212 @@
+"""
+검색 결과 전체 저장 (full-SERP capture)
+
+analyze_page 는 찾는 상품 외에는 버리므로, 검색할 때 본 페이지의 상품 목록 전체를 따로 저장해두고
+나중에 추가한 경쟁 상품의 순위도 다시 검색하지 않고 저장된 기록에서 계산한다.
+
+페이지 1개 = serp_pages 한 행이며, 상품 목록은 컬럼별 배열로 나눠서 압축 저장한다.
+    ids       상품 ID 배열 (링크가 없는 상품은 '')   zlib(JSON)
+    names     상품명 배열                             zlib(JSON)
+    ad_flags  광고 여부 배열 (상품당 1바이트 0/1)      bytes
+일반/광고 순위는 ad_flags 를 앞에서부터 세어서 계산한다 (analyze_page 와 같은 방식).
+같은 키워드 검색 1회(search_products 호출 1번)는 serp_runs 한 행으로 묶는다.
+
+검색 1회는 상품을 다 찾으면 멈추고, 이전 순위 힌트가 있으면 중간 페이지부터 보므로 모든 페이지가 저장되지는 않는다.
+그래서 lookup 은 검색 1회가 1페이지부터 상품이 나온 페이지까지 빠짐없이 저장한 경우에만 정확한 순위로 보고,
+중간에 빠진 페이지가 있으면 앞 페이지에 더 먼저 나왔을 수 있으므로 partial 로 표시한다.
+"""
+
+from datetime import datetime
+import threading
+import sqlite3
+import zlib
+import json
+import os
+
+CAPTURE_PATH = os.environ.get('SERP_CAPTURE_PATH', 'serp_capture.db')
+
+# 전체 페이지 순위 계산 기준 (페이지당 상품 수)
+PAGE_SIZE = 36
+
+# 검색 결과 마지막 페이지 (search_engine.LAST_PAGE 와 같음, 여기까지 다 봤는데 없으면 '없음' 으로 확정)
+LAST_PAGE = 27
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS serp_runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    keyword     TEXT NOT NULL,
+    started_at  TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS serp_pages (
+    run_id          INTEGER NOT NULL,
+    keyword         TEXT NOT NULL,
+    page            INTEGER NOT NULL,
+    captured_at     TEXT NOT NULL,
+    product_count   INTEGER NOT NULL,
+    ids             BLOB NOT NULL,
+    names           BLOB NOT NULL,
+    ad_flags        BLOB NOT NULL,
+    PRIMARY KEY (run_id, page)
+);
+
+CREATE INDEX IF NOT EXISTS idx_serp_pages_keyword_time ON serp_pages (keyword, captured_at);
+"""
+
+
+def pack_column(values):
+    return zlib.compress(json.dumps(values, ensure_ascii=False).encode('utf-8'))
+
+
+def unpack_column(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+def positions(ad_flags):
+    """광고 여부 배열 → 상품별 (순위 종류, 순위) 목록 (일반/광고 순위를 따로 셈)"""
+    result = []
+    normal_rank = 0
+    ad_rank = 0
+    for is_ad in ad_flags:
+        if is_ad:
+            ad_rank += 1
+            result.append(('ad', ad_rank))
+        else:
+            normal_rank += 1
+            result.append(('normal', normal_rank))
+    return result
+
+
+class SerpCaptureStore:
+    """페이지별 상품 목록 저장소 (RankStore 와 같이 스레드마다 연결, WAL 모드)"""
+
+    def __init__(self, path=CAPTURE_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """현재 스레드의 연결 반환 (없으면 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---- 저장 ----
+
+    def start_run(self, keyword, started_at=None):
+        """키워드 검색 1회 시작, run id 반환"""
+        started_at = (started_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        with self._connect() as conn:
+            return conn.execute(
+                "INSERT INTO serp_runs (keyword, started_at) VALUES (?, ?)", (keyword, started_at)
+            ).lastrowid
+
+    def add_page(self, run_id, keyword, page, products, captured_at=None):
+        """serp_parser.extract_products() 결과 1페이지 저장"""
+        captured_at = (captured_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO serp_pages "
+                "(run_id, keyword, page, captured_at, product_count, ids, names, ad_flags) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, keyword, page, captured_at, len(products),
+                 pack_column([product['id'] or '' for product in products]),
+                 pack_column([product['name'] or '' for product in products]),
+                 bytes(1 if product['is_ad'] else 0 for product in products))
+            )
+
+    # ---- 조회 ----
+
+    def page_products(self, run_id, page):
+        """저장된 1페이지의 상품 목록 [{'id', 'name', 'is_ad', 'rank_type', 'rank', 'page_rank'}] (없으면 None)"""
+        row = self._connect().execute(
+            "SELECT * FROM serp_pages WHERE run_id = ? AND page = ?", (run_id, page)
+        ).fetchone()
+        if row is None:
+            return None
+        ids = unpack_column(row['ids'])
+        names = unpack_column(row['names'])
+        ad_flags = row['ad_flags']
+        return [
+            {'id': ids[i] or None, 'name': names[i] or None, 'is_ad': bool(ad_flags[i]),
+             'rank_type': rank_type, 'rank': rank, 'page_rank': (page - 1) * PAGE_SIZE + rank}
+            for i, (rank_type, rank) in enumerate(positions(ad_flags))
+        ]
+
+    def lookup(self, keyword, product_id, since=None, until=None, limit=500):
+        """저장된 기록에서 상품의 순위 (검색 1회마다 1개, 최신순)
+
+        검색 1회에서 가장 앞 페이지에 나온 위치를 돌려주고, coverage 로 그 값을 믿을 수 있는지 표시한다.
+            complete  1페이지부터 상품이 나온 페이지까지(못 찾았으면 LAST_PAGE 까지) 모두 저장됨
+            partial   중간에 저장되지 않은 페이지가 있음 (더 앞 페이지에 있었을 수 있음 / 못 찾았으면 알 수 없음)
+        found 가 False 이면 그 검색에서 상품이 나오지 않은 것 (page 등 순위 값은 None)
+        since, until 은 검색 시작 시각 기준 'YYYY-MM-DD HH:MM:SS' 또는 앞부분
+        """
+        query = ("SELECT p.run_id, p.page, p.captured_at, p.ids, p.names, p.ad_flags "
+                 "FROM serp_pages p JOIN serp_runs r ON r.id = p.run_id WHERE p.keyword = ?")
+        params = [keyword]
+        if since:
+            query += " AND r.started_at >= ?"
+            params.append(since)
+        if until:
+            query += " AND r.started_at <= ?"
+            params.append(until + '~')  # 앞부분만 준 경우 그 구간 끝까지 포함
+        query += " ORDER BY p.run_id DESC, p.page"
+
+        results = []
+        run_id = None
+        pages = set()
+        match = None
+        for row in self._connect().execute(query, params):
+            if row['run_id'] != run_id:
+                if run_id is not None:
+                    results.append(self._run_result(run_id, pages, match, captured_at))
+                    if len(results) >= limit:
+                        return results
+                run_id, pages, match, captured_at = row['run_id'], set(), None, row['captured_at']
+            pages.add(row['page'])
+            if match is not None:
+                continue
+            ids = unpack_column(row['ids'])
+            if product_id in ids:
+                match = (row, ids.index(product_id))
+        if run_id is not None:
+            results.append(self._run_result(run_id, pages, match, captured_at))
+        return results
+
+    def _run_result(self, run_id, pages, match, captured_at):
+        """검색 1회의 조회 결과 (match 는 (가장 앞 페이지 행, 상품 위치) 또는 None)"""
+        if match is None:
+            covered = all(page in pages for page in range(1, LAST_PAGE + 1))
+            return {'run_id': run_id, 'captured_at': captured_at, 'found': False,
+                    'coverage': 'complete' if covered else 'partial',
+                    'page': None, 'position': None, 'rank_type': None, 'rank': None, 'page_rank': None, 'name': None}
+        row, index = match
+        rank_type, rank = positions(row['ad_flags'])[index]
+        covered = all(page in pages for page in range(1, row['page']))
+        return {
+            'run_id': run_id,
+            'captured_at': row['captured_at'],
+            'found': True,
+            'coverage': 'complete' if covered else 'partial',
+            'page': row['page'],
+            'position': index + 1,
+            'rank_type': rank_type,
+            'rank': rank,
+            'page_rank': (row['page'] - 1) * PAGE_SIZE + rank,
+            'name': unpack_column(row['names'])[index]
+        }
+
+    def stats(self):
+        runs, = self._connect().execute("SELECT COUNT(*) FROM serp_runs").fetchone()
+        pages, products, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(product_count), 0), "
+            "COALESCE(SUM(LENGTH(ids) + LENGTH(names) + LENGTH(ad_flags)), 0) FROM serp_pages"
+        ).fetchone()
+        return {'runs': runs, 'pages': pages, 'products': products, 'bytes': size}
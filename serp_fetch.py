@@ -0,0 +1,148 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+import urllib.parse
+import re
+import os
+
+from browser_pool import USER_AGENT
+
+# 검색 페이지 주소 (로컬 테스트 서버를 쓸 때는 COUPANG_BASE_URL=http://127.0.0.1:8765 처럼 지정)
+SEARCH_BASE_URL = os.environ.get('COUPANG_BASE_URL', 'https://www.coupang.com').rstrip('/')
+
+# class 속성에 search-product 가 단독 클래스로 들어있는지 확인 (search-product-link 등은 제외)
+# 큰따옴표 / 작은따옴표 / 따옴표 없는 속성 모두 확인
+PRODUCT_MARKER = re.compile(r"""class\s*=\s*(?:"(?:[^"]*\s)?search-product(?=[\s"])"""
+                            r"""|'(?:[^']*\s)?search-product(?=[\s'])"""
+                            r"""|search-product(?=[\s>]))""")
+
+
+def search_url(keyword, base_url=None):
+    """키워드 검색 URL (page 파라미터 제외)"""
+    encoded_keyword = urllib.parse.quote(keyword)
+    return f'{base_url or SEARCH_BASE_URL}/np/search?component=&q={encoded_keyword}&channel=user'
+
+
+def page_url(keyword, page, base_url=None):
+    """키워드 검색 결과 N페이지 URL"""
+    return f"{search_url(keyword, base_url)}&page={page}"
+
+
+def has_products(html):
+    """검색 결과 HTML 에 .search-product 상품 목록이 있는지 확인"""
+    return bool(html) and PRODUCT_MARKER.search(html) is not None
+
+
+class SerpFetcher:
+    """브라우저 없이 HTTP 로 검색 결과 페이지를 가져오는 클래스
+
+    스레드마다 requests.Session 을 하나씩 두고 재사용 (keep-alive 연결, 쿠키 유지, gzip 압축)
+    """
+
+    def __init__(self, base_url=None, pool_size=10, timeout=10, log=print):
+        self.base_url = base_url or SEARCH_BASE_URL
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.log = log
+        self._local = threading.local()
+
+        # 통계
+        self.fetch_count = 0
+        self.miss_count = 0
+
+    def _session(self):
+        """현재 스레드의 세션 반환 (없으면 생성)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8',
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive'
+            })
+            self._local.session = session
+        return session
+
+    def fetch(self, keyword, page):
+        """N페이지 HTML 반환 (상품 목록이 없거나 요청 실패 시 None → 브라우저로 대체)"""
+        url = page_url(keyword, page, self.base_url)
+        self.fetch_count += 1
+        try:
+            response = self._session().get(url, timeout=self.timeout)
+            if response.status_code != 200:
+                self.log(f"HTTP 검색 실패 ({response.status_code}): {page}페이지")
+                self.miss_count += 1
+                return None
+            html = response.text
+        except requests.RequestException as e:
+            self.log(f"HTTP 검색 오류: {str(e)}")
+            self.miss_count += 1
+            return None
+
+        if not has_products(html):
+            self.log(f"HTTP 응답에 상품 목록이 없습니다: {page}페이지")
+            self.miss_count += 1
+            return None
+        return html
+
+    def close(self):
+        """현재 스레드의 세션 종료"""
+        session = getattr(self._local, 'session', None)
+        if session is not None:
+            session.close()
+            self._local.session = None
+
+
+class PagePrefetcher:
+    """다음 페이지(N+1, N+2 ...)를 미리 가져오는 파이프라인
+
+    현재 페이지를 분석하는 동안 executor 에서 다음에 볼 페이지의 fetch_page(page) 를 미리 실행해두고,
+    상품을 모두 찾으면 cancel() 로 아직 시작하지 않은 요청을 취소한다.
+    """
+
+    def __init__(self, fetch_page, executor, depth=1, last_page=27):
+        self.fetch_page = fetch_page
+        self.executor = executor
+        self.depth = depth
+        self.last_page = last_page
+        self._futures = {}
+
+        # 통계
+        self.hits = 0
+        self.cancelled = 0
+
+    def advance(self, page, upcoming=None):
+        """다음에 볼 depth 개 페이지를 미리 요청
+
+        upcoming(앞으로 볼 페이지 순서) 이 없으면 page 바로 뒤 페이지들
+        """
+        if upcoming is None:
+            upcoming = range(page + 1, self.last_page + 1)
+        for next_page in list(upcoming)[:self.depth]:
+            if next_page not in self._futures:
+                self._futures[next_page] = self.executor.submit(self.fetch_page, next_page)
+
+    def take(self, page):
+        """미리 요청해둔 page 의 결과를 (요청 여부, HTML) 로 반환 (가져오기 실패 시 HTML 은 None)"""
+        future = self._futures.pop(page, None)
+        if future is None:
+            return False, None
+        self.hits += 1
+        try:
+            return True, future.result()
+        except Exception:
+            return True, None
+
+    def cancel(self):
+        """남은 미리 가져오기 요청 취소"""
+        for future in self._futures.values():
+            if future.cancel():
+                self.cancelled += 1
+        self._futures.clear()
@@ -0,0 +1,154 @@
+"""
+검색 결과(SERP) HTML 에서 상품 목록을 뽑아내는 파서 모음
+
+모든 파서는 .search-product 노드마다 아래 dict 하나를 문서 순서대로 반환한다.
+    {'id': 상품 ID, 'name': 상품명, 'is_ad': 광고 여부, 'href': 상품 링크}
+링크나 상품명이 없는 노드도 순위 계산에 포함되므로 id/name 이 None 인 채로 남겨둔다.
+
+    bs4        BeautifulSoup + html.parser (기준 구현, 느림)
+    lxml       lxml.html + XPath (C 구현)
+    selectolax selectolax (설치되어 있으면 가장 빠름)
+
+파서 결과 비교:
+    python serp_parser.py page1.html page2.html ...
+    python -m pytest tests/test_serp_parser.py   (저장해둔 tests/fixtures/serp/*.html + 합성 페이지)
+"""
+
+from bs4 import BeautifulSoup
+import argparse
+import time
+import os
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+
+def product_id_from_href(href):
+    """상품 링크에서 상품 ID 추출 (/vp/products/123?itemId=... → 123)"""
+    return href.split('/')[-1].split('?')[0]
+
+
+def make_product(is_ad, href, name):
+    """파서 공통 결과 형식"""
+    if href is None or name is None:
+        return {'id': None, 'name': None, 'is_ad': is_ad, 'href': None}
+    return {'id': product_id_from_href(href), 'name': name.strip(), 'is_ad': is_ad, 'href': href}
+
+
+def extract_products_bs4(html):
+    """BeautifulSoup 기준 구현"""
+    soup = BeautifulSoup(html, 'html.parser')
+    products = []
+    for product in soup.select('.search-product'):
+        is_ad = 'search-product__ad' in product.get('class', [])
+        product_link = product.select_one('a.search-product-link')
+        current_name = product.select_one('.name')
+        products.append(make_product(
+            is_ad,
+            product_link.get('href', '') if product_link else None,
+            current_name.text if current_name else None
+        ))
+    return products
+
+
+def _class_xpath(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+PRODUCT_XPATH = f"//*[{_class_xpath('search-product')}]"
+LINK_XPATH = f".//a[{_class_xpath('search-product-link')}]"
+NAME_XPATH = f".//*[{_class_xpath('name')}]"
+
+
+def extract_products_lxml(html):
+    """lxml + XPath 구현"""
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    tree = lxml.html.fromstring(html)
+    products = []
+    for product in tree.xpath(PRODUCT_XPATH):
+        is_ad = 'search-product__ad' in (product.get('class') or '').split()
+        links = product.xpath(LINK_XPATH)
+        names = product.xpath(NAME_XPATH)
+        products.append(make_product(
+            is_ad,
+            links[0].get('href', '') if links else None,
+            names[0].text_content() if names else None
+        ))
+    return products
+
+
+def extract_products_selectolax(html):
+    """selectolax 구현"""
+    tree = HTMLParser(html)
+    products = []
+    for product in tree.css('.search-product'):
+        is_ad = 'search-product__ad' in (product.attributes.get('class') or '').split()
+        product_link = product.css_first('a.search-product-link')
+        current_name = product.css_first('.name')
+        products.append(make_product(
+            is_ad,
+            (product_link.attributes.get('href') or '') if product_link else None,
+            current_name.text() if current_name else None
+        ))
+    return products
+
+
+PARSERS = {'bs4': extract_products_bs4}
+if lxml is not None:
+    PARSERS['lxml'] = extract_products_lxml
+if HTMLParser is not None:
+    PARSERS['selectolax'] = extract_products_selectolax
+
+
+def default_backend():
+    """SERP_PARSER 환경변수 또는 설치된 파서 중 가장 빠른 것"""
+    backend = os.environ.get('SERP_PARSER')
+    if backend in PARSERS:
+        return backend
+    for backend in ('selectolax', 'lxml', 'bs4'):
+        if backend in PARSERS:
+            return backend
+
+
+SERP_PARSER = default_backend()
+
+
+def extract_products(html, backend=None):
+    """설정된 파서로 상품 목록 추출"""
+    return PARSERS[backend or SERP_PARSER](html)
+
+
+def compare_backends(html):
+    """모든 파서 결과를 bs4 기준 구현과 비교해서 {파서: (일치 여부, 소요 시간)} 반환"""
+    expected = extract_products_bs4(html)
+    report = {}
+    for backend, parser in PARSERS.items():
+        started = time.time()
+        products = parser(html)
+        report[backend] = (products == expected, time.time() - started)
+    return report
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description='SERP 파서 결과 비교 (bs4 기준)')
+    arg_parser.add_argument('files', nargs='+')
+    args = arg_parser.parse_args()
+
+    mismatches = 0
+    for path in args.files:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        for backend, (same, elapsed) in compare_backends(html).items():
+            mismatches += 0 if same else 1
+            print(f"{path}: {backend:<10} {'일치' if same else '불일치'} {elapsed * 1000:.1f}ms")
+    raise SystemExit(1 if mismatches else 0)
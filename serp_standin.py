@@ -0,0 +1,179 @@
+"""
+쿠팡 검색 결과 대신 저장해둔 SERP HTML 을 돌려주는 로컬 테스트 서버
+
+fixtures 폴더 구조:
+    fixtures/<키워드>/page<N>.html   키워드별 페이지
+    fixtures/page<N>.html            키워드와 상관없이 쓰는 공통 페이지
+
+--synthetic 이면 fixture 가 없는 키워드/페이지에 합성 페이지로 응답한다 (벤치마크용).
+합성 페이지는 키워드/페이지로 정해지는 상품 36개(일부 광고), a.page-link 페이지 링크를 갖고,
+--lazy 이면 앞의 24개만 HTML 에 넣고 나머지는 스크롤이 끝에 닿을 때 스크립트로 붙인다 (브라우저 모드용).
+
+사용 예:
+    python serp_standin.py --fixtures fixtures --port 8765
+    python serp_standin.py --synthetic --lazy --delay 0.2 --port 8765
+    COUPANG_BASE_URL=http://127.0.0.1:8765 python 2_app_web_coupang_rank_chrome_secretmode_server2ok.py
+"""
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import urllib.parse
+import threading
+import argparse
+import html
+import json
+import gzip
+import time
+import zlib
+import os
+
+# 합성 페이지 설정 (쿠팡 검색 결과와 같은 27페이지 x 36개)
+SYNTHETIC_LAST_PAGE = 27
+SYNTHETIC_PAGE_SIZE = 36
+SYNTHETIC_AD_POSITIONS = (0, 1, 14, 27)   # 페이지마다 광고 상품 위치 (0부터)
+SYNTHETIC_EAGER = 24                      # lazy 일 때 처음 HTML 에 넣는 상품 수
+SYNTHETIC_LAZY_BATCH = 6                  # 스크롤이 끝에 닿을 때마다 붙이는 상품 수
+
+SYNTHETIC_LAZY_JS = """
+<script>
+var lazyProducts = %s;
+window.addEventListener('scroll', function () {
+  if (!lazyProducts.length || window.scrollY + window.innerHeight < document.body.scrollHeight - 200) return;
+  var batch = lazyProducts.splice(0, %d);
+  setTimeout(function () {
+    var list = document.getElementById('productList');
+    batch.forEach(function (item) { list.insertAdjacentHTML('beforeend', item); });
+  }, 300);
+});
+</script>
+"""
+
+
+def synthetic_product_id(keyword, page, position):
+    """합성 페이지의 position(0부터) 번째 상품 ID (키워드/페이지/위치로 항상 같은 값)"""
+    base = zlib.crc32(keyword.encode('utf-8')) % 100000
+    return f"{base + 1}{page:02d}{position:02d}"
+
+
+def synthetic_product(keyword, page, position):
+    is_ad = position in SYNTHETIC_AD_POSITIONS
+    product_id = synthetic_product_id(keyword, page, position)
+    return (f'<li class="search-product{" search-product__ad" if is_ad else ""}">'
+            f'<a class="search-product-link" href="/vp/products/{product_id}?itemId={position + 1}">'
+            f'<div class="name">{html.escape(keyword)} 상품 {page}-{position + 1}</div></a></li>')
+
+
+def synthetic_pagination(keyword, page):
+    """현재 페이지가 속한 10페이지 묶음 링크 + 다음 묶음 첫 페이지 링크"""
+    first = (page - 1) // 10 * 10 + 1
+    pages = list(range(first, min(first + 10, SYNTHETIC_LAST_PAGE + 1)))
+    if page + 1 <= SYNTHETIC_LAST_PAGE and page + 1 not in pages:
+        pages.append(page + 1)
+    query = urllib.parse.quote(keyword)
+    return ''.join(f'<a class="page-link" href="/np/search?component=&q={query}&channel=user&page={number}">{number}</a>'
+                   for number in pages)
+
+
+def synthetic_page(keyword, page, lazy=False):
+    """키워드/페이지로 정해지는 합성 검색 결과 HTML (마지막 페이지를 넘으면 상품 없음)"""
+    products = [] if page > SYNTHETIC_LAST_PAGE else [synthetic_product(keyword, page, position)
+                                                      for position in range(SYNTHETIC_PAGE_SIZE)]
+    eager = products[:SYNTHETIC_EAGER] if lazy else products
+    script = ''
+    if lazy and len(products) > len(eager):
+        items = json.dumps(products[len(eager):]).replace('</', '<\\/')
+        script = SYNTHETIC_LAZY_JS % (items, SYNTHETIC_LAZY_BATCH)
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(keyword)} - 쿠팡!</title>'
+            f'<style>.search-product {{ height: 120px; }}</style></head><body>'
+            f'<ul id="productList">{"".join(eager)}</ul>'
+            f'<div class="search-pagination">{synthetic_pagination(keyword, page)}</div>'
+            f'{script}</body></html>')
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """/np/search?q=...&page=N 요청에 fixture 파일(없으면 합성 페이지)로 응답"""
+
+    fixtures_dir = 'fixtures'
+    synthetic = False   # fixture 가 없으면 합성 페이지로 응답
+    lazy = False        # 합성 페이지 지연 로딩
+    delay = 0.0         # 응답마다 기다릴 시간 (초, 네트워크 지연 흉내)
+
+    def find_fixture(self, keyword, page):
+        """키워드/페이지에 해당하는 fixture 파일 경로 (없으면 None)"""
+        if not self.fixtures_dir:
+            return None
+        for path in (os.path.join(self.fixtures_dir, keyword, f'page{page}.html'),
+                     os.path.join(self.fixtures_dir, f'page{page}.html')):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path != '/np/search':
+            self.send_error(404)
+            return
+
+        query = urllib.parse.parse_qs(parsed.query)
+        keyword = query.get('q', [''])[0]
+        page = query.get('page', ['1'])[0]
+
+        if self.delay:
+            time.sleep(self.delay)
+
+        path = self.find_fixture(keyword, page)
+        if path is not None:
+            with open(path, 'rb') as f:
+                body = f.read()
+        elif self.synthetic and page.isdigit():
+            body = synthetic_page(keyword, int(page), self.lazy).encode('utf-8')
+        else:
+            self.send_error(404, f'fixture 없음: {keyword} {page}페이지')
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 요청마다 콘솔에 찍지 않음
+        pass
+
+
+def make_handler(fixtures_dir, synthetic=False, lazy=False, delay=0.0):
+    return type('FixtureHandler', (StandinHandler,), {'fixtures_dir': fixtures_dir, 'synthetic': synthetic,
+                                                       'lazy': lazy, 'delay': delay})
+
+
+def start_standin(fixtures_dir, host='127.0.0.1', port=0, synthetic=False, lazy=False, delay=0.0):
+    """백그라운드 스레드로 테스트 서버 시작 후 (server, base_url) 반환"""
+    handler = make_handler(fixtures_dir, synthetic, lazy, delay)
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='저장된 SERP 를 돌려주는 로컬 테스트 서버')
+    parser.add_argument('--fixtures', default='fixtures')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--synthetic', action='store_true', help='fixture 가 없으면 합성 페이지로 응답')
+    parser.add_argument('--lazy', action='store_true', help='합성 페이지 상품 일부를 스크롤할 때 붙임')
+    parser.add_argument('--delay', type=float, default=0.0, help='응답 지연 (초)')
+    args = parser.parse_args()
+
+    handler = make_handler(args.fixtures, args.synthetic, args.lazy, args.delay)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"테스트 서버 실행 중: http://{args.host}:{args.port} (fixtures: {args.fixtures}, 합성: {args.synthetic})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
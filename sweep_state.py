@@ -0,0 +1,248 @@
+"""
+전체 검색(sweep) 진행 상태 저장소 (SQLite)
+
+전체 검색을 중지하거나 서버가 죽거나 다시 시작되어도 다음 검색이 1번 행부터 다시 시작하지 않도록
+검색 1회의 진행 상황을 별도 DB 파일(SWEEP_DB)에 남겨두고, 끝나지 않은 검색은 남은 항목만 이어서 검색한다.
+
+    sweeps           검색 1회 (id, 레인, 상태, 시작/종료 시각, 전체/완료 항목 수)
+    sweep_items      검색 계획에 들어간 항목별 상태 (pending → done / error)
+    sweep_keywords   키워드별 중간 저장: 다 본 페이지 목록, 마지막으로 본 페이지, 그때까지 찾은 상품 결과
+
+sweeps.status
+    running      진행 중 (서버를 시작할 때 running 이면 서버가 죽은 것 → interrupted 로 바꿈)
+    stopped      검색 중지 버튼으로 멈춤
+    interrupted  서버 종료/오류로 멈춤
+    completed    끝까지 검색함
+    abandoned    이어서 검색하지 않고 버림 (너무 오래되었거나 새로 시작)
+"""
+
+from datetime import datetime, timedelta
+import threading
+import sqlite3
+import json
+import os
+
+# 순위 DB(coupang_rank.db)와 따로 둠: 페이지마다 중간 저장해도 RankTable 이 순위 DB 가 바뀐 것으로 보고 다시 읽지 않도록
+DB_PATH = os.environ.get('SWEEP_DB', 'sweep_state.db')
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 이어서 검색할 수 있는 상태
+UNFINISHED = ('running', 'stopped', 'interrupted')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sweeps (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    lane         TEXT NOT NULL DEFAULT 'scheduled',
+    status       TEXT NOT NULL DEFAULT 'running',
+    started_at   TEXT NOT NULL,
+    updated_at   TEXT NOT NULL,
+    finished_at  TEXT NOT NULL DEFAULT '',
+    total        INTEGER NOT NULL DEFAULT 0,
+    resumed      INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS sweep_items (
+    sweep_id     INTEGER NOT NULL,
+    position     INTEGER NOT NULL,
+    item_id      INTEGER NOT NULL,
+    keyword      TEXT NOT NULL,
+    product_id   TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'pending',
+    finished_at  TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (sweep_id, item_id)
+);
+
+CREATE TABLE IF NOT EXISTS sweep_keywords (
+    sweep_id     INTEGER NOT NULL,
+    keyword      TEXT NOT NULL,
+    last_page    INTEGER NOT NULL DEFAULT 0,
+    pages        TEXT NOT NULL DEFAULT '[]',
+    found        TEXT NOT NULL DEFAULT '{}',
+    updated_at   TEXT NOT NULL,
+    PRIMARY KEY (sweep_id, keyword)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sweep_items_status
+    ON sweep_items (sweep_id, status, position);
+"""
+
+
+def now_text():
+    return datetime.now().strftime(TIME_FORMAT)
+
+
+class SweepStateStore:
+    """sweeps / sweep_items / sweep_keywords 테이블 접근 (RankStore 와 같이 스레드마다 연결, WAL 모드)"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """현재 스레드의 연결 반환 (없으면 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---- 검색 1회 ----
+
+    def start(self, lane, plan):
+        """새 검색 기록, plan = [(키워드, [(항목 id, 상품 ID), ...]), ...] 순서대로 저장 후 sweep id 반환"""
+        now = now_text()
+        items = [(keyword, item_id, product_id) for keyword, rows in plan for item_id, product_id in rows]
+        with self._connect() as conn:
+            sweep_id = conn.execute(
+                "INSERT INTO sweeps (lane, status, started_at, updated_at, total) VALUES (?, 'running', ?, ?, ?)",
+                (lane, now, now, len(items))
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR IGNORE INTO sweep_items (sweep_id, position, item_id, keyword, product_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(sweep_id, position, item_id, keyword, product_id)
+                 for position, (keyword, item_id, product_id) in enumerate(items)]
+            )
+        return sweep_id
+
+    def get(self, sweep_id):
+        row = self._connect().execute("SELECT * FROM sweeps WHERE id = ?", (sweep_id,)).fetchone()
+        return dict(row) if row else None
+
+    def unfinished(self):
+        """가장 최근의 끝나지 않은 검색 (없으면 None)"""
+        row = self._connect().execute(
+            f"SELECT * FROM sweeps WHERE status IN ({', '.join('?' * len(UNFINISHED))}) ORDER BY id DESC LIMIT 1",
+            UNFINISHED
+        ).fetchone()
+        return dict(row) if row else None
+
+    def last(self):
+        """가장 최근 검색 (없으면 None)"""
+        row = self._connect().execute("SELECT * FROM sweeps ORDER BY id DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def mark_interrupted(self):
+        """서버 시작 시 running 으로 남은 검색(서버가 죽어서 끝나지 못함)을 interrupted 로 변경, 변경한 수 반환"""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE sweeps SET status = 'interrupted', updated_at = ? WHERE status = 'running'", (now_text(),)
+            ).rowcount
+
+    def set_status(self, sweep_id, status):
+        now = now_text()
+        finished_at = now if status in ('completed', 'abandoned') else ''
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sweeps SET status = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+                (status, now, finished_at, sweep_id)
+            )
+
+    def resume(self, sweep_id):
+        """끝나지 않은 검색을 다시 running 으로 (이어서 검색한 횟수 증가)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sweeps SET status = 'running', updated_at = ?, resumed = resumed + 1 WHERE id = ?",
+                (now_text(), sweep_id)
+            )
+
+    def abandon_older_than(self, max_age_hours):
+        """updated_at 이 max_age_hours 보다 오래된 끝나지 않은 검색은 abandoned 로 (남은 항목을 이어서 검색할 의미가 없음)"""
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).strftime(TIME_FORMAT)
+        with self._connect() as conn:
+            return conn.execute(
+                f"UPDATE sweeps SET status = 'abandoned', finished_at = ? "
+                f"WHERE status IN ({', '.join('?' * len(UNFINISHED))}) AND updated_at < ?",
+                (now_text(),) + UNFINISHED + (cutoff,)
+            ).rowcount
+
+    # ---- 항목 / 키워드 ----
+
+    def remaining(self, sweep_id):
+        """아직 끝나지 않은 항목 [(항목 id, 키워드, 상품 ID), ...] (원래 계획 순서)"""
+        rows = self._connect().execute(
+            "SELECT item_id, keyword, product_id FROM sweep_items WHERE sweep_id = ? AND status = 'pending' "
+            "ORDER BY position", (sweep_id,)
+        ).fetchall()
+        return [(row['item_id'], row['keyword'], row['product_id']) for row in rows]
+
+    def finish_items(self, sweep_id, item_ids, status='done'):
+        """항목 완료 처리 (검색 결과를 순위표에 저장한 뒤)"""
+        now = now_text()
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE sweep_items SET status = ?, finished_at = ? WHERE sweep_id = ? AND item_id = ?",
+                [(status, now, sweep_id, item_id) for item_id in item_ids]
+            )
+            conn.execute("UPDATE sweeps SET updated_at = ? WHERE id = ?", (now, sweep_id))
+
+    def save_page(self, sweep_id, keyword, page, page_found):
+        """키워드 검색 중 페이지 1개를 다 봤을 때 중간 저장 (다 본 페이지 + 그 페이지에서 찾은 상품)"""
+        now = now_text()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT pages, found FROM sweep_keywords WHERE sweep_id = ? AND keyword = ?", (sweep_id, keyword)
+            ).fetchone()
+            pages = json.loads(row['pages']) if row else []
+            found = json.loads(row['found']) if row else {}
+            if page not in pages:
+                pages.append(page)
+            found.update(page_found)
+            conn.execute(
+                "INSERT OR REPLACE INTO sweep_keywords (sweep_id, keyword, last_page, pages, found, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (sweep_id, keyword, page, json.dumps(pages), json.dumps(found, ensure_ascii=False), now)
+            )
+
+    def keyword_checkpoint(self, sweep_id, keyword):
+        """키워드의 중간 저장 {'pages': [다 본 페이지], 'last_page': 마지막으로 본 페이지, 'found': {상품 ID: 결과}} (없으면 None)"""
+        row = self._connect().execute(
+            "SELECT last_page, pages, found FROM sweep_keywords WHERE sweep_id = ? AND keyword = ?",
+            (sweep_id, keyword)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'pages': json.loads(row['pages']), 'last_page': row['last_page'], 'found': json.loads(row['found'])}
+
+    def clear_keyword(self, sweep_id, keyword):
+        """키워드 검색이 끝나서 더 필요 없는 중간 저장 삭제"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sweep_keywords WHERE sweep_id = ? AND keyword = ?", (sweep_id, keyword))
+
+    # ---- 조회 ----
+
+    def summary(self, sweep_id):
+        """검색 1회의 상태 + 항목 상태별 개수 + 중간 저장된 키워드 (없으면 None)"""
+        sweep = self.get(sweep_id)
+        if sweep is None:
+            return None
+        conn = self._connect()
+        counts = {row['status']: row['count'] for row in conn.execute(
+            "SELECT status, COUNT(*) AS count FROM sweep_items WHERE sweep_id = ? GROUP BY status", (sweep_id,)
+        )}
+        checkpoints = [dict(row) for row in conn.execute(
+            "SELECT keyword, last_page, updated_at FROM sweep_keywords WHERE sweep_id = ? ORDER BY updated_at DESC",
+            (sweep_id,)
+        )]
+        return dict(sweep,
+                    pending=counts.get('pending', 0),
+                    done=counts.get('done', 0),
+                    error=counts.get('error', 0),
+                    checkpoints=checkpoints)
+
+    def prune(self, keep=20):
+        """최근 keep 회를 남기고 끝난 검색 기록 삭제"""
+        with self._connect() as conn:
+            old = [row['id'] for row in conn.execute(
+                f"SELECT id FROM sweeps WHERE status NOT IN ({', '.join('?' * len(UNFINISHED))}) "
+                f"ORDER BY id DESC LIMIT -1 OFFSET ?", UNFINISHED + (keep,)
+            )]
+            for table, column in (('sweep_items', 'sweep_id'), ('sweep_keywords', 'sweep_id'), ('sweeps', 'id')):
+                conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", [(sweep_id,) for sweep_id in old])
+        return len(old)
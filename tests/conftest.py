@@ -0,0 +1,5 @@
+import sys
+import os
+
+# 저장소 최상위 모듈(serp_parser 등)을 tests/ 에서 import 할 수 있도록
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+"""
+serp_fetch.has_products: HTTP 로 가져온 페이지에 상품 목록이 있는지 판단 (없으면 브라우저로 다시 열거나 키워드 검색 종료)
+"""
+
+from serp_fetch import has_products
+from serp_standin import synthetic_page
+import pytest
+import os
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'serp')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('html', [
+    '<li class="search-product">',
+    '<li class="search-product__ad search-product" id="1">',
+    "<li class='search-product'>",
+    "<li class='search-product search-product__ad'>",
+    '<li class=search-product>',
+    '<li class=search-product id=1>',
+    '<li class = "baby search-product">',
+])
+def test_marker_found(html):
+    assert has_products(html)
+
+
+@pytest.mark.parametrize('html', [
+    '',
+    None,
+    '<a class="search-product-link">',
+    "<a class='search-product-link'>",
+    '<a class=search-product-link>',
+    '<li class="search-product__ad">',
+    '<div class="search-no-result">search-product</div>',
+])
+def test_marker_not_found(html):
+    assert not has_products(html)
+
+
+def test_fixtures():
+    assert has_products(load_fixture('coupang_ads.html'))
+    assert has_products(load_fixture('edge_cases.html'))
+    assert not has_products(load_fixture('no_results.html'))
+    assert has_products(synthetic_page('키보드', 1))
+    assert not has_products(synthetic_page('키보드', 28))
@@ -0,0 +1,77 @@
+"""
+SERP 파서 결과 비교: 모든 파서(bs4 / lxml / selectolax)가 저장해둔 검색 결과 페이지와
+합성 페이지에서 bs4 기준 구현과 같은 상품 목록(id, name, is_ad, href)을 뽑아내는지 확인한다.
+"""
+
+from serp_parser import PARSERS, extract_products_bs4
+from serp_standin import synthetic_page, synthetic_product_id, SYNTHETIC_AD_POSITIONS, SYNTHETIC_PAGE_SIZE
+import pytest
+import os
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'serp')
+FIXTURES = sorted(name for name in os.listdir(FIXTURE_DIR) if name.endswith('.html'))
+
+SYNTHETIC_CASES = [('무선 이어폰', 1, False), ('무선 이어폰', 2, True), ('a&b <c>', 27, False), ('키보드', 28, False)]
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('backend', sorted(PARSERS))
+@pytest.mark.parametrize('name', FIXTURES)
+def test_fixture_parity(name, backend):
+    html = load_fixture(name)
+    assert PARSERS[backend](html) == extract_products_bs4(html)
+
+
+@pytest.mark.parametrize('backend', sorted(PARSERS))
+@pytest.mark.parametrize('keyword, page, lazy', SYNTHETIC_CASES)
+def test_synthetic_parity(keyword, page, lazy, backend):
+    html = synthetic_page(keyword, page, lazy)
+    assert PARSERS[backend](html) == extract_products_bs4(html)
+
+
+def test_all_backends_installed():
+    # 설치되지 않은 파서는 비교 대상에서 빠지므로 빠진 파서가 없는지 따로 확인
+    assert set(PARSERS) == {'bs4', 'lxml', 'selectolax'}
+
+
+def test_ads_fixture():
+    products = extract_products_bs4(load_fixture('coupang_ads.html'))
+    assert [(product['id'], product['is_ad']) for product in products] == [
+        ('9000001', True), ('9000002', True), ('9000003', False),
+        ('9000004', False), ('9000005', True), ('9000006', False)
+    ]
+    assert products[0]['name'] == '블루투스 무선 이어폰 노이즈캔슬링, 블랙'
+    assert products[1]['name'] == '오픈형 이어폰 & 충전 케이스 무선 세트'
+    assert products[1]['href'].startswith('/vp/products/9000002?itemId=30000002&vendorItemId=')
+    assert products[5]['name'] == '키즈 무선 헤드셋 <볼륨 제한>'
+
+
+def test_edge_cases_fixture():
+    products = extract_products_bs4(load_fixture('edge_cases.html'))
+    # 상품명/링크가 없는 상품도 순위 계산을 위해 id 없이 남아 있어야 함
+    assert products[0] == {'id': None, 'name': None, 'is_ad': False, 'href': None}
+    assert products[1] == {'id': None, 'name': None, 'is_ad': True, 'href': None}
+    assert [product['id'] for product in products[2:]] == [
+        '7000003', '7000004', '7000005', '', '7000008', '7000009', '7000010'
+    ]
+    assert products[2]['is_ad'] and products[6]['is_ad']
+    assert products[4]['name'] == ''
+    assert products[7]['name'] == '주석이 있는 상품'
+    assert products[8]['name'] == '첫 번째 이름'
+
+
+def test_no_results_fixture():
+    for parser in PARSERS.values():
+        assert parser(load_fixture('no_results.html')) == []
+
+
+def test_synthetic_page_products():
+    products = extract_products_bs4(synthetic_page('무선 이어폰', 3))
+    assert len(products) == SYNTHETIC_PAGE_SIZE
+    assert [position for position, product in enumerate(products) if product['is_ad']] == list(SYNTHETIC_AD_POSITIONS)
+    assert [product['id'] for product in products] == [synthetic_product_id('무선 이어폰', 3, position)
+                                                        for position in range(SYNTHETIC_PAGE_SIZE)]